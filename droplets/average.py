@@ -1,5 +1,5 @@
 import numpy as np
-from droplets.flow import FlowData
+from droplets.flow import FlowData, INDEX_LABELS, get_float_dtype
 from strata.dataformats.write import write
 
 
@@ -23,6 +23,11 @@ def average_flow_data(input_flow_maps, weights=[],
     or by excluding the entire set from the averaging. This is controlled
     by the `exclude_empty_sets` flag.
 
+    Sparse input data (see `droplets.flow.FlowData`) is accumulated onto
+    the full grid of its `shape` by the bin indices, without expanding
+    the maps. Missing bins are averaged as empty. If sparse maps are mixed
+    with dense maps they are expanded before averaging.
+
     Args:
         flow_data (FlowData): List of objects to average. Must have `shape`
             and `spacing` information set.
@@ -81,9 +86,17 @@ def average_flow_data(input_flow_maps, weights=[],
 
     flow_data_list = [
         flow for flow in input_flow_maps
-        if (exclude_empty_sets == False or flow.data.size > 0)
+        if (exclude_empty_sets == False or flow._size() > 0)
         ]
 
+    if flow_data_list != [] and all(flow.is_sparse for flow in flow_data_list):
+        return average_sparse_flow_data(flow_data_list, spacing, weights,
+            coord_labels)
+
+    # Maps which are mixed with dense maps are expanded to their full grid
+    flow_data_list = [flow.densify(coord_labels) if flow.is_sparse else flow
+        for flow in flow_data_list]
+
     data_list = [flow.data for flow in flow_data_list]
     grid = get_combined_grid(data_list, spacing, coord_labels)
 
@@ -97,6 +110,117 @@ def average_flow_data(input_flow_maps, weights=[],
     return get_flowdata(avg_data, grid, spacing)
 
 
+def average_sparse_flow_data(flow_maps, spacing, weights=[],
+        coord_labels=('X', 'Y')):
+    """Return the average of input FlowData objects with sparse data.
+
+    The bins of all maps are accumulated by their bin indices onto the
+    full grid of their common `shape`. Bins which are missing from a map
+    are empty and count as zeros in the average, which thus is identical
+    to the average of the densified maps. See `average_flow_data` for
+    the weighting.
+
+    Args:
+        flow_maps (FlowData): List of objects to average.
+
+        spacing (2-tuple): Common bin spacing of the maps.
+
+    Keyword Args:
+        weights (label, weight): A list of 2-tuples with labels of data
+            and weights to calculate a weighted mean for.
+
+        coord_labels (2-tuple, default=('X', 'Y'): Record labels for coordinates.
+
+    Returns:
+        FlowData: Averaged data on the full grid, sorted in y-major,
+            x-minor order.
+
+    Raises:
+        ValueError: If the maps do not have the same `shape` set.
+
+        KeyError: If non-existant labels are input.
+
+    """
+
+    def get_shape(flow_maps):
+        shape = flow_maps[0].shape
+
+        if None in shape or any(tuple(flow.shape) != tuple(shape) for flow in flow_maps):
+            raise ValueError("Input shapes of sparse FlowData objects not set "
+                "and identical.")
+
+        return tuple(int(n) for n in shape)
+
+    def get_grid_coords(label, index_label, num, x0, dx):
+        # Use a present bin as a reference to retain translations, as `densify`
+        for flow in flow_maps:
+            coords, indices = (flow.fields[l] for l in (label, index_label))
+
+            if coords.size > 0:
+                return coords[0] + dx * (np.arange(num) - int(indices[0]))
+
+        return x0 + dx * (np.arange(num) + 0.5)
+
+    xl, yl = coord_labels
+    dx, dy = spacing
+    nx, ny = get_shape(flow_maps)
+
+    x0, y0 = flow_maps[0].origin
+    if None in (x0, y0):
+        x0, y0 = 0., 0.
+
+    data_labels = [l for l in flow_maps[0].properties
+        if l not in list(coord_labels) + list(INDEX_LABELS)]
+
+    try:
+        for l, w in weights:
+            assert (l in data_labels and w in data_labels)
+    except AssertionError:
+        raise KeyError("Input labels of 'weights' not in data: %r %r" % (l, w))
+
+    sums = {l: np.zeros(nx * ny, dtype=np.float64) for l in data_labels}
+    weighted_sums = {l: np.zeros(nx * ny, dtype=np.float64) for l, _ in weights}
+
+    for flow in flow_maps:
+        fields = flow.fields
+
+        # Bins are stored y-major, x-minor like the dense grid
+        ix, iy = (fields[l].astype(np.int64) for l in INDEX_LABELS)
+        inds = iy * nx + ix
+
+        for l in data_labels:
+            sums[l] += np.bincount(inds, weights=fields[l], minlength=nx * ny)
+
+        for l, w in weights:
+            weighted_sums[l] += np.bincount(inds, weights=fields[l] * fields[w],
+                minlength=nx * ny)
+
+    x = get_grid_coords(xl, INDEX_LABELS[0], nx, x0, dx)
+    y = get_grid_coords(yl, INDEX_LABELS[1], ny, y0, dy)
+    xs, ys = np.meshgrid(x, y)
+
+    dtype = get_float_dtype()
+    columns = [(xl, xs.ravel().astype(dtype)), (yl, ys.ravel().astype(dtype))]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for l in data_labels:
+            if l in weighted_sums:
+                values = np.nan_to_num(weighted_sums[l] / sums[dict(weights)[l]])
+            else:
+                values = sums[l] / len(flow_maps)
+
+            columns.append((l, values.astype(dtype)))
+
+    info = {
+            'shape': (nx, ny),
+            'num_bins': nx * ny,
+            'origin': (x[0], y[0]),
+            'spacing': spacing
+            }
+
+    return FlowData(*columns, info=info)
+
+
 def average_data(data_records, weights=[], coord_labels=('X', 'Y')):
     """Return average of input data records.
 
@@ -105,7 +229,9 @@ def average_data(data_records, weights=[], coord_labels=('X', 'Y')):
     using a weighted arithmetic mean. Here 'weight' refers to the data label
     to use for these weights.
 
-    The coordinate vectors of all input data must be identical.
+    The coordinate vectors of all input data must be identical. The means
+    are accumulated in double precision and stored with the data-type
+    of the input records.
 
     Args:
         data_records (ndarray): List of data records with coordinates
@@ -139,7 +265,7 @@ def average_data(data_records, weights=[], coord_labels=('X', 'Y')):
         for i, d in enumerate(data_records):
             data[i,:] = d[label]
 
-        return data.mean(axis=0)
+        return data.mean(axis=0, dtype=np.float64)
 
     def calc_weighted_mean(label, weight, avg_data, data_records):
         try:
@@ -150,9 +276,9 @@ def average_data(data_records, weights=[], coord_labels=('X', 'Y')):
             raise KeyError("Input labels of 'weights' not in data: %r %r"
                     % (label, weight))
         else:
-            total_weight = len(data_records)*avg_data[weight]
+            total_weight = len(data_records)*avg_data[weight].astype(np.float64)
 
-        return np.nan_to_num(data.sum(axis=0)/(total_weight))
+        return np.nan_to_num(data.sum(axis=0, dtype=np.float64)/(total_weight))
 
     xl, yl = coord_labels
 
@@ -233,8 +359,10 @@ def get_combined_grid(data_list, spacing, coord_labels=('X', 'Y')):
         coord_labels (2-tuple, default=('X', 'Y'): Record labels for coordinates.
 
     Returns:
-        ndarray: A container of the same dtype as input data and of shape
-            (ny, nx). Will be sorted as y-major, x-minor.
+        ndarray: A container with the fields of input data and of shape
+            (ny, nx). Will be sorted as y-major, x-minor. The fields use
+            the precision set by `droplets.flow.set_precision`, or
+            double precision if none is set.
 
     """
 
@@ -268,7 +396,7 @@ def get_combined_grid(data_list, spacing, coord_labels=('X', 'Y')):
 
     xs, ys = np.meshgrid(x, y)
 
-    dtype = [(l, np.float64) for l in data_list[0].dtype.names]
+    dtype = [(l, get_float_dtype()) for l in data_list[0].dtype.names]
     combined_grid = np.zeros(
         xs.size, dtype=dtype
     ).reshape(ny, nx)
@@ -72,8 +72,8 @@ def get_contact_line_cells(flow, label, extract_area=(0., 0.),
     def get_cells_of_edge(inds, edge, dx, extract_height):
         """Get all the cells for the edge inds in the inwards direction."""
 
-        xs = flow.data[xlabel]
-        ys = flow.data[ylabel]
+        xs = flow.fields[xlabel]
+        ys = flow.fields[ylabel]
 
         # Find the interface index at which height to place the extraction box
         i = 0
@@ -101,8 +101,8 @@ def get_contact_line_cells(flow, label, extract_area=(0., 0.),
         return flow.data[icells].copy()
 
     xlabel, ylabel = kwargs.get('coord_labels', ('X', 'Y'))
-    x = lambda index: flow.data[index][xlabel]
-    y = lambda index: flow.data[index][ylabel]
+    x = lambda index: flow.fields[xlabel][index]
+    y = lambda index: flow.fields[ylabel][index]
 
     width, height = extract_area
 
@@ -0,0 +1,124 @@
+import numpy as np
+
+from droplets.flow import RegularGridFlowData, register_derived_field
+from droplets.sample import sample_center_of_mass, sample_viscous_dissipation
+
+"""Fields which are derived from the stored fields of FlowData objects.
+
+The fields are registered by `droplets.flow.register_derived_field` and
+requested from objects by `FlowData.get_field`, which calculates them
+once and keeps them until the fields they are derived from change. The
+mass gradient is thus calculated once for both the 'grad_rho_x' and
+'evaporation' fields.
+
+    'flow': Absolute flow sqrt(U^2 + V^2).
+
+    'radial': Radial flow around the center of mass, positive in the
+        clockwise direction.
+
+    'visc': Viscous dissipation of the mass weighted flow, for the
+        viscosity `VISCOSITY`.
+
+    'grad_rho_x', 'grad_rho_y': Gradient of the mass along x and y.
+
+    'evaporation': Evaporation term u . (grad rho) of the flow and mass.
+
+    'grid_order': Indices which order the bins in rows of y, as sorted
+        by `FlowData.sort`.
+
+The viscous dissipation and gradients are calculated on the grid of
+the system, which requires that its `shape` and `spacing` are set.
+
+"""
+
+# Labels of the derived physical fields, which can be viewed and sampled
+FIELD_LABELS = ('flow', 'radial', 'visc', 'grad_rho_x', 'grad_rho_y', 'evaporation')
+
+# Viscosity of the liquid for the viscous dissipation field
+VISCOSITY = 8.77e-4
+
+
+def _get_grid_values(flow, values):
+    """Return values of the bins as a 2D array of shape (ny, nx)."""
+
+    nx, ny = flow.shape
+
+    if None in (nx, ny) or None in flow.spacing:
+        raise ValueError("the `shape` and `spacing` of the system must be set "
+            "to calculate fields on its grid")
+
+    if isinstance(flow, RegularGridFlowData):
+        return values.reshape(ny, nx)
+
+    return values[flow.get_field('grid_order')].reshape(ny, nx)
+
+
+def _get_bin_values(flow, grid_values):
+    """Return values of a 2D array on the grid in the order of the bins."""
+
+    if isinstance(flow, RegularGridFlowData):
+        return grid_values.ravel()
+
+    values = np.empty(grid_values.size, dtype=grid_values.dtype)
+    values[flow.get_field('grid_order')] = grid_values.ravel()
+
+    return values
+
+
+def _get_mass_gradient(flow, axis):
+    """Return the gradient of the mass along an axis (0 for y, 1 for x) of the grid."""
+
+    dx, dy = flow.spacing
+    ms = _get_grid_values(flow, flow.get_field('M'))
+
+    gradient = np.gradient(ms, (dy, dx)[axis], axis=axis, edge_order=1)
+
+    return _get_bin_values(flow, gradient)
+
+
+@register_derived_field('grid_order', ('X', 'Y'))
+def get_grid_order(flow):
+    return np.lexsort((flow.get_field('X'), flow.get_field('Y')))
+
+
+@register_derived_field('flow', ('U', 'V'))
+def get_absolute_flow(flow):
+    return np.sqrt(flow.get_field('U')**2 + flow.get_field('V')**2)
+
+
+@register_derived_field('radial', ('X', 'Y', 'U', 'V', 'M'))
+def get_radial_flow(flow):
+    x0, y0 = sample_center_of_mass(flow)
+    xs, ys, us, vs = (flow.get_field(l) for l in ('X', 'Y', 'U', 'V'))
+
+    radial_angle = np.arctan2(ys - y0, xs - x0)
+
+    return us * np.sin(radial_angle) - vs * np.cos(radial_angle)
+
+
+@register_derived_field('visc', ('X', 'Y', 'U', 'V', 'M'), needs_grid=True)
+def get_viscous_dissipation(flow):
+    # The dissipation is sampled on a sorted copy, unless on a regular grid
+    grid_flow = flow if isinstance(flow, RegularGridFlowData) else flow.copy()
+
+    dissipation = sample_viscous_dissipation(grid_flow, VISCOSITY,
+        weight_label='M')
+
+    return _get_bin_values(flow, dissipation)
+
+
+@register_derived_field('grad_rho_x', ('X', 'Y', 'M'), needs_grid=True)
+def get_mass_gradient_x(flow):
+    return _get_mass_gradient(flow, 1)
+
+
+@register_derived_field('grad_rho_y', ('X', 'Y', 'M'), needs_grid=True)
+def get_mass_gradient_y(flow):
+    return _get_mass_gradient(flow, 0)
+
+
+@register_derived_field('evaporation', ('U', 'V', 'grad_rho_x', 'grad_rho_y'),
+        needs_grid=True)
+def get_evaporation(flow):
+    return flow.get_field('U') * flow.get_field('grad_rho_x') \
+        + flow.get_field('V') * flow.get_field('grad_rho_y')
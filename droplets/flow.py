@@ -1,5 +1,337 @@
 import numpy as np
 
+from collections import namedtuple
+from collections.abc import MutableMapping
+from types import MappingProxyType
+
+# Labels of bin indices along x and y in sparse data
+INDEX_LABELS = ('IX', 'IY')
+
+# Floating point precisions which data can be set to use
+PRECISIONS = ('float32', 'float64')
+
+# Set floating point precision of data, see `set_precision`
+_precision = {'dtype': None}
+
+# A registered derived field, see `register_derived_field`
+DerivedField = namedtuple('DerivedField', ['function', 'depends', 'needs_grid'])
+
+# Registered derived fields by label
+_derived_fields = {}
+
+
+def set_precision(precision):
+    """Set the floating point precision to store data with.
+
+    By default data keeps the precision it was read or created with. When
+    a precision is set, the data readers, `FlowData` objects and the
+    averaging and resampling of maps store all floating point data with it.
+    Sums and means are still accumulated in double precision before they
+    are stored.
+
+    Args:
+        precision (str): Either 'float32' or 'float64', or None to reset
+            to the default.
+
+    Raises:
+        ValueError: If the precision is not one of the above.
+
+    """
+
+    if precision is None:
+        _precision['dtype'] = None
+    elif str(precision) in PRECISIONS:
+        _precision['dtype'] = np.dtype(str(precision))
+    else:
+        raise ValueError("precision must be one of %r, not %r"
+            % (PRECISIONS, precision))
+
+
+def get_precision():
+    """Return the set floating point data-type, or None if not set."""
+
+    return _precision['dtype']
+
+
+def get_float_dtype(default=np.float64):
+    """Return the data-type to store floating point data with.
+
+    This is the set precision if one has been set, otherwise the input
+    default data-type.
+
+    """
+
+    dtype = get_precision()
+
+    return dtype if dtype is not None else np.dtype(default)
+
+
+
+def register_derived_field(label, depends, needs_grid=False):
+    """Return a decorator which registers a function as a derived field.
+
+    Derived fields are requested from FlowData objects by `get_field`
+    like the stored fields. The function is called with the object and
+    returns an array with a value for every bin, in the order of the bins.
+    It should request the fields it depends on through `get_field`, which
+    calculates every derived field once. The fields derived by this
+    package are registered in `droplets.derived`.
+
+    Args:
+        label (str): Label of the derived field.
+
+        depends (list): Labels of the stored or derived fields which the
+            field is calculated from.
+
+    Keyword Args:
+        needs_grid (bool, default=False): Whether the field is calculated
+            on the full grid of the system. Sparse objects must then be
+            expanded by `densify` before it is requested.
+
+    """
+
+    def register(function):
+        _derived_fields[label] = DerivedField(function, tuple(depends), needs_grid)
+        return function
+
+    return register
+
+
+def get_derived_field(label):
+    """Return the registered `DerivedField` of a label, or None if not registered."""
+
+    # Importing the module registers the fields derived by this package
+    import droplets.derived
+
+    return _derived_fields.get(label)
+
+
+def get_stored_dependencies(label):
+    """Return the labels of the stored fields which a field is derived from.
+
+    Labels which are not derived fields are returned as their own dependency.
+
+    """
+
+    derived = get_derived_field(label)
+
+    if derived is None:
+        return [label]
+
+    labels = []
+
+    for depend in derived.depends:
+        for l in get_stored_dependencies(depend):
+            if l not in labels:
+                labels.append(l)
+
+    return labels
+
+
+def _read_only(values):
+    """Return an array which is marked read-only."""
+
+    values.flags.writeable = False
+    return values
+
+
+def _as_field(values, dtype, copy=False):
+    """Return values as a contiguous 1D array of a data-type.
+
+    Arrays which are contiguous and of the data-type are not copied unless
+    `copy` is set. A new view of them is returned, so that marking it
+    read-only does not affect the input array.
+
+    """
+
+    if copy:
+        values = np.array(values, dtype=dtype, order='C')
+    else:
+        values = np.ascontiguousarray(values, dtype=dtype)
+
+    return values.reshape(-1)
+
+
+def _take(columns, label, indices):
+    """Return the values of a field at indices, through any selections."""
+
+    if isinstance(columns, _SelectedColumns) and label not in columns._taken:
+        return _take(columns._source, label, columns._indices[indices])
+
+    return columns[label][indices]
+
+
+class _SelectedColumns(MutableMapping):
+    """Fields of a selection of bins, which are taken when accessed.
+
+    The fields are selected by indices from the read-only fields of another
+    object, which are shared. Every field is taken once when it is first
+    accessed. Selections of selections take their fields directly from
+    the original fields. Fields which are set replace the selected fields.
+
+    Args:
+        columns (mapping): Fields to select from. The mapping is copied
+            but not the arrays.
+
+        indices (ndarray): Indices of the selected bins.
+
+    """
+
+    def __init__(self, columns, indices, taken=None):
+        self._source = columns.copy()
+        self._indices = indices
+        self._taken = {} if taken is None else taken
+        self._labels = dict.fromkeys(list(columns.keys()) + list(self._taken.keys()))
+
+
+    def __getitem__(self, label):
+        if label not in self._taken:
+            if label not in self._labels:
+                raise KeyError(label)
+
+            self._taken[label] = _read_only(_take(self._source, label, self._indices))
+
+        return self._taken[label]
+
+
+    def __setitem__(self, label, values):
+        self._taken[label] = values
+        self._labels[label] = None
+
+
+    def __delitem__(self, label):
+        del self._labels[label]
+        self._taken.pop(label, None)
+
+
+    def __iter__(self):
+        return iter(self._labels)
+
+
+    def __len__(self):
+        return len(self._labels)
+
+
+    @property
+    def size(self):
+        """Number of selected bins."""
+
+        return self._indices.size
+
+
+    def copy(self):
+        """Return a copy which shares the source fields and taken arrays."""
+
+        columns = _SelectedColumns({}, self._indices, dict(self._taken))
+        columns._source = self._source
+        columns._labels = self._labels.copy()
+
+        return columns
+
+
+class ScatteredFields(MutableMapping):
+    """Fields of a full grid which are expanded from its stored bins when accessed.
+
+    Maps which store only their non-empty bins with their bin indices
+    along x and y are expanded onto the full grid one field at a time,
+    when the field is first accessed. The stored values of fields which
+    are never used are thus never read, such as those of a memory mapped
+    file. FlowData objects which are created from the fields keep them
+    unexpanded until they are used.
+
+    The expanded arrays are read-only and shared with copies of the
+    mapping. Fields which are set replace the expanded fields.
+
+    Args:
+        values (mapping): Stored values of the bins by field label,
+            including the bin indices 'IX' and 'IY'.
+
+        shape (2-tuple): Number of bins of the grid along x and y.
+
+        dtype (data-type): Data-type of the expanded fields.
+
+    Keyword Args:
+        fields (mapping, optional): Fields which are already expanded onto
+            the grid, such as the coordinates. They are ordered first.
+
+    """
+
+    def __init__(self, values, shape, dtype, fields=None):
+        fields = {} if fields is None else fields
+
+        self._values = values
+        self._shape = tuple(int(n) for n in shape)
+        self._dtype = np.dtype(dtype)
+        self._expanded = {}
+        self._indices = []
+        self._fields = {l: _read_only(values) for l, values in fields.items()}
+        self._labels = dict.fromkeys(list(fields.keys())
+            + [l for l in values.keys() if l not in INDEX_LABELS])
+
+
+    def __getitem__(self, label):
+        if label in self._fields:
+            return self._fields[label]
+
+        if label not in self._labels:
+            raise KeyError(label)
+
+        if label not in self._expanded:
+            if not self._indices:
+                ix, iy = (self._values[l].astype(np.int64) for l in INDEX_LABELS)
+                self._indices.append(ix * self._shape[1] + iy)
+
+            values = np.zeros(self.size, dtype=self._dtype)
+            values[self._indices[0]] = self._values[label]
+            self._expanded[label] = _read_only(values)
+
+        return self._expanded[label]
+
+
+    def __setitem__(self, label, values):
+        self._fields[label] = values
+        self._labels[label] = None
+
+
+    def __delitem__(self, label):
+        del self._labels[label]
+        self._fields.pop(label, None)
+
+
+    def __iter__(self):
+        return iter(self._labels)
+
+
+    def __len__(self):
+        return len(self._labels)
+
+
+    @property
+    def dtype(self):
+        """Data-type of the expanded fields."""
+
+        return self._dtype
+
+
+    @property
+    def size(self):
+        """Number of bins of the grid."""
+
+        return self._shape[0] * self._shape[1]
+
+
+    def copy(self):
+        """Return a copy which shares the stored values and expanded arrays."""
+
+        fields = ScatteredFields({}, self._shape, self._dtype)
+        fields._values = self._values
+        fields._expanded = self._expanded
+        fields._indices = self._indices
+        fields._fields = self._fields.copy()
+        fields._labels = self._labels.copy()
+
+        return fields
+
 
 class FlowData(object):
     """Container for flow field data.
@@ -21,6 +353,12 @@ class FlowData(object):
         info (dict, optional): Dict with system information.
 
         dtype (data-type, optional): The desired Numpy data-type of record.
+            If not set, floating point data is stored with the precision
+            set by `set_precision`, if any.
+
+        copy (bool, default=False): Copy the input arrays. By default
+            contiguous arrays of the stored data-type are used without
+            copying, see `set_data`.
 
     Example:
         import numpy as np
@@ -39,18 +377,109 @@ class FlowData(object):
 
         data = [('X', X), ('Y', Y), ('U', U), ('V', V), ('mass', M)]
         flow = FlowData(*data, info=info)
-        flow.data['X'] is X
-        flow.data['V'] is V
-        flow.data['mass'] is M
+        np.array_equal(flow.data['X'], X.ravel())
+        np.array_equal(flow.data['V'], V.ravel())
+        np.array_equal(flow.data['mass'], M.ravel())
+
+    Sparse data: Maps which only contain their non-empty bins can be
+    stored by adding the integer bin indices along x and y of every bin
+    as the fields 'IX' and 'IY'. The `shape` then describes the full grid
+    and the object can be expanded to it by `densify`.
+
+    Storage: Every field is stored as a separate contiguous array, which
+    is accessed through `fields`. These arrays are read-only and shared
+    between objects: `copy` shares all of them and `translate`, `sort`
+    and `add_field` only create the arrays which change. The `data`
+    record of all fields is created from the arrays when it is accessed
+    and then holds the data, so that it can be modified in-place as
+    before. The arrays of `fields` are then read-only views of the
+    record, which see all changes made through it. Adding a field which
+    can not be stored in the record moves the data back into separate arrays, after
+    which a previously accessed record is no longer connected to the
+    object. Input arrays of the stored data-type are adopted as
+    the fields without copying them, such as the arrays of data maps
+    which are read from a buffer, unless `copy` is set.
+
+    The objects returned by `lims` and `cut` share the arrays of the
+    object they were selected from, and only take the values of their
+    selected bins from a field when it is first accessed.
+
+    Derived fields: Fields which are calculated from the stored fields,
+    such as the absolute flow, are requested by `get_field` with their
+    label. See `register_derived_field` and `droplets.derived`.
 
     """
 
+    # Calculated derived fields with the inputs they were calculated from
+    _derived = None
+
+    # Record which holds the data after it has been accessed, see `data`
+    _record = None
+
     def __init__(self, *input_data, **kwargs):
         self.set_data(*input_data, **kwargs)
         self.set_info(kwargs.pop('info', {}))
         return
 
 
+    @classmethod
+    def _from_columns(cls, columns, info):
+        """Create an object from a dict of arrays without copying them."""
+
+        flow = cls.__new__(cls)
+
+        if isinstance(columns, (_SelectedColumns, ScatteredFields)):
+            flow._columns = columns.copy()
+        else:
+            flow._columns = {l: _read_only(values) for l, values in columns.items()}
+
+        flow.set_info(info)
+
+        return flow
+
+
+    @property
+    def data(self):
+        """Record with the data of all fields.
+
+        The record is created from the field arrays and then holds the
+        data. It can be modified in-place or set.
+
+        """
+
+        if self._record is None:
+            dtype = [(l, values.dtype) for l, values in self._columns.items()]
+            size = self._size()
+
+            record = np.empty(size, dtype=dtype)
+            for l, values in self._columns.items():
+                record[l] = values
+
+            self._hold_record(record)
+
+        return self._record
+
+
+    @data.setter
+    def data(self, data):
+        self._hold_record(data)
+        self._derived = None
+
+
+    @property
+    def fields(self):
+        """Read-only mapping of field labels to contiguous data arrays.
+
+        The arrays are read-only since they can be shared with copies
+        of the object. Use `add_field` to add or replace a field. If the
+        data is held in the `data` record the arrays are views of it,
+        which are not contiguous.
+
+        """
+
+        return MappingProxyType(self._columns)
+
+
     @property
     def num_bins(self):
         """Number of bins in the system."""
@@ -126,37 +555,276 @@ class FlowData(object):
     @property
     def properties(self):
         """Return list of data parameters."""
-        return self.data.dtype.names
+
+        return tuple(self._columns.keys())
+
+
+    @property
+    def is_sparse(self):
+        """Whether the data only contains a subset of bins with indices."""
+
+        return all(l in self.properties for l in INDEX_LABELS)
 
 
     def copy(self):
-        """Return a deep copy of the FlowData object."""
+        """Return a copy of the FlowData object.
+
+        The field arrays are shared with the copy until either object
+        changes them. If the data is held in a record it is copied.
+
+        """
+
+        if self._record is not None:
+            flow = self._from_columns({}, self._info)
+            flow.data = self._record.copy()
+
+            return flow
+
+        return self._from_columns(self._columns, self._info)
+
+
+    def add_field(self, label, values, copy=False):
+        """Add a field to the data or replace an existing one.
+
+        The other fields are not copied. Floating point values are
+        stored with the precision set by `set_precision`, if any.
+
+        Args:
+            label (str): Label of the field.
+
+            values (array_like): Data of the field, with a value for every
+                bin or a single value which is set for all bins.
+
+        If the data is held in the `data` record, a field of the record
+        with the same data-type is replaced in it. Otherwise the data is
+        moved to separate arrays and the record is no longer connected
+        to the object.
+
+        Keyword Args:
+            copy (bool, default=False): Copy the values. By default an array
+                of the stored data-type is used without copying, as for
+                `set_data`.
+
+        Raises:
+            ValueError: If the number of values does not match the bins.
+
+        """
+
+        columns = self._columns
+        size = self._size()
+
+        values = np.asarray(values)
+        dtype = values.dtype
+        if np.issubdtype(dtype, np.floating):
+            dtype = get_float_dtype(dtype)
+
+        if values.size == 1 and size != 1:
+            values = np.full(size, values.ravel()[0], dtype=dtype)
+        elif values.size != size and len(columns) > 0:
+            raise ValueError("added array_like objects not all of equal size.")
+
+        if self._record is not None:
+            # Fields of the record are replaced in it to keep it connected
+            if label in self._record.dtype.names and self._record.dtype[label] == dtype:
+                self._record[label] = values
+                return
+
+            self._columns = {l: _read_only(np.array(self._record[l]))
+                for l in self._record.dtype.names}
+            self._record = None
+
+        self._columns[label] = _read_only(_as_field(values, dtype, copy))
+
+
+    def densify(self, coord_labels=('X', 'Y')):
+        """Return a copy of the data expanded onto its full grid.
+
+        Bins which are not present in the sparse data are added with zeros
+        for all fields except the coordinates, which are set from the
+        bin indices and spacing. The returned object does not contain
+        the index fields and is sorted in x-major, y-minor order, like
+        the data read from a file. Objects which are not sparse are
+        returned as a copy.
+
+        Args:
+            coord_labels (2-tuple, default=('X', 'Y'): Record labels for coordinates.
 
-        data_array = [(l, self.data[l]) for l in self.data.dtype.names]
-        return FlowData(*data_array, info=self._info)
+        Returns:
+            FlowData: New object with all bins of the grid.
+
+        Raises:
+            ValueError: If the `shape` or `spacing` is not set.
+
+        """
+
+        def get_grid_coords(coords, indices, num, x0, dx):
+            # Use a present bin as a reference to retain translations
+            try:
+                return coords[0] + dx * (np.arange(num) - int(indices[0]))
+            except IndexError:
+                return x0 + dx * (np.arange(num) + 0.5)
+
+        if not self.is_sparse:
+            return self.copy()
+
+        nx, ny = self.shape
+        dx, dy = self.spacing
+        x0, y0 = self.origin
+
+        if None in (nx, ny, dx, dy):
+            raise ValueError("the `shape` and `spacing` of the system must be "
+                "set to densify sparse data")
+
+        if None in (x0, y0):
+            x0, y0 = 0., 0.
+
+        xl, yl = coord_labels
+        ix, iy = (self._field(l).astype(np.int64) for l in INDEX_LABELS)
+
+        inds = ix * ny + iy
+        columns = {}
+
+        for l in self.properties:
+            if l not in INDEX_LABELS:
+                values = self._field(l)
+                columns[l] = np.zeros(nx * ny, dtype=values.dtype)
+                columns[l][inds] = values
+
+        x = get_grid_coords(self._field(xl), ix, nx, x0, dx)
+        y = get_grid_coords(self._field(yl), iy, ny, y0, dy)
+        xs, ys = np.meshgrid(x, y, indexing='ij')
+
+        columns[xl][:] = xs.ravel()
+        columns[yl][:] = ys.ravel()
+
+        info = self._info
+        info['num_bins'] = nx * ny
+
+        return FlowData._from_columns(columns, info)
+
+
+    def get_field(self, label):
+        """Return the data of a stored or derived field.
+
+        Derived fields are calculated when they are first requested and
+        then kept. They are calculated again when requested after a field
+        which they depend on or the system information has changed.
+        Stored fields take precedence over derived fields with the
+        same label. While the data is held in the `data` record, which
+        can be modified in-place, derived fields are calculated for
+        every request.
+
+        Args:
+            label (str): Label of field.
+
+        Returns:
+            ndarray: Read-only data with a value for every bin.
+
+        Raises:
+            KeyError: If the label is not a stored or derived field.
+
+            ValueError: If the derived field is calculated on the full grid
+                and the object is sparse.
+
+        """
+
+        if label in self.properties:
+            return self.fields[label]
+
+        derived = get_derived_field(label)
+
+        if derived is None:
+            raise KeyError("FlowData object has no field with label %r" % label)
+
+        if derived.needs_grid and self.is_sparse:
+            raise ValueError("the derived field %r requires the full grid: "
+                "use `densify` before requesting it" % label)
+
+        if self._derived is None:
+            self._derived = {}
+
+        # Fields are replaced when changed, which is seen by their identity,
+        # but changes made in-place to a record can not be seen
+        inputs = [self.get_field(l) for l in derived.depends]
+        info = self._info
+        keep = self._record is None
+
+        if keep and label in self._derived:
+            values, cached_inputs, cached_info = self._derived[label]
+
+            if cached_info == info \
+                    and all(a is b for a, b in zip(cached_inputs, inputs)):
+                return values
+
+        values = np.asarray(derived.function(self)).ravel()
+
+        if values.size != self._size():
+            raise ValueError("derived field %r does not have a value for "
+                "every bin" % label)
+
+        if keep:
+            self._derived[label] = (_read_only(values), inputs, info)
+
+        return _read_only(values)
 
 
     def get_data(self, label):
         """Return data for a parameter label."""
 
-        return self.data[label] if label in self.properties else None
+        return self._field(label) if label in self.properties else None
 
 
     def cut(self, xlim=(None, None), ylim=(None, None)):
+        """Return new FlowData object with bins within coordinate limits.
+
+        The bins are selected in a single pass over the coordinates and
+        the fields of the new object are taken when accessed, see `lims`.
+        The `shape` is set from the number of rows and columns of the grid
+        within the limits, which are calculated from the `origin`, `shape`
+        and `spacing` without searching the selected coordinates.
+
+        Args:
+            xlim/ylim (2-tuple, optional): Minimum and maximum coordinates
+                of the bins to include. Limits which are None default to
+                the edges of the system.
+
+        Returns:
+            FlowData: New object with selected bins.
+
+        """
+
+        def get_num_within(label, vmin, vmax, origin, num, spacing):
+            # The bins of an axis are found from the position of the first
+            # bin, which is placed on the grid by its index from the origin
+            x = self._field(label)[0]
+            x0 = x - spacing * np.floor((x - origin) / spacing + 1e-6)
+
+            imin = max(0, int(np.ceil((vmin - x0) / spacing - 1e-6)))
+            imax = min(num - 1, int(np.floor((vmax - x0) / spacing + 1e-6)))
+
+            return max(0, imax - imin + 1)
+
         max_coords = [o + n * dx
                 for o, n, dx in zip(self.origin, self.shape, self.spacing)
                 ]
         xmin, xmax = xlim
         xmin = xmin if xmin != None else self.origin[0]
         xmax = xmax if xmax != None else max_coords[0]
-        flow = self.lims('X', xmin, xmax)
 
         ymin, ymax = ylim
         ymin = ymin if ymin != None else self.origin[1]
         ymax = ymax if ymax != None else max_coords[1]
-        flow = flow.lims('Y', ymin, ymax)
 
-        shape = [len(np.unique(flow.data[l])) for l in ('X', 'Y')]
+        inds = self._get_limits_mask('X', xmin, xmax) \
+            & self._get_limits_mask('Y', ymin, ymax)
+        flow = self._select(inds, {})
+
+        if flow._size() == 0:
+            shape = (0, 0)
+        else:
+            shape = [get_num_within(l, vmin, vmax, o, n, dx)
+                for l, vmin, vmax, o, n, dx in zip(('X', 'Y'), (xmin, ymin),
+                    (xmax, ymax), self.origin, self.shape, self.spacing)]
 
         info = {
             'spacing': self.spacing,
@@ -181,40 +849,31 @@ class FlowData(object):
         Since a new object is returned this method can be chained to
         select along many different data at once.
 
+        No data is copied by this method. The new object shares the fields
+        of this object and takes the values of the selected bins from
+        a field when it is first accessed. If the data is held in the
+        `data` record the fields are instead copied, since the record
+        can be modified.
+
         Args:
             label (str): Label of data to limit values for.
 
             vmin/vmax (float/None): Minimum and maximum values of input
-                label to include in the returned object. Either or both
-                values can be `None` to not apply a cut in that direction.
-
-        Return:
-            FlowData: New object with selected bins.
-
-        """
-
-        vmin = vmin if vmin != None else -np.inf
-        vmax = vmax if vmax != None else np.inf
-
-        try:
-            inds = (self.data[label] >= vmin) & (self.data[label] <= vmax)
-        except ValueError:
-            raise KeyError("FlowData object has no data with input label %r" % label)
-        except TypeError:
-            raise TypeError("bad input limits (%r, %r): must be float or None" % (vmin, vmax))
+                label to include in the returned object. Either or both
+                values can be `None` to not apply a cut in that direction.
+
+        Return:
+            FlowData: New object with selected bins.
 
-        data = self.data[inds]
+        """
 
-        info = {
-            'num_bins': data.size
-        }
+        inds = self._get_limits_mask(label, vmin, vmax)
+        info = {}
 
         if self.spacing != (None, None):
             info['spacing'] = self.spacing
 
-        data_list = [(l, data[l]) for l in data.dtype.names]
-
-        return FlowData(*data_list, info=info, dtype=data.dtype)
+        return self._select(inds, info)
 
 
     def set_data(self, *data, **kwargs):
@@ -226,11 +885,27 @@ class FlowData(object):
                 {label: data} or (label, data). All data arrays must be
                 of equal length.
 
+        Input arrays which are contiguous (or can be viewed as 1D arrays
+        without copying) and have the stored data-type of their field
+        are used as the fields without copying them, unless `copy` is set.
+        The object then shares the arrays with the caller, which must not
+        modify them while the object is used. Other input is copied into
+        new arrays. A single `ScatteredFields` input is kept as it is, so
+        that its fields are expanded when they are first used.
+
         Keyword Args:
             dtype (data-type, optional): The desired Numpy data-type of record.
                 If a single dtype_like, all fields are cast to that type.
                 Can also be a complex data-type if the fields catch all
-                labels of the input data.
+                labels of the input data. If not set, floating point data
+                is cast to the precision set by `set_precision`, if any.
+
+            copy (bool, default=False): Always copy the input arrays.
+
+        Raises:
+            ValueError: If the input arrays are not all of equal size, or
+                an input label is not a field of the data-type or its data
+                can not be stored with it.
 
         """
 
@@ -246,7 +921,7 @@ class FlowData(object):
             for data in input_data:
                 if type(data) == tuple:
                     add_data(*data)
-                elif type(data) == dict:
+                elif type(data) == dict or isinstance(data, ScatteredFields):
                     for label, values in data.items():
                         add_data(label, values)
                 else:
@@ -263,6 +938,12 @@ class FlowData(object):
 
             """
 
+            def apply_precision(atype):
+                if np.issubdtype(atype, np.floating):
+                    return get_float_dtype(atype)
+
+                return atype
+
             # If explicit data-type fields are set, return them
             if len(np.dtype(dtype)) != 0:
                 return np.dtype(dtype)
@@ -277,10 +958,21 @@ class FlowData(object):
                         atype = values.dtype
                     except AttributeError:
                         atype = type(values[0])
+                    atype = apply_precision(atype)
                 types.append((label, atype))
 
             return np.dtype(types)
 
+        self._record = None
+        self._derived = None
+
+        # Fields which are expanded when accessed are kept unexpanded
+        if len(data) == 1 and isinstance(data[0], ScatteredFields) \
+                and kwargs.get('dtype') is None and not kwargs.get('copy', False) \
+                and data[0].dtype == get_float_dtype(data[0].dtype):
+            self._columns = data[0].copy()
+            return
+
         try:
             data_list = collate_input_data(data)
         except TypeError:
@@ -290,15 +982,39 @@ class FlowData(object):
         num_data = len(data_list)
         sizeof = np.size(data_list[0][1])
 
-        # Get record data-type and allocate memory
+        # Get the data-type of every field and store them as separate arrays
         array_type = get_dtype(data_list, kwargs.pop('dtype', None))
-        self.data = np.zeros((1,sizeof), dtype=array_type).ravel()
+        input_data = dict(data_list)
 
-        try:
-            for label, bindata in data_list:
-                self.data[label] = np.array(bindata).ravel()
-        except ValueError:
-            raise ValueError("added array_like objects not all of equal size.")
+        for label in input_data:
+            if label not in array_type.names:
+                raise ValueError("input data label %r is not a field of the "
+                    "data-type %r" % (label, array_type))
+
+        self._columns = {}
+
+        copy = kwargs.pop('copy', False)
+
+        for label in array_type.names:
+            dtype = array_type[label]
+
+            if label not in input_data:
+                values = np.zeros(sizeof, dtype=dtype)
+            else:
+                values = np.asarray(input_data[label])
+
+                if values.size == 1 and sizeof != 1:
+                    values = np.full(sizeof, values.ravel()[0], dtype=dtype)
+                elif values.size != sizeof:
+                    raise ValueError("added array_like objects not all of equal size.")
+
+                try:
+                    values = _as_field(values, dtype, copy)
+                except (TypeError, ValueError) as exc:
+                    raise ValueError("input data of label %r can not be stored "
+                        "as %r: %s" % (label, dtype, exc))
+
+            self._columns[label] = _read_only(values)
 
 
     def set_info(self, info):
@@ -361,7 +1077,17 @@ class FlowData(object):
         """
 
         order = list(reversed(coord_labels))
-        self.data.sort(order=order)
+
+        if self._record is not None:
+            self._record.sort(order=order)
+            return
+
+        # As for sorting records the other fields break ties in their order
+        keys = order + [l for l in self.properties if l not in order]
+        inds = np.lexsort([self._columns[l] for l in reversed(keys)])
+
+        self._columns = {l: _read_only(values[inds])
+            for l, values in self._columns.items()}
 
 
     def translate(self, label, value):
@@ -381,16 +1107,77 @@ class FlowData(object):
         flow = self.copy()
 
         try:
-            flow.data[label] += value
-        except ValueError as exc:
-            if 'broadcast' in str(exc):
-                raise ValueError(exc)
-            else:
-                raise KeyError("No label %r in object")
+            values = flow._columns[label]
+        except KeyError:
+            raise KeyError("No label %r in object" % label)
+
+        # Only the translated field is created, the others are shared
+        translated = np.empty_like(values)
+        np.add(values, value, out=translated)
+
+        if flow._record is not None:
+            flow._record[label] = translated
+        else:
+            flow._columns[label] = _read_only(translated)
 
         return flow
 
 
+    def _get_limits_mask(self, label, vmin, vmax):
+        """Return a mask of the bins with values of a label within limits."""
+
+        vmin = vmin if vmin != None else -np.inf
+        vmax = vmax if vmax != None else np.inf
+
+        try:
+            values = self._field(label)
+        except (KeyError, ValueError):
+            raise KeyError("FlowData object has no data with input label %r" % label)
+
+        try:
+            return (values >= vmin) & (values <= vmax)
+        except TypeError:
+            raise TypeError("bad input limits (%r, %r): must be float or None" % (vmin, vmax))
+
+
+    def _select(self, inds, info):
+        """Return a new object with the bins of a mask and input info."""
+
+        if self._record is not None:
+            columns = {l: self._field(l)[inds] for l in self.properties}
+        else:
+            columns = _SelectedColumns(self._columns, np.flatnonzero(inds))
+
+        info = dict(info, num_bins=np.count_nonzero(inds))
+
+        return FlowData._from_columns(columns, info)
+
+
+    def _field(self, label):
+        """Return the data of a field."""
+
+        return self._columns[label]
+
+
+    def _hold_record(self, record):
+        """Hold the data in a record, with the fields as read-only views of it."""
+
+        self._record = record
+        self._columns = {l: _read_only(record[l]) for l in record.dtype.names}
+
+
+    def _size(self):
+        """Return the number of stored bins."""
+
+        if self._record is not None:
+            return self._record.size
+
+        if isinstance(self._columns, (_SelectedColumns, ScatteredFields)):
+            return self._columns.size
+
+        return next((values.size for values in self._columns.values()), 0)
+
+
     @property
     def _info(self):
         """Access to the set properties of the object."""
@@ -401,3 +1188,432 @@ class FlowData(object):
             'shape': self.shape,
             'spacing': self.spacing
         }
+
+
+class RegularGridFlowData(FlowData):
+    """Container for flow field data of all bins of a regular grid.
+
+    The bins are stored in rows of constant y, which are ordered by
+    increasing y and contain the bins in order of increasing x. This
+    is the order of `FlowData.sort`. Every field can thus be accessed
+    as a 2D array of shape (ny, nx) by `get_grid`, or by rows and
+    columns. The coordinates are implicit from the position of the
+    first bin and the spacing, which gives the indices of the bin at
+    any position without a search.
+
+    Input data is created as for `FlowData`, in any order of the bins.
+    If the coordinates are not input they are created for the bin
+    centres from the `origin` and `spacing`. Use `from_flow` to create
+    an object from a `FlowData` object.
+
+    The bin order must not be changed when modifying the data.
+
+    Objects returned by `cut` hold their fields as 2D views of the grid
+    they were cut from. The views are copied into contiguous arrays when
+    the fields are accessed through `fields` or `data`, but not when
+    accessed through `get_grid`, `get_row` or `get_column`.
+
+    Args:
+        input_data (2-tuples, dict's): Each input argument must be
+            either a dict or 2-tuple object with labeled data:
+            {label: data} or (label, data). All data arrays must be
+            of equal length.
+
+    Keyword Args:
+        info (dict): Dict with system information, must contain the
+            `shape` and `spacing` of the grid.
+
+        coord_labels (2-tuple, default=('X', 'Y'): Record labels for coordinates.
+
+        dtype (data-type, optional): The desired Numpy data-type of record.
+
+    Raises:
+        ValueError: If the `shape` or `spacing` is not set or the bins
+            are not all the bins of a regular grid.
+
+    """
+
+    # Fields held as 2D views by objects returned by `cut`, otherwise None
+    _grids = None
+
+    def __init__(self, *input_data, **kwargs):
+        coord_labels = kwargs.pop('coord_labels', ('X', 'Y'))
+        super().__init__(*input_data, **kwargs)
+        self._set_grid(coord_labels)
+        return
+
+
+    @classmethod
+    def from_flow(cls, flow, coord_labels=('X', 'Y')):
+        """Return a regular grid object with the data of a FlowData object.
+
+        Sparse objects are expanded to their full grid (see `densify`).
+        The fields are shared with the input object if the bins are
+        already in the order of the grid.
+
+        Args:
+            flow (FlowData): Object to create the grid from. Must have
+                its `shape` and `spacing` set.
+
+        Keyword Args:
+            coord_labels (2-tuple, default=('X', 'Y'): Record labels for coordinates.
+
+        Returns:
+            RegularGridFlowData: New object with the data.
+
+        Raises:
+            ValueError: If the bins of the object are not a regular grid.
+
+        """
+
+        flow = flow.densify(coord_labels=coord_labels)
+
+        grid_flow = cls._from_columns(flow.fields, flow._info)
+        grid_flow._set_grid(coord_labels)
+
+        return grid_flow
+
+
+    @property
+    def coord_labels(self):
+        """Labels of the coordinates of the grid as a 2-tuple."""
+
+        return self._coord_labels
+
+
+    @property
+    def data(self):
+        """Record with the data of all fields, see `FlowData.data`."""
+
+        self._flatten_grids()
+
+        return super().data
+
+
+    @data.setter
+    def data(self, data):
+        self._grids = None
+        FlowData.data.fset(self, data)
+
+
+    @property
+    def fields(self):
+        """Read-only mapping of field labels to data arrays, see `FlowData.fields`."""
+
+        self._flatten_grids()
+
+        return super().fields
+
+
+    @property
+    def properties(self):
+        """Return list of data parameters."""
+
+        if self._grids is not None:
+            return tuple(self._grids.keys())
+
+        return super().properties
+
+
+    def copy(self):
+        """Return a copy of the object which shares the field arrays."""
+
+        if self._grids is not None:
+            flow = self._from_columns({}, self._info)
+            flow._columns = None
+            flow._grids = self._grids.copy()
+        else:
+            flow = super().copy()
+
+        flow._coord_labels = self._coord_labels
+        flow._set_centre()
+
+        return flow
+
+
+    def cut(self, xlim=(None, None), ylim=(None, None)):
+        """Return a new object with the bins within input coordinate limits.
+
+        The bins are selected as the rows and columns of the grid within
+        the limits, which are found from the coordinates without searching
+        all bins. Limits which are None do not cut the system.
+
+        No data is copied: the fields of the new object are 2D views of
+        the fields of this object. If the data is held in the `data`
+        record the fields are instead copied, since the record can
+        be modified.
+
+        Args:
+            xlim/ylim (2-tuple, optional): Minimum and maximum coordinates
+                of the bins to include.
+
+        Returns:
+            RegularGridFlowData: New object with the selected bins.
+
+        """
+
+        def get_index_range(values, lims):
+            vmin, vmax = lims
+            imin = 0 if vmin == None else np.searchsorted(values, vmin, side='left')
+            imax = values.size if vmax == None \
+                else np.searchsorted(values, vmax, side='right')
+
+            return int(imin), int(max(imin, imax))
+
+        xs, ys = self.get_coords()
+        i0, i1 = get_index_range(xs, xlim)
+        j0, j1 = get_index_range(ys, ylim)
+
+        grids = {l: self.get_grid(l)[j0:j1, i0:i1] for l in self.properties}
+
+        origin = tuple(vmin if vmin != None else o
+            for vmin, o in zip((xlim[0], ylim[0]), self.origin))
+        shape = (i1 - i0, j1 - j0)
+
+        info = {
+            'spacing': self.spacing,
+            'origin': origin if None not in origin else None,
+            'shape': shape,
+            'num_bins': shape[0] * shape[1]
+        }
+
+        if shape[0] * shape[1] == 0:
+            return FlowData._from_columns(
+                {l: values.ravel() for l, values in grids.items()}, info)
+
+        flow = RegularGridFlowData._from_columns({}, info)
+        flow._coord_labels = self._coord_labels
+
+        if self._record is not None:
+            flow._columns = {l: _read_only(np.array(values).ravel())
+                for l, values in grids.items()}
+        else:
+            flow._columns = None
+            flow._grids = {l: _read_only(values) for l, values in grids.items()}
+
+        flow._set_centre()
+
+        return flow
+
+
+    def get_coords(self):
+        """Return the coordinates of the columns and rows of the grid.
+
+        Returns:
+            ndarray, ndarray: 2-tuple with the x coordinates of the columns
+                and the y coordinates of the rows.
+
+        """
+
+        xl, yl = self._coord_labels
+
+        return self.get_grid(xl)[0, :], self.get_grid(yl)[:, 0]
+
+
+    def get_grid(self, label):
+        """Return a read-only view of the data of a field as a 2D array of shape (ny, nx)."""
+
+        if self._grids is not None:
+            return self._grids[label]
+
+        nx, ny = self.shape
+
+        return self._field(label).reshape(ny, nx)
+
+
+    def get_index(self, x, y):
+        """Return the column and row indices of the bins at input coordinates.
+
+        The indices are calculated from the position of the first bin and
+        the spacing of the grid.
+
+        Args:
+            x, y (float or array_like): Coordinates to get the indices of.
+
+        Returns:
+            int, int: 2-tuple with the column and row indices, or two arrays
+                of indices if the coordinates are arrays.
+
+        Raises:
+            ValueError: If a coordinate is outside of the grid.
+
+        """
+
+        indices = []
+
+        for value, centre, spacing, num in zip((x, y), self._centre,
+                self.spacing, self.shape):
+            i = np.rint((np.asarray(value) - centre) / spacing).astype(np.int64)
+
+            if np.any((i < 0) | (i >= num)):
+                raise ValueError("coordinates (%r, %r) are outside of the grid"
+                    % (x, y))
+
+            indices.append(int(i) if i.ndim == 0 else i)
+
+        return tuple(indices)
+
+
+    def get_row(self, label, j):
+        """Return a view of the data of a field in row j (of constant y)."""
+
+        return self.get_grid(label)[j, :]
+
+
+    def get_column(self, label, i):
+        """Return a view of the data of a field in column i (of constant x)."""
+
+        return self.get_grid(label)[:, i]
+
+
+    def set_data(self, *data, **kwargs):
+        """Create and set a data record from input data, see `FlowData.set_data`."""
+
+        self._grids = None
+        super().set_data(*data, **kwargs)
+
+
+    def sort(self, coord_labels=('X', 'Y')):
+        """Sort the data in-place using the bin coordinates.
+
+        The bins of a regular grid are always sorted by its coordinates.
+
+        Raises:
+            ValueError: If the labels are not the coordinates of the grid.
+
+        """
+
+        if tuple(coord_labels) != self._coord_labels:
+            raise ValueError("the bins of a regular grid can only be sorted "
+                "by its coordinates %r" % (self._coord_labels, ))
+
+
+    def translate(self, label, value):
+        """Return a copy with the data of input label translated by input value.
+
+        Translating the coordinates by an array returns a `FlowData` object,
+        since the bins may then not be on a regular grid.
+
+        See `FlowData.translate` for details.
+
+        """
+
+        if self._grids is not None and np.size(value) == 1:
+            try:
+                values = self._grids[label]
+            except KeyError:
+                raise KeyError("No label %r in object" % label)
+
+            flow = self.copy()
+
+            translated = np.empty_like(values)
+            np.add(values, value, out=translated)
+            flow._grids[label] = _read_only(translated)
+            flow._set_centre()
+
+            return flow
+
+        flow = super().translate(label, value)
+
+        if label in self._coord_labels:
+            if np.size(value) != 1:
+                return FlowData._from_columns(flow.fields, flow._info)
+
+            flow._set_centre()
+
+        return flow
+
+
+    def _set_grid(self, coord_labels):
+        """Order the bins on the grid and set the position of the first bin.
+
+        Coordinates which are not in the data are created for the bin
+        centres from the origin and spacing.
+
+        """
+
+        nx, ny = self.shape
+        dx, dy = self.spacing
+
+        if None in (nx, ny, dx, dy):
+            raise ValueError("the `shape` and `spacing` of a regular grid "
+                "must be set")
+
+        if self._size() != nx * ny:
+            raise ValueError("the number of bins (%d) does not match the "
+                "grid shape (%d, %d)" % (self._size(), nx, ny))
+
+        if self.num_bins == None:
+            self.num_bins = nx * ny
+
+        self._coord_labels = tuple(coord_labels)
+        xl, yl = self._coord_labels
+
+        if xl not in self.properties or yl not in self.properties:
+            x0, y0 = self.origin if None not in self.origin else (0., 0.)
+            xs, ys = np.meshgrid(x0 + dx * (np.arange(nx) + 0.5),
+                y0 + dy * (np.arange(ny) + 0.5))
+
+            self.add_field(xl, xs.ravel())
+            self.add_field(yl, ys.ravel())
+            self._set_centre()
+
+            return
+
+        X, Y = self.fields[xl], self.fields[yl]
+        x0, y0 = np.min(X), np.min(Y)
+
+        ix = np.rint((X - x0) / dx).astype(np.int64)
+        iy = np.rint((Y - y0) / dy).astype(np.int64)
+
+        inds = iy * nx + ix
+
+        if np.any(ix >= nx) or np.any(iy >= ny) \
+                or np.any(np.bincount(inds, minlength=nx * ny) != 1) \
+                or not np.allclose(X, x0 + ix * dx, rtol=0., atol=1e-2 * abs(dx)) \
+                or not np.allclose(Y, y0 + iy * dy, rtol=0., atol=1e-2 * abs(dy)):
+            raise ValueError("the bins are not the bins of a regular grid "
+                "with the set `shape` and `spacing`")
+
+        # Bins in the order of the grid are not copied
+        if not np.array_equal(inds, np.arange(nx * ny)):
+            order = np.empty(nx * ny, dtype=np.int64)
+            order[inds] = np.arange(nx * ny)
+
+            self._columns = {l: _read_only(values[order])
+                for l, values in self._columns.items()}
+
+        self._set_centre()
+
+
+    def _field(self, label):
+        """Return the data of a field as a contiguous array."""
+
+        self._flatten_grids()
+
+        return super()._field(label)
+
+
+    def _flatten_grids(self):
+        """Copy fields held as 2D views into contiguous arrays."""
+
+        if self._grids is not None:
+            self._columns = {l: _read_only(np.ascontiguousarray(values).ravel())
+                for l, values in self._grids.items()}
+            self._grids = None
+
+
+    def _set_centre(self):
+        """Set the coordinates of the first bin from the data."""
+
+        self._centre = tuple(float(self.get_grid(l)[0, 0])
+            for l in self._coord_labels)
+
+
+    def _size(self):
+        """Return the number of stored bins."""
+
+        if self._grids is not None:
+            return next((values.size for values in self._grids.values()), 0)
+
+        return super()._size()
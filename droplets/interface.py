@@ -1,5 +1,7 @@
 import numpy as np
 
+from droplets.flow import INDEX_LABELS, RegularGridFlowData
+
 """Module for analysing a droplet interface.
 
 Contains functions for generating the droplet boundary and analysing
@@ -55,8 +57,8 @@ def get_contact_angle(flow, height, label, **kwargs):
             return ys[np.abs(ys - floor).argmin()]
 
     def get_coords(flow, indices):
-        y = flow.data[ylabel][indices[0]]
-        xs = np.array([flow.data[xlabel][i] for i in indices])
+        y = flow.fields[ylabel][indices[0]]
+        xs = np.array([flow.fields[xlabel][i] for i in indices])
         return y, xs
 
     def get_xdeltas(xs, xedges):
@@ -72,7 +74,7 @@ def get_contact_angle(flow, height, label, **kwargs):
 
     # Set ylims from an input floor
     floor = kwargs.pop('floor', None)
-    yfloor = get_floor_height(floor, flow.data[ylabel])
+    yfloor = get_floor_height(floor, flow.fields[ylabel])
     kwargs['ylims'] = (yfloor, None)
 
     interface = get_interface(flow, label, **kwargs)
@@ -119,6 +121,12 @@ def get_interface(flow, label, **kwargs):
     parameter value (the input label) larger than or equal to a cut-off
     value.
 
+    Sparse objects (see `droplets.flow.FlowData`) are searched without
+    being expanded: bins missing from the data are treated as empty.
+    For `droplets.flow.RegularGridFlowData` objects the layers and
+    their neighbourhoods are taken as rows of the grid for method (2),
+    without searching the data for them.
+
     Periodic boundary conditions are not applied for the radius search
     for method (1) above. This means that bins on the outermost edges
     of the system are searching for neighbouring bins in a smaller area
@@ -164,6 +172,11 @@ def get_interface(flow, label, **kwargs):
         if cutoff == None:
             vmin = np.min(data[label])
             vmax = np.max(data[label])
+
+            # Bins missing from sparse data are empty
+            if flow.is_sparse and data[label].size < np.prod(flow.shape):
+                vmin = min(vmin, 0.)
+
             assert (vmin != vmax)
 
             cutoff = 0.5 * (vmin + vmax)
@@ -177,27 +190,59 @@ def get_interface(flow, label, **kwargs):
 
         return ys[(ys >= ymin) & (ys <= ymax)]
 
+    def get_grid_rows(ymin, ymax):
+        ymin = -np.inf if ymin == None else ymin
+        ymax =  np.inf if ymax == None else ymax
+        _, ys = flow.get_coords()
+
+        return np.flatnonzero((ys >= ymin) & (ys <= ymax))
+
     def get_radius(data, xlabel, ylabel, **kwargs):
         radius = kwargs.pop('cutoff_radius', None)
-        if radius == None:
+        if radius == None and is_grid:
+            radius = np.min(np.diff(flow.get_coords()[0]))
+        elif radius == None:
             xdiff = np.diff(np.unique(data[xlabel]))
             ydiff = np.diff(np.unique(data[ylabel]))
             radius = next(np.min(map(np.min, (xdiff, ydiff))))
 
         return radius
 
-    def find_interface_edges_in_layer(sorted_layer, data):
-        """Return the interface edge indices inside the input sorted layer."""
+    def find_interface_edges_in_layer(sorted_layer, data, columns=None,
+            positions=None):
+        """Return the interface edge indices inside the input sorted layer.
+
+        For sparse data the bin indices of the layer cells are input as
+        `columns`. The cells are then placed in a full row of the system,
+        where missing bins are empty, before the search.
+
+        If the indices of the layer cells in the data are known they
+        can be input as `positions` to not search for them.
+
+        """
 
         filled_cells = [False] * len(sorted_layer)
 
         for i, cell in enumerate(sorted_layer):
-            index = np.where(data == cell)[0][0]
+            if positions is not None:
+                index = positions[i]
+            else:
+                index = np.where(data == cell)[0][0]
 
             filled_cells[i] = _cell_is_droplet(
                 index, data, label, cutoff_radius, cutoff, **kwargs
             )
 
+        if columns is not None:
+            row = [False] * nx
+
+            for c, filled in zip(columns, filled_cells):
+                row[c] = filled
+
+            filled_cells = row
+
+        num_cells = len(filled_cells)
+
         # Add one PBC copy of the bottom layer, then search it for
         # the longest total filled stretch
         filled_cells *= 2
@@ -242,8 +287,13 @@ def get_interface(flow, label, **kwargs):
             len_best = len_current
 
         # Adjust the indices for PBC, which can invert the left/right positions
-        edge1 = index_best % len(sorted_layer)
-        edge2 = (edge1 + len_best - 1) % len(sorted_layer)
+        edge1 = index_best % num_cells
+        edge2 = (edge1 + len_best - 1) % num_cells
+
+        # Edges are filled cells and thus present in the sparse layer
+        if columns is not None:
+            layer_positions = {c: i for i, c in enumerate(columns)}
+            edge1, edge2 = layer_positions[edge1], layer_positions[edge2]
 
         return edge1, edge2
 
@@ -258,7 +308,7 @@ def get_interface(flow, label, **kwargs):
             return None
 
     try:
-        cutoff = get_cutoff(kwargs.pop('cutoff', None), flow.data)
+        cutoff = get_cutoff(kwargs.pop('cutoff', None), flow.fields)
     except AssertionError:
         print("[WARNING]: System is homogenous: no interface can be found.")
         return None, None
@@ -266,7 +316,10 @@ def get_interface(flow, label, **kwargs):
     search_from_inside = kwargs.pop('search_longest_connected', False)
 
     coord_labels = kwargs.get('coord_labels', ('X', 'Y'))
-    cutoff_radius = get_radius(flow.data, *coord_labels, **kwargs)
+    is_grid = isinstance(flow, RegularGridFlowData) \
+        and tuple(coord_labels) == flow.coord_labels
+
+    cutoff_radius = get_radius(flow.fields, *coord_labels, **kwargs)
 
     ylims = kwargs.pop('ylims', (None, None))
 
@@ -305,25 +358,48 @@ def get_interface(flow, label, **kwargs):
         max_index = data.size - 1
 
         Y = data[ylabel]
-        ys = get_yvalues(Y, *ylims)
+
+        if is_grid:
+            rows = get_grid_rows(*ylims)
+            _, grid_ys = flow.get_coords()
+            ys = grid_ys[rows]
+        else:
+            ys = get_yvalues(Y, *ylims)
 
         for i, y in enumerate(ys):
-            # Get the indices from our full dataset that has our current
-            # y-value. This accounts for input data which may be unsorted,
-            # or otherwise unregular.
-            indices = np.where(Y == y)[0]
-
-            # These are then the full data for the layer of the current y-value.
-            # We then sort it, to traverse it in the order of increasing x.
-            layer = data[indices]
-            sorted_layer = np.sort(layer, order=xlabel)
+            positions = None
+
+            if is_grid:
+                # The layer is a row of the grid, which is sorted by x,
+                # and the rows within the radius are a contiguous block
+                # of the data
+                j = rows[i]
+                indices = np.arange(j * nx, (j + 1) * nx)
+                sorted_layer = data[indices]
+
+                j0 = np.searchsorted(grid_ys, y - cutoff_radius, side='left')
+                j1 = np.searchsorted(grid_ys, y + cutoff_radius, side='right')
+                yslice_indices = np.arange(j0 * nx, j1 * nx)
+                positions = (j - j0) * nx + np.arange(nx)
+            else:
+                # Get the indices from our full dataset that has our current
+                # y-value. This accounts for input data which may be unsorted,
+                # or otherwise unregular.
+                indices = np.where(Y == y)[0]
+
+                # These are then the full data for the layer of the current
+                # y-value. We then sort it, to traverse it in the order of
+                # increasing x.
+                layer = data[indices]
+                sorted_layer = np.sort(layer, order=xlabel)
+
+                # Limit the search for cell neighbours in the data which is
+                # within the possible radius of the layer.
+                yslice_indices = np.where(
+                    (data[ylabel] <= y + cutoff_radius)
+                        & (data[ylabel] >= y - cutoff_radius)
+                )[0]
 
-            # Limit the search for cell neighbours in the data which is
-            # within the possible radius of the layer.
-            yslice_indices = np.where(
-                (data[ylabel] <= y + cutoff_radius)
-                    & (data[ylabel] >= y - cutoff_radius)
-            )[0]
             pbc_yslice_indices = np.where(
                 (pbc_data[ylabel] <= y + cutoff_radius)
                     & (pbc_data[ylabel] >= y - cutoff_radius)
@@ -336,7 +412,16 @@ def get_interface(flow, label, **kwargs):
                 pbc_data[pbc_yslice_indices]
             )
 
-            result = find_interface_edges_in_layer(sorted_layer, yslice_data)
+            # Bins missing from sparse data must break filled stretches
+            if flow.is_sparse:
+                ixlabel, _ = INDEX_LABELS
+                columns = sorted_layer[ixlabel].astype(np.int64).tolist()
+            else:
+                columns = None
+
+            result = find_interface_edges_in_layer(
+                sorted_layer, yslice_data, columns, positions
+            )
 
             # The result is the left and right edges of the interface (if
             # one was found), as indices from the input `sorted_layer`.
@@ -348,7 +433,7 @@ def get_interface(flow, label, **kwargs):
                 yield [indices[edge] for edge in (left, right)]
     else:
         # Work with non-zero part of dataset
-        indices = np.where(flow.data[label] >= cutoff)[0]
+        indices = np.where(flow.fields[label] >= cutoff)[0]
         data = flow.data[indices]
 
         Y = data[ylabel]
@@ -1,7 +1,7 @@
 import numpy as np
 
 from droplets.average import get_combined_grid, transfer_data
-from droplets.flow import FlowData
+from droplets.flow import FlowData, RegularGridFlowData
 
 
 def downsample_flow_data(flow, num_combine,
@@ -41,7 +41,8 @@ def downsample_flow_data(flow, num_combine,
         xlim/ylim (2-tuple): System limits to combine bins within.
 
     Returns:
-        FlowData: A new object with downsampled grid.
+        FlowData: A new object with downsampled grid. If the input object
+            is a `RegularGridFlowData` object, so is the returned object.
 
     """
 
@@ -56,6 +57,10 @@ def downsample_flow_data(flow, num_combine,
     resampled_flow = _combine_bins(coords, flow, num_combine, info,
             coord_labels, weights)
 
+    if isinstance(flow, RegularGridFlowData):
+        return RegularGridFlowData(*resampled_flow, info=info,
+            coord_labels=coord_labels)
+
     return FlowData(*resampled_flow, info=info)
 
 
@@ -80,15 +85,20 @@ def supersample_flow_data(flow, factor, coord_labels=('X', 'Y'), weights=[]):
             and weights to calculate a weighted mean for.
 
     Returns:
-        FlowData: A new object with downsampled grid.
+        FlowData: A new object with downsampled grid. If the input object
+            is a `RegularGridFlowData` object, so is the returned object.
 
     """
 
     if factor in (None, 1):
         return flow.copy()
 
+    # The bins of a regular grid are already sorted
+    is_grid = isinstance(flow, RegularGridFlowData)
+
     flow = flow.copy()
-    flow.sort(coord_labels=coord_labels)
+    if not is_grid:
+        flow.sort(coord_labels=coord_labels)
 
     info = _get_superscaled_grid_info(flow, factor, coord_labels)
     xs, ys = _get_superscaled_grid_coords(info)
@@ -110,6 +120,9 @@ def supersample_flow_data(flow, factor, coord_labels=('X', 'Y'), weights=[]):
 
     data = [(l, resampled_data[l]) for l in resampled_data.dtype.names]
 
+    if is_grid:
+        return RegularGridFlowData(*data, info=info, coord_labels=coord_labels)
+
     supersampled_flow = FlowData(*data, info=info)
 
     return supersampled_flow
@@ -138,11 +151,11 @@ def _supersample_data_on_grid(data, factor, data_labels, weights):
 
 
             for l in non_weighted_labels:
-                resampled_data[i, j][l] = np.mean(bins[l])
+                resampled_data[i, j][l] = np.mean(bins[l], dtype=np.float64)
 
             for (l, w) in weights:
-                value = np.sum(bins[l])
-                total_weight = np.sum(bins[w])
+                value = np.sum(bins[l], dtype=np.float64)
+                total_weight = np.sum(bins[w], dtype=np.float64)
 
                 if total_weight != 0.0:
                     resampled_data[i, j][l] = value / total_weight
@@ -177,17 +190,24 @@ def _transfer_data_to_finer_grid(data, xs, ys, n, coord_labels, data_labels):
 
 def _combine_bins(coords, flow, num_combine, info, coord_labels, weights):
     # Create container for result and add coords data
-    data = np.zeros(coords[0].shape, dtype=flow.data.dtype)
+    fields = flow.fields
+    dtype = [(l, values.dtype) for l, values in fields.items()]
+    data = np.zeros(coords[0].shape, dtype=dtype)
 
     for l, cs in zip(coord_labels, coords):
         data[l] = cs
 
     # Sort input data in same order as the new grid
-    # and reshape to 2D array
-    coords_order = [coord_labels[i] for i in (1, 0)]
+    # and reshape the fields to 2D arrays
     shape = [flow.shape[i] for i in (1, 0)]
-    reshaped_input = np.reshape(np.sort(flow.data, order=coords_order),
-                                shape)
+
+    if isinstance(flow, RegularGridFlowData):
+        reshaped_input = {l: flow.get_grid(l) for l in flow.properties}
+    else:
+        sorted_flow = flow.copy()
+        sorted_flow.sort(coord_labels=coord_labels)
+        reshaped_input = {l: np.reshape(values, shape)
+            for l, values in sorted_flow.fields.items()}
 
     # Get data labels, keep labels to be weighed separate
     weighted_labels = [l for l, _ in weights]
@@ -210,22 +230,29 @@ def _combine_bins(coords, flow, num_combine, info, coord_labels, weights):
                     data[l][i,j] = 0.
 
             for l in data_labels:
-                data[l][i,j] = np.sum(reshaped_input[l][inds_y, inds_x])
+                data[l][i,j] = np.sum(reshaped_input[l][inds_y, inds_x],
+                                      dtype=np.float64)
 
     return [(l, data[l].ravel()) for l in data.dtype.names]
 
 
 def _cut_system_limits(flow, xlim, ylim, coord_labels):
+    if isinstance(flow, RegularGridFlowData):
+        cut_flow = flow.cut(xlim, ylim)
+        cut_flow.origin = [values[0] for values in cut_flow.get_coords()]
+
+        return cut_flow
+
     def get_cut_indices_of_axis(lims, label):
         vmin = -np.inf if lims[0] == None else lims[0]
         vmax =  np.inf if lims[1] == None else lims[1]
 
-        return (flow.data[label] >= vmin) & (flow.data[label] <= vmax)
+        return (flow.fields[label] >= vmin) & (flow.fields[label] <= vmax)
 
     xl, yl = coord_labels
 
     inds = get_cut_indices_of_axis(xlim, xl) & get_cut_indices_of_axis(ylim, yl)
-    data = flow.data[inds]
+    data = {l: values[inds] for l, values in flow.fields.items()}
 
     shape = [len(np.unique(data[l])) for l in coord_labels]
     origin = [np.min(data[l]) for l in coord_labels]
@@ -237,7 +264,7 @@ def _cut_system_limits(flow, xlim, ylim, coord_labels):
         'num_bins': shape[0]*shape[1]
     }
 
-    return FlowData(*[(l, data[l]) for l in flow.data.dtype.names], info=info)
+    return FlowData(*[(l, data[l]) for l in flow.properties], info=info)
 
 
 def _get_downscaled_grid_info(flow, num_combine, coord_labels):
@@ -269,7 +296,7 @@ def _get_superscaled_grid_info(flow, n, coord_labels):
     shape = [v * n for v in flow.shape]
     spacing = [v / n for v in flow.spacing]
 
-    origin = np.min(flow.data[xl]), np.min(flow.data[yl])
+    origin = np.min(flow.fields[xl]), np.min(flow.fields[yl])
 
     info = {
         'spacing': spacing,
@@ -1,5 +1,7 @@
 import numpy as np
 
+from droplets.flow import RegularGridFlowData, get_float_dtype
+
 """Tools for sampling data from FlowData objects."""
 
 
@@ -57,12 +59,11 @@ def sample_per_angle_from(flow, origin, label,
     out_values_bins = [[] for _ in out_angles]
     weights_bins = [[] for _ in out_angles]
 
-    dxs, dys = [flow.data[l] - o for l, o in zip(coord_labels, origin)]
+    dxs, dys = [flow.fields[l] - o for l, o in zip(coord_labels, origin)]
     drs = np.sqrt(dxs**2 + dys**2)
 
     # Apply radius cutoffs and calculate angles for bins
     inds_rlim = (drs >= rmin) & (drs <= rmax)
-    data_rlim = flow.data[inds_rlim]
 
     bin_rads = np.sign(dys[inds_rlim]) \
         * np.arccos(dxs[inds_rlim]/drs[inds_rlim])
@@ -70,12 +71,11 @@ def sample_per_angle_from(flow, origin, label,
 
     # Apply angular cutoffs to remaining bins
     inds_alim = (bin_degrees >= amin) & (bin_degrees <= amax)
-    data_alim = data_rlim[inds_alim]
-    label_data = data_alim[label]
+    label_data = flow.fields[label][inds_rlim][inds_alim]
 
     # Get corresponding weighting data or 1.0 for no weighting
     if weight != None:
-        weight_data = data_alim[weight]
+        weight_data = flow.fields[weight][inds_rlim][inds_alim]
     else:
         weight_data = [1.0 for _ in label_data]
 
@@ -91,7 +91,7 @@ def sample_per_angle_from(flow, origin, label,
         weights_bins[iangle].append(optweight)
 
     # Construct result array
-    dtype = [(l, np.float) for l in ('angle', label)]
+    dtype = [(l, get_float_dtype()) for l in ('angle', label)]
     result = np.zeros(out_angles.shape, dtype=dtype)
 
     # Add angles and the mean of values for each
@@ -151,9 +151,15 @@ def sample_viscous_dissipation(flow, viscosity,
                 "(is {!r}, expected (float, float))".format(flow.spacing)
             )
 
-    flow.sort(coord_labels=coord_labels)
+    labels = list(flow_labels) + ([weight_label] if weight_label != None else [])
+
+    # Fields of regular grids are read as 2D arrays without sorting
+    if isinstance(flow, RegularGridFlowData):
+        data = {l: flow.get_grid(l) for l in labels}
+    else:
+        flow.sort(coord_labels=coord_labels)
+        data = {l: flow.fields[l].reshape(ny, nx) for l in labels}
 
-    data = flow.data.reshape(ny, nx)
     weights = data[weight_label] if weight_label != None else 1.
     U, V = [data[l] * weights for l in flow_labels]
 
@@ -183,7 +189,7 @@ def sample_center_of_mass(flow, mass_label='M', coord_labels=['X', 'Y']):
 
     """
 
-    return tuple(np.average(flow.data[l], weights=flow.data[mass_label])
+    return tuple(np.average(flow.fields[l], weights=flow.fields[mass_label])
                  for l in coord_labels)
 
 
@@ -202,7 +208,8 @@ def sample_inertial_energy(flow, mass_label='M', flow_labels=['U', 'V']):
     """
 
     ul, vl = flow_labels
-    return 0.5 * flow.data[mass_label] * (flow.data[ul]**2 + flow.data[vl]**2)
+    fields = flow.fields
+    return 0.5 * fields[mass_label] * (fields[ul]**2 + fields[vl]**2)
 
 
 def sample_flow_angle(flow, flow_labels=['U', 'V'], mean=False, weight=None):
@@ -233,24 +240,23 @@ def sample_flow_angle(flow, flow_labels=['U', 'V'], mean=False, weight=None):
     """
 
     try:
-        us, vs = [flow.data[label].copy() for label in flow_labels]
-    except ValueError as exc:
-        if "no field" in str(exc):
-            raise ValueError(
-                    "Flow labels {!r} were not found in the system" \
-                    .format(flow_labels)
-                )
-        else:
-            raise ValueError(
-                    "Exactly 2 flow labels must be input, but got {} ({!r})" \
-                    .format(len(flow_labels), flow_labels)
-                )
+        us, vs = [flow.fields[label].copy() for label in flow_labels]
+    except KeyError:
+        raise ValueError(
+                "Flow labels {!r} were not found in the system" \
+                .format(flow_labels)
+            )
+    except ValueError:
+        raise ValueError(
+                "Exactly 2 flow labels must be input, but got {} ({!r})" \
+                .format(len(flow_labels), flow_labels)
+            )
 
     if mean:
         if weight:
             try:
-                us *= flow.data[weight]
-                vs *= flow.data[weight]
+                us *= flow.fields[weight]
+                vs *= flow.fields[weight]
             except:
                 raise ValueError(
                         "Weight label {!r} was not found in the system" \
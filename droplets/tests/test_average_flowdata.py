@@ -40,7 +40,7 @@ def test_create_combined_grid_from_given_regular_grids():
     y1 = np.array([2., 3.])
     xs1, ys1 = np.meshgrid(x1, y1, indexing='xy')
 
-    data0 = np.zeros((xs0.size, ), dtype=[('X', np.float), ('Y', np.float)])
+    data0 = np.zeros((xs0.size, ), dtype=[('X', np.float64), ('Y', np.float64)])
     data1 = data0.copy()
 
     data0['X'] = xs0.ravel()
@@ -67,7 +67,7 @@ def test_common_grid_is_created_from_min_and_max_values_and_spacing():
     y0 = np.array([-10., 0.])
     y1 = np.array([-5., 5.])
 
-    data0 = np.zeros((2, ), dtype=[('X', np.float), ('Y', np.float)])
+    data0 = np.zeros((2, ), dtype=[('X', np.float64), ('Y', np.float64)])
     data1 = data0.copy()
 
     data0['X'] = x0
@@ -88,7 +88,7 @@ def test_common_grid_is_created_from_min_and_max_values_and_spacing():
     assert np.array_equal(combined_grid['Y'], ys)
 
 def test_combined_grid_is_returned_with_shape_which_is_y_major_x_minor():
-    data = np.zeros((6, ), dtype=[('X', np.float), ('Y', np.float)])
+    data = np.zeros((6, ), dtype=[('X', np.float64), ('Y', np.float64)])
 
     data['X'] = np.array([0., 1., 0., 1., 0., 1.])
     data['Y'] = np.array([0., 0., 1., 1., 2., 2.])
@@ -99,7 +99,7 @@ def test_combined_grid_is_returned_with_shape_which_is_y_major_x_minor():
 
 def test_combined_grid_is_created_with_same_dtype_as_input():
     data = np.zeros(
-        (4, ), dtype=[('X', np.float), ('Y', np.float), ('C', np.float)]
+        (4, ), dtype=[('X', np.float64), ('Y', np.float64), ('C', np.float64)]
     )
 
     data['X'] = np.array([0., 1., 0., 1.])
@@ -111,7 +111,7 @@ def test_combined_grid_is_created_with_same_dtype_as_input():
     assert np.array_equal(combined_grid['C'].ravel(), np.zeros((4, )))
 
 def test_transfer_data_from_center_bins_to_super_set_grid():
-    dtype = [('X', np.float), ('Y', np.float), ('C', np.float)]
+    dtype = [('X', np.float64), ('Y', np.float64), ('C', np.float64)]
 
     xgrid = np.array([0., 1., 2., 3., 4., 5.])
     ygrid = np.array([0., 1., 2., 3., 4., 5.])
@@ -167,3 +167,103 @@ def test_average_flow_maps_yields_error_if_shape_of_given_flow_maps_not_set():
 
     with pytest.raises(TypeError):
         average_flow_data(flow_maps)
+
+def test_average_sparse_flow_maps_matches_dense():
+    x = np.arange(5)
+    xs, ys = np.meshgrid(x, x)
+
+    num_maps = 5
+
+    info = {
+        'spacing': (1, 1),
+        'shape': (5, 5),
+    }
+
+    f0_sets = [np.random.random(xs.shape) for _ in range(num_maps)]
+    f1_sets = [np.random.random(xs.shape) for _ in range(num_maps)]
+
+    # Empty some bins in all but the first map
+    for f0, f1 in zip(f0_sets[1:], f1_sets[1:]):
+        inds = np.random.random(xs.shape) < 0.5
+        f0[inds] = 0.
+        f1[inds] = 0.
+
+    flow_maps = [FlowData(('X', xs), ('Y', ys), ('f0', f0_sets[i]), ('f1', f1_sets[i]), info=info)
+            for i in range(num_maps)]
+
+    sparse_maps = []
+    for f0, f1 in zip(f0_sets, f1_sets):
+        inds = f0 > 0.
+        sparse_maps.append(FlowData(
+            ('X', xs[inds]), ('Y', ys[inds]), ('f0', f0[inds]), ('f1', f1[inds]),
+            ('IX', xs[inds].astype(np.uint64)), ('IY', ys[inds].astype(np.uint64)),
+            info=info))
+
+    flow_mean = average_flow_data(flow_maps, weights=[('f1', 'f0')])
+    sparse_mean = average_flow_data(sparse_maps, weights=[('f1', 'f0')])
+
+    assert not sparse_mean.is_sparse
+    assert sparse_mean.shape == flow_mean.shape
+    assert np.array_equal(flow_mean.data['X'], sparse_mean.data['X'])
+    assert np.array_equal(flow_mean.data['Y'], sparse_mean.data['Y'])
+    assert np.isclose(flow_mean.data['f0'], sparse_mean.data['f0']).all()
+    assert np.isclose(flow_mean.data['f1'], sparse_mean.data['f1']).all()
+
+
+def test_average_sparse_flow_maps_matches_densified():
+    nx, ny = 4, 3
+    ixs, iys = np.meshgrid(np.arange(nx), np.arange(ny), indexing='ij')
+    xs, ys = 0.5 + ixs, 0.5 + iys
+
+    info = {
+        'spacing': (1., 1.),
+        'shape': (nx, ny),
+        'origin': (0., 0.),
+    }
+
+    # No map covers the full grid and the first map is missing its corners
+    keep = [(ixs > 0) & (iys > 0), (ixs < 2) & (iys == 1), np.zeros(xs.shape, dtype=bool)]
+
+    sparse_maps = []
+    for inds in keep:
+        f0 = np.random.random(inds.sum())
+        f1 = np.random.random(inds.sum())
+
+        sparse_maps.append(FlowData(
+            ('X', xs[inds]), ('Y', ys[inds]), ('f0', f0), ('f1', f1),
+            ('IX', ixs[inds].astype(np.uint64)), ('IY', iys[inds].astype(np.uint64)),
+            info=info))
+
+    flow_mean = average_flow_data([flow.densify() for flow in sparse_maps],
+        weights=[('f1', 'f0')])
+    flow_mean.sort()
+
+    sparse_mean = average_flow_data(sparse_maps, weights=[('f1', 'f0')])
+
+    assert sparse_mean.shape == (nx, ny)
+    assert sparse_mean.origin == (0.5, 0.5)
+    assert sparse_mean.origin == flow_mean.origin
+    assert np.array_equal(flow_mean.data['X'], sparse_mean.data['X'])
+    assert np.array_equal(flow_mean.data['Y'], sparse_mean.data['Y'])
+    assert np.isclose(flow_mean.data['f0'], sparse_mean.data['f0']).all()
+    assert np.isclose(flow_mean.data['f1'], sparse_mean.data['f1']).all()
+
+
+def test_average_empty_sparse_flow_maps():
+    info = {
+        'spacing': (1., 1.),
+        'shape': (4, 3),
+        'origin': (0., 0.),
+    }
+
+    empty = np.array([], dtype=np.float64)
+    sparse_maps = [FlowData(('X', empty), ('Y', empty), ('M', empty),
+            ('IX', empty.astype(np.uint64)), ('IY', empty.astype(np.uint64)), info=info)
+        for _ in range(2)]
+
+    flow_mean = average_flow_data(sparse_maps)
+
+    assert flow_mean.shape == (4, 3)
+    assert flow_mean.origin == (0.5, 0.5)
+    assert np.array_equal(flow_mean.data['M'], np.zeros(12))
+    assert np.array_equal(np.unique(flow_mean.data['X']), 0.5 + np.arange(4))
@@ -0,0 +1,151 @@
+import numpy as np
+import pytest
+
+from droplets.flow import FlowData, RegularGridFlowData, get_stored_dependencies, \
+    register_derived_field
+
+# Grid with different spacings along x and y, stored in x-major order
+nx, ny = 4, 3
+dx, dy = 0.5, 0.25
+xs, ys = np.meshgrid(dx * np.arange(nx), dy * np.arange(ny), indexing='ij')
+
+info = {'shape': (nx, ny), 'spacing': (dx, dy)}
+
+ms = 2. * xs + 3. * ys**2
+us = np.ones(xs.shape)
+vs = 2. * np.ones(xs.shape)
+
+data = [('X', xs.ravel()), ('Y', ys.ravel()), ('M', ms.ravel()),
+    ('U', us.ravel()), ('V', vs.ravel())]
+
+num_calls = {'count': 0}
+
+
+@register_derived_field('test_mass_sum', ('M', ))
+def get_mass_sum(flow):
+    num_calls['count'] += 1
+    return flow.get_field('M') + 1.
+
+
+def test_derived_field_is_calculated_once():
+    flow = FlowData(*data, info=info)
+    num_calls['count'] = 0
+
+    values = flow.get_field('test_mass_sum')
+
+    assert (np.array_equal(values, ms.ravel() + 1.))
+    assert (flow.get_field('test_mass_sum') is values)
+    assert (num_calls['count'] == 1)
+    assert ('test_mass_sum' not in flow.properties)
+
+    with pytest.raises(ValueError):
+        values[0] = 0.
+
+
+def test_derived_field_is_calculated_again_after_changes():
+    flow = FlowData(*data, info=info)
+    num_calls['count'] = 0
+
+    flow.get_field('test_mass_sum')
+    flow.add_field('M', 2. * ms.ravel())
+    assert (np.array_equal(flow.get_field('test_mass_sum'), 2. * ms.ravel() + 1.))
+
+    flow.data['M'] += 1.
+    assert (np.array_equal(flow.get_field('test_mass_sum'), 2. * ms.ravel() + 2.))
+
+    flow.spacing = (1., 1.)
+    flow.get_field('test_mass_sum')
+
+    assert (num_calls['count'] == 4)
+
+    # Fields which do not depend on the changed field are kept
+    flow = FlowData(*data, info=info)
+    num_calls['count'] = 0
+
+    flow.get_field('test_mass_sum')
+    flow.add_field('U', 0.)
+    flow.get_field('test_mass_sum')
+
+    assert (num_calls['count'] == 1)
+
+
+def test_derived_field_sees_changes_to_record():
+    flow = FlowData(*data, info=info)
+
+    flow.data['M'] += 1.
+    assert (np.array_equal(flow.get_field('test_mass_sum'), ms.ravel() + 2.))
+
+    flow.data['M'] += 1.
+    assert (np.array_equal(flow.get_field('test_mass_sum'), ms.ravel() + 3.))
+
+
+def test_derived_field_sees_changes_to_held_record():
+    flow = FlowData(*data, info=info)
+    record = flow.data
+
+    assert (np.array_equal(flow.get_field('test_mass_sum'), ms.ravel() + 1.))
+
+    record['M'] += 1.
+    assert (np.array_equal(flow.get_field('test_mass_sum'), ms.ravel() + 2.))
+
+
+def test_derived_field_is_kept_when_data_is_not_held_in_record():
+    flow = FlowData(*data, info=info)
+    num_calls['count'] = 0
+
+    flow.data
+    flow.get_field('test_mass_sum')
+    flow.get_field('test_mass_sum')
+
+    assert (num_calls['count'] == 2)
+
+    # Adding a field which the record can not hold moves the data out of it
+    flow.add_field('C', np.arange(nx * ny))
+
+    values = flow.get_field('test_mass_sum')
+    assert (flow.get_field('test_mass_sum') is values)
+    assert (num_calls['count'] == 3)
+
+
+def test_stored_dependencies():
+    assert (get_stored_dependencies('M') == ['M'])
+    assert (get_stored_dependencies('flow') == ['U', 'V'])
+    assert (set(get_stored_dependencies('evaporation')) == {'U', 'V', 'X', 'Y', 'M'})
+
+
+def test_get_bad_field():
+    flow = FlowData(*data, info=info)
+
+    with pytest.raises(KeyError):
+        flow.get_field('bad_label')
+
+
+def test_gradient_fields_in_order_of_bins():
+    order = np.random.permutation(nx * ny)
+    flow = FlowData(*[(l, values[order]) for l, values in data], info=info)
+    grid_flow = RegularGridFlowData(*data, info=info)
+
+    for f in (flow, grid_flow):
+        assert (np.allclose(f.get_field('grad_rho_x'), 2.))
+        assert (np.allclose(f.get_field('grad_rho_y')[f.get_field('Y') == dy], 6. * dy))
+
+        evaporation = f.get_field('U') * f.get_field('grad_rho_x') \
+            + f.get_field('V') * f.get_field('grad_rho_y')
+        assert (np.array_equal(f.get_field('evaporation'), evaporation))
+
+        assert (np.allclose(f.get_field('flow'), np.sqrt(5.)))
+
+    # The stored fields are not reordered
+    assert (np.array_equal(flow.fields['X'], xs.ravel()[order]))
+
+
+def test_grid_fields_require_full_grid():
+    ixs, iys = np.meshgrid(np.arange(nx), np.arange(ny), indexing='ij')
+    flow = FlowData(*data, ('IX', ixs.ravel()), ('IY', iys.ravel()), info=info)
+
+    assert (np.allclose(flow.get_field('flow'), np.sqrt(5.)))
+
+    with pytest.raises(ValueError):
+        flow.get_field('grad_rho_x')
+
+    assert (np.allclose(flow.densify().get_field('grad_rho_x'), 2.))
@@ -121,6 +121,31 @@ def test_flowdata_cut_system():
     assert flow.data.dtype == flow_lims.data.dtype
 
 
+def test_flowdata_cut_shape_from_grid():
+    dx, dy = 0.5, 0.25
+    x = 1. + dx * (np.arange(8) + 0.5)
+    y = 2. + dy * (np.arange(6) + 0.5)
+    xs, ys = np.meshgrid(x, y)
+
+    info = {
+        'spacing': (dx, dy),
+        'shape': (8, 6),
+        'origin': (1., 2.),
+    }
+
+    order = np.random.permutation(xs.size)
+    flow = FlowData(('X', xs.ravel()[order]), ('Y', ys.ravel()[order]), info=info)
+
+    for xlim, ylim in [((2., 3.), (2.3, 3.)), ((None, 2.25), (None, None)),
+            ((x[2], x[5]), (y[1], y[3])), ((-10., 10.), (0., 2.6)),
+            ((2.1, 2.2), (None, None)), ((10., None), (None, None))]:
+        cut_flow = flow.cut(xlim, ylim)
+        shape = tuple(len(np.unique(cut_flow.fields[l])) for l in ('X', 'Y'))
+
+        assert (cut_flow.shape == shape)
+        assert (cut_flow.num_bins == shape[0] * shape[1])
+
+
 def test_flowdata_copy():
     xs = np.arange(8)
     info = {
@@ -189,3 +214,186 @@ def test_flowdata_size():
 
     flow = FlowData(('x', xs), info={})
     assert (None == flow.size())
+
+def test_flowdata_densify_sparse_data():
+    info = {
+        'spacing': (1., 2.),
+        'origin': (0., 0.),
+        'shape': (3, 2),
+        'num_bins': 6
+    }
+
+    # Bins (1, 0) and (2, 1) are filled in the 3x2 grid
+    ixs = np.array([1, 2], dtype=np.uint64)
+    iys = np.array([0, 1], dtype=np.uint64)
+    xs = 0.5 + ixs
+    ys = 1. + 2.*iys
+    ms = np.array([1., 2.])
+
+    flow = FlowData(('X', xs), ('Y', ys), ('M', ms), ('IX', ixs), ('IY', iys),
+            info=info)
+    assert flow.is_sparse
+
+    dense = flow.densify()
+    assert not dense.is_sparse
+    assert dense.data.size == 6
+    assert set(dense.properties) == set(['X', 'Y', 'M'])
+    assert np.array_equal(dense.data['X'], [0.5, 0.5, 1.5, 1.5, 2.5, 2.5])
+    assert np.array_equal(dense.data['Y'], [1., 3., 1., 3., 1., 3.])
+    assert np.array_equal(dense.data['M'], [0., 0., 1., 0., 0., 2.])
+
+    # Dense data is copied as is
+    assert not dense.densify().is_sparse
+    assert np.array_equal(dense.densify().data, dense.data)
+
+def test_flowdata_densify_requires_grid_info():
+    ixs = np.array([0], dtype=np.uint64)
+    flow = FlowData(('X', [0.5]), ('Y', [0.5]), ('IX', ixs), ('IY', ixs))
+
+    with pytest.raises(ValueError):
+        flow.densify()
+
+def test_flowdata_fields_are_contiguous_and_read_only():
+    xs = np.arange(6.)
+    ms = np.arange(6, dtype=np.float32)
+
+    flow = FlowData(('X', xs), ('M', ms))
+
+    assert list(flow.fields.keys()) == ['X', 'M']
+    for l, values in (('X', xs), ('M', ms)):
+        assert flow.fields[l].flags.c_contiguous
+        assert flow.fields[l].dtype == values.dtype
+        assert np.array_equal(flow.fields[l], values)
+
+    with pytest.raises(ValueError):
+        flow.fields['X'][0] = 1.
+
+def test_flowdata_data_record_holds_changes():
+    xs = np.arange(6.)
+    flow = FlowData(('X', xs), ('M', xs.copy()))
+
+    flow.data['M'] *= 2.
+    flow.data['X'][0] = -1.
+
+    assert np.array_equal(flow.fields['M'], 2. * xs)
+    assert flow.fields['X'][0] == -1.
+
+    # The record is created again after accessing the fields
+    flow.data['M'] += 1.
+    assert np.array_equal(flow.fields['M'], 2. * xs + 1.)
+
+def test_flowdata_copy_and_translate_share_unchanged_fields():
+    xs = np.arange(6.)
+    flow = FlowData(('X', xs), ('Y', xs), ('M', xs))
+
+    copy = flow.copy()
+    for l in flow.properties:
+        assert copy.fields[l] is flow.fields[l]
+
+    # Changes to the record of a copy are not seen by the original
+    copy.data['M'] += 1.
+    assert np.array_equal(flow.fields['M'], xs)
+    assert np.array_equal(copy.fields['M'], xs + 1.)
+
+    translated = flow.translate('X', 2.)
+    assert translated.fields['Y'] is flow.fields['Y']
+    assert translated.fields['M'] is flow.fields['M']
+    assert np.array_equal(translated.fields['X'], xs + 2.)
+    assert np.array_equal(flow.fields['X'], xs)
+
+def test_flowdata_add_field():
+    xs = np.arange(6.)
+    flow = FlowData(('X', xs))
+    xs_field = flow.fields['X']
+
+    flow.add_field('M', 2. * xs)
+    flow.add_field('C', 1)
+
+    assert flow.properties == ('X', 'M', 'C')
+    assert flow.fields['X'] is xs_field
+    assert np.array_equal(flow.data['M'], 2. * xs)
+    assert np.array_equal(flow.data['C'], np.ones(6))
+
+    with pytest.raises(ValueError):
+        flow.add_field('V', np.arange(5.))
+
+def test_flowdata_sort_fields_as_record():
+    xs, ys = (v.ravel() for v in np.meshgrid(np.arange(3.), np.arange(2.)))
+    ms = np.arange(6.)
+
+    order = np.random.permutation(6)
+    flow = FlowData(('X', xs[order]), ('Y', ys[order]), ('M', ms[order]))
+    flow_record = flow.copy()
+    flow_record.data
+
+    flow.sort()
+    flow_record.sort()
+
+    assert np.array_equal(flow.data, flow_record.data)
+
+def test_flowdata_lims_takes_fields_when_accessed():
+    xs, ys = (v.ravel() for v in np.meshgrid(np.arange(4.), np.arange(3.)))
+    ms = np.arange(12.)
+
+    flow = FlowData(('X', xs), ('Y', ys), ('M', ms))
+    flow_lims = flow.lims('X', 1., 2.).lims('Y', 1., None)
+
+    # Only the limited fields have been taken before access
+    assert flow_lims.num_bins == 4
+    assert flow_lims.properties == ('X', 'Y', 'M')
+    assert 'M' not in flow_lims._columns._taken
+    assert np.array_equal(flow_lims.fields['M'], [5., 6., 9., 10.])
+    assert flow_lims.fields['M'] is flow_lims.fields['M']
+
+    # Changes to the selection are not seen by the original or other copies
+    flow_copy = flow_lims.copy()
+    flow_lims.add_field('M', 0.)
+    flow_lims.data['X'] += 1.
+
+    assert np.array_equal(flow_copy.fields['M'], [5., 6., 9., 10.])
+    assert np.array_equal(flow_copy.fields['X'], [1., 2., 1., 2.])
+    assert np.array_equal(flow.fields['M'], ms)
+    assert np.array_equal(flow.fields['X'], xs)
+
+    # Fields of an object held in the record are copied
+    flow.data['M'] *= 2.
+    flow_lims = flow.lims('X', 1., 2.)
+    flow.data['M'] *= 2.
+
+    assert np.array_equal(flow_lims.fields['M'], 2. * ms[(xs >= 1.) & (xs <= 2.)])
+
+
+def test_held_record_stays_connected():
+    xs = np.arange(8, dtype=np.float64)
+    info = {'shape': (8, 1), 'spacing': (1., 1.), 'origin': (0., 0.)}
+    flow = FlowData(('X', xs), ('Y', np.zeros(8)), ('M', 2. * xs), info=info)
+
+    data = flow.data
+
+    # Fields are read-only views of the record
+    assert (np.shares_memory(flow.fields['M'], data))
+    assert (not flow.fields['M'].flags.writeable)
+    assert (data.flags.writeable)
+
+    data['M'][1] = 7.
+    assert (flow.fields['M'][1] == 7.)
+    assert (flow.data is data)
+
+    # Selections and derived fields do not detach the record
+    flow.lims('X', 2., 5.)
+    flow.cut((2., 5.))
+    flow.get_field('M')
+
+    data['M'][2] = 9.
+    assert (flow.data['M'][2] == 9.)
+    assert (flow.fields['M'][2] == 9.)
+
+    # Replaced fields of the same data-type are written to the record
+    flow.add_field('M', 3. * xs)
+    assert (flow.data is data)
+    assert (np.array_equal(data['M'], 3. * xs))
+
+    # New fields can not be stored in the record
+    flow.add_field('U', xs)
+    assert (flow.data is not data)
+    assert (np.array_equal(flow.data['U'], xs))
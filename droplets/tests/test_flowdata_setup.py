@@ -67,6 +67,23 @@ def test_oddlists_error():
     assert ("added array_like objects not all of equal size" in str(excinfo.value))
 
 
+def test_label_not_in_dtype_error():
+    X = np.arange(5)
+    dtype = [('X', 'float32'), ('Y', 'int32')]
+
+    with pytest.raises(ValueError) as excinfo:
+        flow = FlowData({'X': X, 'M': X}, dtype=dtype)
+    assert ("'M'" in str(excinfo.value))
+    assert ("equal size" not in str(excinfo.value))
+
+
+def test_bad_values_error():
+    with pytest.raises(ValueError) as excinfo:
+        flow = FlowData(('X', np.arange(3.)), ('M', ['a', 'b', 'c']), dtype='float64')
+    assert ("'M'" in str(excinfo.value))
+    assert ("equal size" not in str(excinfo.value))
+
+
 def test_infer_homogenous_dtype():
     types = ('float32', 'float64', 'int')
     for dtype in types:
@@ -118,3 +135,90 @@ def test_data_is_copy():
     flow = FlowData(('X', xs))
     assert xs is not flow.data['X']
 
+
+def test_fields_adopt_input_arrays():
+    xs = np.arange(8, dtype=np.float64)
+    ys = np.arange(8, dtype=np.float64)
+
+    flow = FlowData(('X', xs), ('Y', ys))
+
+    assert (np.shares_memory(flow.fields['X'], xs))
+    assert (not flow.fields['X'].flags.writeable)
+    assert (xs.flags.writeable)
+
+    # The arrays are copied if asked for
+    flow = FlowData(('X', xs), ('Y', ys), copy=True)
+    assert (not np.shares_memory(flow.fields['X'], xs))
+    assert (np.array_equal(flow.fields['X'], xs))
+
+    flow.add_field('U', ys)
+    assert (np.shares_memory(flow.fields['U'], ys))
+
+    flow.add_field('V', ys, copy=True)
+    assert (not np.shares_memory(flow.fields['V'], ys))
+
+
+def test_fields_copy_arrays_to_convert():
+    xs = np.arange(16, dtype=np.float64)
+
+    # Different data-type
+    flow = FlowData(('X', xs), dtype='float32')
+    assert (not np.shares_memory(flow.fields['X'], xs))
+    assert (flow.fields['X'].dtype == np.float32)
+
+    # Non-contiguous input
+    flow = FlowData(('X', xs[::2]))
+    assert (not np.shares_memory(flow.fields['X'], xs))
+    assert (flow.fields['X'].flags.c_contiguous)
+    assert (np.array_equal(flow.fields['X'], xs[::2]))
+
+    # Contiguous 2D input is viewed as 1D
+    grid = xs.reshape(4, 4)
+    flow = FlowData(('X', grid))
+    assert (np.shares_memory(flow.fields['X'], grid))
+    assert (flow.fields['X'].shape == (16, ))
+
+    try:
+        set_precision('float32')
+        flow = FlowData(('X', xs))
+        assert (not np.shares_memory(flow.fields['X'], xs))
+    finally:
+        set_precision(None)
+
+
+
+def test_set_precision_casts_floating_point_data():
+    X = np.arange(5, dtype=np.float64)
+    N = np.arange(5, dtype=np.int64)
+    M = np.arange(5, dtype=np.float32)
+
+    try:
+        set_precision('float32')
+        flow = FlowData(('X', X), ('N', N), ('M', M))
+
+        assert (get_precision() == np.float32)
+        assert (flow.data['X'].dtype == np.float32)
+        assert (flow.data['N'].dtype == np.int64)
+        assert (flow.data['M'].dtype == np.float32)
+
+        # An explicit dtype is kept
+        flow = FlowData(('X', X), dtype='float64')
+        assert (flow.data['X'].dtype == np.float64)
+
+        set_precision('float64')
+        flow = FlowData(('M', M))
+        assert (flow.data['M'].dtype == np.float64)
+    finally:
+        set_precision(None)
+
+    flow = FlowData(('X', X), ('M', M))
+    assert (get_precision() == None)
+    assert (flow.data['X'].dtype == np.float64)
+    assert (flow.data['M'].dtype == np.float32)
+
+
+def test_set_bad_precision():
+    with pytest.raises(ValueError):
+        set_precision('float16')
+
+    assert (get_precision() == None)
@@ -374,3 +374,58 @@ def test_find_complete_interface_with_largest_connected_method():
 
     # There are no further interfaces.
     assert len(list(interface)) == 0
+
+def test_find_interface_from_inside_out_in_sparse_data():
+    # Layer bins:      1 1 - 1 2 1 1 - 1
+    # Detect edges at:       x     x
+    # The empty bins are missing from the sparse data
+    xs = np.array([0., 1., 3., 4., 5., 6., 8.])
+    ms = np.array([1., 1., 1., 2., 1., 1., 1.])
+    ys = np.zeros(xs.shape)
+    ixs = np.array([0, 1, 3, 4, 5, 6, 8], dtype=np.uint64)
+    iys = np.zeros(xs.shape, dtype=np.uint64)
+
+    info = {
+        'shape': (9, 1),
+        'spacing': (1., 1.)
+    }
+
+    flow = FlowData(('X', xs), ('Y', ys), ('M', ms), ('IX', ixs), ('IY', iys),
+            info=info)
+    interface = get_interface(flow, 'M',
+        search_longest_connected=True, cutoff=0.5
+    )
+
+    left, right = next(interface)
+    assert (flow.data['X'][left] == 3.)
+    assert (flow.data['X'][right] == 6.)
+
+def test_find_interface_in_sparse_data_matches_dense():
+    xs, ys = np.meshgrid(np.arange(7.), np.arange(7.))
+    ms = np.exp(-((xs - 3.)**2 + (ys - 3.)**2)/2.)
+    ms[ms < 0.05] = 0.
+
+    info = {
+        'shape': (7, 7),
+        'spacing': (1., 1.),
+    }
+
+    flow = FlowData(('X', xs.ravel()), ('Y', ys.ravel()), ('M', ms.ravel()),
+            info=info)
+
+    inds = flow.data['M'] > 0.
+    sparse_flow = FlowData(
+            ('X', xs.ravel()[inds]), ('Y', ys.ravel()[inds]), ('M', ms.ravel()[inds]),
+            ('IX', xs.ravel()[inds].astype(np.uint64)),
+            ('IY', ys.ravel()[inds].astype(np.uint64)),
+            info=info)
+
+    for kwargs in ({'search_longest_connected': True},
+            {'cutoff_radius': 1.1, 'cutoff_bins': 1}):
+        dense = get_interface(flow, 'M', cutoff=0.1, **kwargs)
+        sparse = get_interface(sparse_flow, 'M', cutoff=0.1, **kwargs)
+
+        for (dleft, dright), (sleft, sright) in zip(dense, sparse):
+            for l in ('X', 'Y'):
+                assert (flow.data[l][dleft] == sparse_flow.data[l][sleft])
+                assert (flow.data[l][dright] == sparse_flow.data[l][sright])
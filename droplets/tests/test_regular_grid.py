@@ -0,0 +1,231 @@
+import numpy as np
+import pytest
+
+from droplets.flow import FlowData, RegularGridFlowData
+from droplets.interface import get_interface
+from droplets.resample import downsample_flow_data, supersample_flow_data
+from droplets.sample import sample_viscous_dissipation
+
+# Grid read in x-major order, as from a data map file
+nx, ny = 8, 6
+dx, dy = 0.5, 0.25
+x = 1. + dx * (np.arange(nx) + 0.5)
+y = 2. + dy * (np.arange(ny) + 0.5)
+xs, ys = np.meshgrid(x, y, indexing='ij')
+
+info = {
+    'shape': (nx, ny),
+    'spacing': (dx, dy),
+    'origin': (1., 2.),
+    'num_bins': nx * ny
+}
+
+ms = np.exp(-((xs - 3.)**2 / 2. + (ys - 2.75)**2 / 0.1))
+us = np.sin(xs) * ys
+vs = np.cos(ys) * xs
+
+data = [('X', xs.ravel()), ('Y', ys.ravel()), ('M', ms.ravel()),
+    ('U', us.ravel()), ('V', vs.ravel())]
+
+
+def test_grid_is_ordered_in_rows_of_y():
+    flow = RegularGridFlowData(*data, info=info)
+
+    assert (np.array_equal(flow.get_grid('X'), xs.T))
+    assert (np.array_equal(flow.get_grid('M'), ms.T))
+    assert (flow.get_grid('M').shape == (ny, nx))
+
+    xcoords, ycoords = flow.get_coords()
+    assert (np.array_equal(xcoords, x))
+    assert (np.array_equal(ycoords, y))
+
+    assert (np.array_equal(flow.get_row('M', 2), ms[:, 2]))
+    assert (np.array_equal(flow.get_column('M', 3), ms[3, :]))
+    assert (flow.get_row('M', 2).base is not None)
+
+    # The bins are in the order of a sorted object
+    sorted_flow = FlowData(*data, info=info)
+    sorted_flow.sort()
+
+    for l in flow.properties:
+        assert (np.array_equal(flow.fields[l], sorted_flow.fields[l]))
+
+
+def test_grid_with_ordered_bins_is_not_copied():
+    ordered_data = [(l, values.reshape(nx, ny).T.ravel()) for l, values in data]
+    flow = FlowData(*ordered_data, info=info)
+
+    grid_flow = RegularGridFlowData.from_flow(flow)
+
+    for l in flow.properties:
+        assert (grid_flow.fields[l] is flow.fields[l])
+
+
+def test_grid_creates_implicit_coordinates():
+    flow = RegularGridFlowData(('M', ms.T.ravel()), info=info)
+
+    assert (np.allclose(flow.get_grid('X'), xs.T))
+    assert (np.allclose(flow.get_grid('Y'), ys.T))
+
+
+def test_grid_get_index():
+    flow = RegularGridFlowData(*data, info=info)
+
+    assert (flow.get_index(x[3], y[2]) == (3, 2))
+    assert (flow.get_index(x[3] + 0.4 * dx, y[2] - 0.4 * dy) == (3, 2))
+    assert (flow.get_grid('M')[flow.get_index(x[3], y[2])[::-1]] == ms[3, 2])
+
+    i, j = flow.get_index(x[[0, 5]], y[[4, 1]])
+    assert (np.array_equal(i, [0, 5]))
+    assert (np.array_equal(j, [4, 1]))
+
+    with pytest.raises(ValueError):
+        flow.get_index(x[0] - dx, y[0])
+
+    with pytest.raises(ValueError):
+        flow.get_index(x[0], y[-1] + dy)
+
+    # Translated grids are looked up at the translated positions
+    translated_flow = flow.translate('X', 10.)
+    assert (type(translated_flow) == RegularGridFlowData)
+    assert (translated_flow.get_index(x[3] + 10., y[2]) == (3, 2))
+
+
+def test_grid_requires_regular_bins():
+    with pytest.raises(ValueError):
+        RegularGridFlowData(*data, info={'shape': (nx, ny)})
+
+    with pytest.raises(ValueError):
+        RegularGridFlowData(*data, info=dict(info, shape=(nx, ny + 1)))
+
+    # Duplicate bins
+    bad_data = [(l, values.copy()) for l, values in data]
+    bad_data[0][1][1] = bad_data[0][1][0]
+    bad_data[1][1][1] = bad_data[1][1][0]
+
+    with pytest.raises(ValueError):
+        RegularGridFlowData(*bad_data, info=info)
+
+    # Translating by an array removes the grid
+    flow = RegularGridFlowData(*data, info=info)
+    assert (type(flow.translate('X', np.arange(nx * ny))) == FlowData)
+
+
+def test_grid_from_sparse_flow():
+    inds = ms.ravel() > 0.1
+    ixs, iys = np.meshgrid(np.arange(nx), np.arange(ny), indexing='ij')
+
+    sparse_data = [(l, values[inds]) for l, values in data]
+    sparse_data += [('IX', ixs.ravel()[inds]), ('IY', iys.ravel()[inds])]
+
+    flow = RegularGridFlowData.from_flow(FlowData(*sparse_data, info=info))
+
+    assert (not flow.is_sparse)
+    assert (np.allclose(flow.get_grid('X'), xs.T))
+    assert (np.array_equal(flow.get_grid('M'), np.where(ms > 0.1, ms, 0.).T))
+
+
+def test_grid_cut_matches_flow_cut():
+    flow = FlowData(*data, info=info)
+    grid_flow = RegularGridFlowData(*data, info=info)
+
+    for xlim, ylim in [((2., 3.), (2.3, 3.)), ((None, 2.25), (None, None)),
+            ((x[2], x[5]), (y[1], y[3]))]:
+        cut_flow = flow.cut(xlim, ylim)
+        cut_flow.sort()
+        cut_grid = grid_flow.cut(xlim, ylim)
+
+        assert (type(cut_grid) == RegularGridFlowData)
+        assert (cut_grid.shape == tuple(cut_flow.shape))
+        assert (cut_grid.origin == cut_flow.origin)
+        assert (cut_grid.num_bins == cut_flow.num_bins)
+
+        for l in flow.properties:
+            assert (np.array_equal(cut_grid.fields[l], cut_flow.fields[l]))
+
+    assert (grid_flow.cut((10., None))._size() == 0)
+
+
+def test_grid_cut_is_view():
+    grid_flow = RegularGridFlowData(*data, info=info)
+    cut_grid = grid_flow.cut((x[2], x[5]), (y[1], y[3]))
+
+    assert (cut_grid.get_grid('M').shape == (3, 4))
+    assert (np.shares_memory(cut_grid.get_grid('M'), grid_flow.fields['M']))
+    assert (np.array_equal(cut_grid.get_row('M', 0), ms[2:6, 1]))
+    assert (cut_grid.get_index(x[3], y[2]) == (1, 1))
+
+    # Cuts of cuts are also views
+    cut_twice = cut_grid.cut((x[3], None), (None, y[1]))
+    assert (np.shares_memory(cut_twice.get_grid('M'), grid_flow.fields['M']))
+    assert (np.array_equal(cut_twice.get_grid('M'), ms[3:6, 1:2].T))
+
+    # The flat fields are copied from the views when accessed
+    translated = cut_grid.translate('X', 1.)
+    assert (np.array_equal(translated.fields['X'], xs[2:6, 1:4].T.ravel() + 1.))
+    assert (np.array_equal(cut_grid.fields['M'], ms[2:6, 1:4].T.ravel()))
+    assert (cut_grid.fields['M'].flags.c_contiguous)
+    assert (not np.shares_memory(cut_grid.fields['M'], grid_flow.fields['M']))
+
+    # Cuts of full rows are contiguous and not copied
+    rows = grid_flow.cut(ylim=(y[1], y[2]))
+    assert (np.shares_memory(rows.fields['M'], grid_flow.fields['M']))
+
+    # Cuts of data held in a record are copied
+    grid_flow.data
+    cut_grid = grid_flow.cut((x[2], x[5]), (y[1], y[3]))
+    grid_flow.data['M'] += 1.
+
+    assert (np.array_equal(cut_grid.get_grid('M'), ms[2:6, 1:4].T))
+
+
+def test_grid_interface_matches_flow():
+    flow = FlowData(*data, info=info)
+    grid_flow = RegularGridFlowData(*data, info=info)
+
+    for kwargs in ({'search_longest_connected': True},
+            {'search_longest_connected': True, 'ylims': (2.3, 3.)},
+            {'cutoff_radius': 0.6, 'cutoff_bins': 2}):
+        edges = list(get_interface(flow, 'M', cutoff=0.2, **kwargs))
+        grid_edges = list(get_interface(grid_flow, 'M', cutoff=0.2, **kwargs))
+
+        assert (len(edges) == len(grid_edges) > 0)
+
+        for (left, right), (grid_left, grid_right) in zip(edges, grid_edges):
+            for l in ('X', 'Y'):
+                assert (flow.data[l][left] == grid_flow.data[l][grid_left])
+                assert (flow.data[l][right] == grid_flow.data[l][grid_right])
+
+
+def test_grid_resampling_matches_flow():
+    flow = FlowData(*data, info=info)
+    grid_flow = RegularGridFlowData(*data, info=info)
+
+    downsampled = downsample_flow_data(flow, (2, 2), xlim=(1.5, None))
+    grid_downsampled = downsample_flow_data(grid_flow, (2, 2), xlim=(1.5, None))
+
+    assert (type(grid_downsampled) == RegularGridFlowData)
+    assert (grid_downsampled.shape == downsampled.shape)
+    assert (grid_downsampled.origin == downsampled.origin)
+
+    for l in flow.properties:
+        assert (np.allclose(grid_downsampled.fields[l], downsampled.fields[l]))
+
+    supersampled = supersample_flow_data(flow, 2)
+    grid_supersampled = supersample_flow_data(grid_flow, 2)
+
+    assert (type(grid_supersampled) == RegularGridFlowData)
+    assert (grid_supersampled.shape == supersampled.shape)
+
+    for l in flow.properties:
+        assert (np.allclose(grid_supersampled.fields[l], supersampled.fields[l]))
+
+
+def test_grid_viscous_dissipation_matches_flow():
+    flow = FlowData(*data, info=info)
+    grid_flow = RegularGridFlowData(*data, info=info)
+
+    dissipation = sample_viscous_dissipation(flow, 1.5, weight_label='M')
+    grid_dissipation = sample_viscous_dissipation(grid_flow, 1.5, weight_label='M')
+
+    assert (np.allclose(grid_dissipation, dissipation))
@@ -184,3 +184,12 @@ def test_sample_per_angle_weighted_with_zeros():
     assert np.array_equal(0., result['C'][45])
     #assert np.isclose(np.average(cs, weights=ws), result['C'][45])
 
+
+
+def test_measure_per_angle_returns_float_record():
+    flow = FlowData(('X', [1.]), ('Y', [1.]), ('C', [2]))
+    result = sample_per_angle_from(flow, origin, 'C')
+
+    assert result.dtype.names == ('angle', 'C')
+    assert all(result.dtype[l] == np.float64 for l in result.dtype.names)
+    assert result['C'][45] == 2.
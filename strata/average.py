@@ -1,14 +1,15 @@
 import numpy as np
 import progressbar as pbar
+from collections import deque
 
 from droplets.flow import FlowData
 from droplets.sample import sample_center_of_mass
 from droplets.resample import supersample_flow_data
 
-from strata.dataformats.read import read_from_files
-from strata.dataformats.write import write
+from strata.dataformats.read import is_stream_path, read_from_files, read_from_stream
+from strata.dataformats.write import write_behind
 from strata.spreading.collect import get_spreading_edges
-from strata.utils import find_groups_to_singles, pop_fileopts
+from strata.utils import find_datamap_files, gen_filenames, pop_fileopts
 
 
 def average(base, output, group=1, rolling=False, **kwargs):
@@ -33,7 +34,9 @@ def average(base, output, group=1, rolling=False, **kwargs):
     and cutoffs are input as per that.
 
     Args:
-        base (str): Base path to input files.
+        base (str): Base path to input files, or a named pipe or '-' to
+            read maps from a stream as they are written. See
+            `strata.dataformats.read.read_from_stream`.
 
         output (str): Base path to output files.
 
@@ -72,23 +75,28 @@ def average(base, output, group=1, rolling=False, **kwargs):
 
         ext (str, default='.dat'): File extension.
 
+        prefetch (int, default=0): Number of files to read ahead in the
+            background.
+
+        writers (int, default=1): Number of threads which write the averaged
+            files in the background, 0 to write them directly.
+
         quiet (bool, default=False): Do not print progress.
 
     """
 
     fopts = pop_fileopts(kwargs)
     quiet = kwargs.pop('quiet', False)
+    prefetch = kwargs.pop('prefetch', 0)
+    writers = kwargs.pop('writers', 1)
     recenter = kwargs.pop('recenter', False)
     cutoff_radius = kwargs.pop('cutoff_radius', 1.)
 
     xlim = kwargs.pop('xlim', (None, None))
     ylim = kwargs.pop('ylim', (None, None))
 
-    cut_x_or_y = False
     try:
-        if xlim[0] != None or xlim[1] != None \
-                or ylim[0] != None or ylim[1] != None:
-            cut_x_or_y = True
+        assert (len(xlim) == 2 and len(ylim) == 2)
     except:
         raise ValueError("`xlim` or `ylim` was not a 2-tuple")
 
@@ -98,84 +106,119 @@ def average(base, output, group=1, rolling=False, **kwargs):
 
     supersample = kwargs.pop('supersample', None)
 
-    groups_singles = list(find_groups_to_singles(base, output, group, rolling, **fopts))
-
-    if not quiet:
-        widgets = ['Averaging files: ',
-                pbar.Bar(), ' (', pbar.SimpleProgress(), ') ', pbar.ETA()]
-        progress = pbar.ProgressBar(widgets=widgets, max_value=len(groups_singles))
-        progress.start()
-
-    for i, (fn_group, fn_out) in enumerate(groups_singles):
-        group_data = []
-        used_modules = set([])
-
-        for data, info, meta in read_from_files(*fn_group):
-            if cut_x_or_y:
-                data = cut_system(data, xlim, ylim)
-
-            group_data.append(data)
-            used_modules.add(meta.pop('module'))
-
-        # Assert that a single module was used and retrieve it
-        assert (len(used_modules) == 1)
-        module = used_modules.pop()
+    def gen_groups(frames):
+        # Maps are read once and grouped in a sliding window, with output
+        # numbering which follows that of `find_groups_to_singles`
+        begin_out = fopts['begin'] if rolling else np.ceil(fopts['begin'] / group)
+        outputs = gen_filenames(output, begin=begin_out, ext=fopts['outext'])
 
-        # Optionally recenter the data maps at the contact line
-        if recenter:
-            flow_data = [FlowData(data) for data in group_data]
+        group_maps = deque(maxlen=group)
 
-            if recenter == 'right':
-                xs_edges = [edge for _, edge in (
-                        get_spreading_edges(data, 'M', cutoff_radius, **kwargs)
-                        for data in flow_data
-                    )
-                ]
-            elif recenter == 'left':
-                xs_edges = [edge for edge, _ in (
-                        get_spreading_edges(data, 'M', cutoff_radius, **kwargs)
-                        for data in flow_data
-                    )
-                ]
-            elif recenter == 'com':
-                xs_edges = [x for x, _ in (
-                        sample_center_of_mass(data) for data in flow_data
-                    )
-                ]
-            else:
-                raise ValueError("Invalid position to recenter around ('%s'). Must be 'com', 'left' or 'right'" % recenter)
+        for frame in frames:
+            group_maps.append(frame)
 
-            group_data, info = recenter_maps(group_data, xs_edges)
+            if len(group_maps) == group:
+                yield list(group_maps), next(outputs)
 
-        avg_data = module.average_data(*group_data)
+                if not rolling:
+                    group_maps.clear()
 
-        if combine != (None, None):
-            avg_data, _ = module.combine_bins(avg_data, info, nx, ny)
+    if is_stream_path(base):
+        num_groups = pbar.UnknownLength
+        frames = read_from_stream(base, fopts['begin'], fopts['end'],
+            xlim=xlim, ylim=ylim)
+    else:
+        # Read all files in a single stream to prefetch across groups,
+        # keeping only the bins inside the limits
+        filenames = list(find_datamap_files(base, **fopts))
+        num_files = len(filenames)
 
-        if supersample != None:
-            data = [(l, avg_data[l]) for l in avg_data.keys()]
-            info = {
-                'shape': info['shape'],
-                'spacing': info['spacing'],
-            }
+        if rolling:
+            num_groups = max(0, num_files - group + 1)
+        else:
+            num_groups = num_files // group
 
-            flow = FlowData(*data, info=info)
+        frames = read_from_files(*filenames, xlim=xlim, ylim=ylim,
+            prefetch=prefetch)
 
-            supersampled_data = supersample_flow_data(
-                flow, supersample, weights=[('U', 'M'), ('V', 'M'), ('T', 'N')]
-            )
+    groups = gen_groups(frames)
 
-            avg_data = {
-                l: supersampled_data.data[l]
-                for l in supersampled_data.properties
-            }
-
-        write(fn_out, avg_data, info)
+    if not quiet:
+        widgets = ['Averaging files: ',
+                pbar.Bar(), ' (', pbar.SimpleProgress(), ') ', pbar.ETA()]
+        progress = pbar.ProgressBar(widgets=widgets, max_value=num_groups)
+        progress.start()
 
-        if not quiet:
-            progress.update(i+1)
+    # Write the averaged files in the background while the next are averaged
+    with write_behind(writers) as write_data:
+        for i, (group_maps, fn_out) in enumerate(groups):
+            group_data = []
+            used_modules = set([])
+
+            for data, info, meta in group_maps:
+                group_data.append(data)
+                used_modules.add(meta['module'])
+
+            # Assert that a single module was used and retrieve it
+            assert (len(used_modules) == 1)
+            module = used_modules.pop()
+
+            # Optionally recenter the data maps at the contact line
+            if recenter:
+                flow_data = [FlowData(data) for data in group_data]
+
+                if recenter == 'right':
+                    xs_edges = [edge for _, edge in (
+                            get_spreading_edges(data, 'M', cutoff_radius, **kwargs)
+                            for data in flow_data
+                        )
+                    ]
+                elif recenter == 'left':
+                    xs_edges = [edge for edge, _ in (
+                            get_spreading_edges(data, 'M', cutoff_radius, **kwargs)
+                            for data in flow_data
+                        )
+                    ]
+                elif recenter == 'com':
+                    xs_edges = [x for x, _ in (
+                            sample_center_of_mass(data) for data in flow_data
+                        )
+                    ]
+                else:
+                    raise ValueError("Invalid position to recenter around ('%s'). Must be 'com', 'left' or 'right'" % recenter)
+
+                group_data, info = recenter_maps(group_data, xs_edges)
+
+            avg_data = module.average_data(*group_data)
+
+            if combine != (None, None):
+                avg_data, _ = module.combine_bins(avg_data, info, nx, ny)
+
+            if supersample != None:
+                data = [(l, avg_data[l]) for l in avg_data.keys()]
+                info = {
+                    'shape': info['shape'],
+                    'spacing': info['spacing'],
+                }
+
+                flow = FlowData(*data, info=info)
+
+                supersampled_data = supersample_flow_data(
+                    flow, supersample, weights=[('U', 'M'), ('V', 'M'), ('T', 'N')]
+                )
+
+                avg_data = {
+                    l: supersampled_data.fields[l]
+                    for l in supersampled_data.properties
+                }
+
+            write_data(fn_out, avg_data, info)
+
+            if not quiet:
+                progress.update(i+1)
 
-    progress.finish()
+    if not quiet:
+        progress.finish()
 
 
 def recenter_maps(data_maps, recenter_values):
@@ -240,19 +283,3 @@ def recenter_maps(data_maps, recenter_values):
 
     return recentered_data, info
 
-
-def cut_system(data, xlim, ylim):
-    xs = data['X']
-    ys = data['Y']
-
-    xmin = xlim[0] if xlim[0] != None else np.min(xs)
-    xmax = xlim[1] if xlim[1] != None else np.max(xs)
-    ymin = ylim[0] if ylim[0] != None else np.min(ys)
-    ymax = ylim[1] if ylim[1] != None else np.max(ys)
-
-    inds = (xs >= xmin) & (xs <= xmax) & (ys >= ymin) & (ys <= ymax)
-
-    for key in data.keys():
-        data[key] = data[key][inds]
-
-    return data
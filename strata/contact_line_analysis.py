@@ -6,7 +6,8 @@ from droplets.average import average_flow_data, get_combined_grid, transfer_data
 from droplets.contact_line import *
 from droplets.flow import FlowData
 from strata.dataformats.read import read_data_file
-from strata.dataformats.write import write
+from strata.dataformats.series import finish_series, is_series_path
+from strata.dataformats.write import write_behind
 from strata.sample_average import sample_value
 from strata.utils import gen_filenames, find_datamap_files, pop_fileopts, prepare_path, write_module_header
 
@@ -34,12 +35,18 @@ def extract_contact_line_bins(base, output, average=1,
 
         fuse (bool, optional): Fuse the contact lines.
 
+        xlim, ylim (2-tuples, optional): Read only the bins inside these
+            limits to search for the contact line in.
+
         begin (int, default=1): First data map number.
 
         end (int, default=inf): Final data map number.
 
         ext (str, default='.dat'): File extension.
 
+        writers (int, default=1): Number of threads which write the output
+            files in the background, 0 to write them directly.
+
         quiet (bool, default=False): Do not print progress.
 
     See `droplets.contact_line` for additional keyword arguments.
@@ -47,6 +54,7 @@ def extract_contact_line_bins(base, output, average=1,
     """
 
     fopts = pop_fileopts(kwargs)
+    writers = kwargs.pop('writers', 1)
 
     kwargs['cutoff_label'] = 'M'
     weights = [('U', 'M'), ('V', 'M'), ('T', 'N')]
@@ -62,14 +70,15 @@ def extract_contact_line_bins(base, output, average=1,
     averaged_data = get_averaged_contact_line_edges(filenames, average,
         rolling, recenter, weights, **kwargs)
 
-    for avg_flow_per_edge in averaged_data:
-        spacing = avg_flow_per_edge[0].spacing
+    with write_behind(writers) as write_data:
+        for avg_flow_per_edge in averaged_data:
+            spacing = avg_flow_per_edge[0].spacing
 
-        if fuse:
-            fuse_edges(avg_flow_per_edge, spacing)
+            if fuse:
+                fuse_edges(avg_flow_per_edge, spacing)
 
-        recombined_flow_data = combine_flow_data(avg_flow_per_edge, spacing)
-        write(next(fnout), recombined_flow_data.data)
+            recombined_flow_data = combine_flow_data(avg_flow_per_edge, spacing)
+            write_data(next(fnout), recombined_flow_data.data)
 
 
 """Fuse the left and right edges in the center."""
@@ -77,14 +86,14 @@ def fuse_edges(flow_edges, spacing):
     dx, _ = spacing
     left, right = flow_edges
 
-    left_xmax = np.max(left.data['X'])
-    right_xmin = np.min(right.data['X'])
+    left_xmax = np.max(left.fields['X'])
+    right_xmin = np.min(right.fields['X'])
 
     left_xshift = left_xmax + 0.5 * dx
     right_xshift = right_xmin - 0.5 * dx
 
-    left.data['X'] -= left_xshift
-    right.data['X'] -= right_xshift
+    left.add_field('X', left.fields['X'] - left_xshift)
+    right.add_field('X', right.fields['X'] - right_xshift)
 
 
 def sample_contact_line_edges(base, labels, save=None,
@@ -114,7 +123,12 @@ def sample_contact_line_edges(base, labels, save=None,
 
         dt (float, optional): Time difference between data files.
 
-        save (str, optional): Save the data as an xmgrace formatted file.
+        save (str, optional): Save the data as an xmgrace formatted file,
+            or as a binary series file if the path has the extension '.npz'
+            (see `strata.dataformats.series`).
+
+        xlim, ylim (2-tuples, optional): Read only the bins inside these
+            limits to search for the contact line in.
 
         begin (int, default=1): First data map number.
 
@@ -172,7 +186,7 @@ def sample_contact_line_edges(base, labels, save=None,
     for i, (left_edge, right_edge) in enumerate(averaged_data):
         # Since we are sampling radial flow the left edge velocities
         # are mirrored along X
-        left_edge.data['U'] *= -1
+        left_edge.add_field('U', -left_edge.fields['U'])
 
         for j, label in enumerate(labels):
             try:
@@ -190,10 +204,7 @@ def sample_contact_line_edges(base, labels, save=None,
                 else:
                     value = np.mean(means)
 
-                # try:
-                    # std = np.mean([t[1] for t in means_and_stds])
-                # except:
-                    # std = None
+                std = None
 
                 samples[j].append([value, std])
             except Exception as exc:
@@ -211,7 +222,7 @@ def sample_contact_line_edges(base, labels, save=None,
 
         times.append(time)
 
-        if save:
+        if save and not is_series_path(save):
             with open(save, 'a') as fp:
                 fp.write("{:.3f} ".format(times[-1]))
                 try:
@@ -230,6 +241,13 @@ def sample_contact_line_edges(base, labels, save=None,
                     sys.exit(1)
                 fp.write('\n')
 
+    if save and is_series_path(save):
+        columns = {'time': times}
+        for label, label_samples in zip(labels, samples):
+            columns[label] = [value for value, _ in label_samples]
+
+        finish_series(save, columns)
+
     return times, samples
 
 
@@ -249,8 +267,8 @@ def get_averaged_contact_line_edges(filenames, average, rolling,
 
         for i, xadj in enumerate(xadj_per_edge):
             xadj_on_grid = get_coord_on_grid(xadj, dx)
-            avg_flow[i].data['X'] += xadj_on_grid
-            avg_flow[i].data['Y'] += yadj
+            avg_flow[i].add_field('X', avg_flow[i].fields['X'] + xadj_on_grid)
+            avg_flow[i].add_field('Y', avg_flow[i].fields['Y'] + yadj)
 
         return avg_flow
 
@@ -330,11 +348,13 @@ def get_grouped_data(fns, average, rolling, progress, quiet, **kwargs):
     """Generate contact line data from list of input files."""
 
     label = kwargs.pop('cutoff_label')
+    xlim = kwargs.pop('xlim', None)
+    ylim = kwargs.pop('ylim', None)
     left, right = [], []
 
     j = 0
     for fn in fns:
-        data, info, _ = read_data_file(fn)
+        data, info, _ = read_data_file(fn, xlim=xlim, ylim=ylim)
 
         left_bins, right_bins = get_contact_line_cells(
             FlowData(data), label, **kwargs
@@ -433,16 +453,15 @@ def add_adjusted_flow(bins, direction, info):
 
     """
 
-    def get_cut_shape(data, dx, dy):
+    def get_cut_shape(ys, dx, dy):
         # After sorting, the data is in y-major, x-minor order
-        ys = data['Y']
         y0 = ys[0]
         nx = 1
 
         while (ys[nx] >= y0 - 0.5 * dy) and (ys[nx] < y0 + 0.5 * dx):
             nx += 1
 
-        ny = data.size // nx
+        ny = ys.size // nx
 
         return nx, ny
 
@@ -455,7 +474,7 @@ def add_adjusted_flow(bins, direction, info):
     flow = FlowData(*adj_data, info=info)
     flow.sort()
 
-    nx, ny = get_cut_shape(flow.data, dx, dy)
+    nx, ny = get_cut_shape(flow.fields['Y'], dx, dy)
 
     flow.origin = xadj
     flow.shape = (nx, ny)
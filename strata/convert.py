@@ -1,10 +1,18 @@
 import progressbar as pbar
 import strata
 
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
 from strata.dataformats.read import read_data_file
-from strata.dataformats.write import write
-from strata.utils import find_singles_to_singles, pop_fileopts
+from strata.dataformats.trajectory.read import split_frame_path
+from strata.dataformats.trajectory.write import write_frames
+from strata.dataformats.write import write, write_behind
+from strata.utils import find_datamap_files, find_singles_to_singles, pop_fileopts
 
+# Formats which store only non-empty bins and are written from sparse data
+SPARSE_FTYPES = ('gmx', )
 
 def convert(base, output, **kwargs):
     """Convert files from one format to another.
@@ -12,6 +20,10 @@ def convert(base, output, **kwargs):
     By default converts files to a simple binary format, this can be
     set using the keyword 'ftype' detailed below.
 
+    Files are converted to formats which store only non-empty bins
+    without creating their full grids. Several files can be converted
+    at the same time by a pool of workers, set by the keyword 'jobs'.
+
     Args:
         base (str): Base path to input files.
 
@@ -25,10 +37,20 @@ def convert(base, output, **kwargs):
         ftype (str, default='gmx'): File type to write. Choices:
             'gmx'          - Gromacs flow format (strata.dataformats.gmx_flow_version_1)
             'simple'       - Simple binary    (strata.dataformats.simple)
+            'simple_v2'    - Simple binary with a header (strata.dataformats.simple)
             'simple_plain' - Simple plaintext (strata.dataformats.simple)
 
+        compression (str, optional): Compress 'gmx' files with this
+            compressor, 'zlib' or 'lzma'.
+
         ext (str, default='.dat'): File extension.
 
+        jobs (int, default=1): Number of files to convert at the same time.
+
+        writers (int, default=1): Number of threads which write the files
+            in the background when converting one file at a time, 0 to
+            write them directly.
+
         quiet (bool, default=False): Do not print progress.
 
     """
@@ -36,6 +58,8 @@ def convert(base, output, **kwargs):
     fopts = pop_fileopts(kwargs)
     quiet = kwargs.pop('quiet', False)
     to_ftype = kwargs.pop('ftype', 'gmx')
+    jobs = kwargs.pop('jobs', 1)
+    writers = kwargs.pop('writers', 1)
 
     zip_files = list(find_singles_to_singles(base, output, **fopts))
 
@@ -45,13 +69,208 @@ def convert(base, output, **kwargs):
         progress = pbar.ProgressBar(widgets=widgets, max_value=len(zip_files))
         progress.start()
 
-    for i, (fnin, fnout) in enumerate(zip_files):
-        data, info, metadata = read_data_file(fnin)
+    conversions = convert_files(zip_files, to_ftype, jobs, writers, **kwargs)
+
+    for i, _ in enumerate(conversions):
+        if not quiet:
+            progress.update(i+1)
+
+    if not quiet:
+        progress.finish()
+
+
+def pack(base, output, **kwargs):
+    """Pack files into a single trajectory file.
+
+    The maps are stored as frames numbered as the files. All files must
+    have the same grid geometry. See strata.dataformats.trajectory for
+    the format.
+
+    Args:
+        base (str): Base path to input files.
+
+        output (str): Path to output trajectory file.
+
+    Keyword Args:
+        begin (int, default=1): First data map number.
+
+        end (int, default=inf): Final data map number.
+
+        ext (str, default='.dat'): File extension.
+
+        quiet (bool, default=False): Do not print progress.
+
+    Returns:
+        int: Number of packed frames.
+
+    """
+
+    def gen_frames(files, begin):
+        for i, fn in enumerate(files):
+            data, info, _ = read_data_file(fn, sparse=True)
+            yield begin + i, data, info
+
+            if not quiet:
+                progress.update(i+1)
+
+    fopts = pop_fileopts(kwargs)
+    quiet = kwargs.pop('quiet', False)
+
+    files = list(find_datamap_files(base, **fopts))
+
+    if not quiet:
+        widgets = ['Packing files: ',
+                pbar.Bar(), ' (', pbar.SimpleProgress(), ') ', pbar.ETA()]
+        progress = pbar.ProgressBar(widgets=widgets, max_value=len(files))
+        progress.start()
+
+    num_frames = write_frames(output, gen_frames(files, fopts['begin']))
+
+    if not quiet:
+        progress.finish()
+
+    return num_frames
+
+
+def unpack(path, output, **kwargs):
+    """Unpack the frames of a trajectory file into separate files.
+
+    The output files are numbered as the frames.
+
+    Args:
+        path (str): Path to input trajectory file.
+
+        output (str): Base path to output files.
+
+    Keyword Args:
+        begin (int, default=1): First frame number.
+
+        end (int, default=inf): Final frame number.
+
+        ftype (str, default='gmx'): File type to write. See `convert`.
+
+        ext (str, default='.dat'): Output file extension.
+
+        jobs (int, default=1): Number of frames to convert at the same time.
+
+        writers (int, default=1): Number of threads which write the files
+            in the background when converting one frame at a time, 0 to
+            write them directly.
+
+        quiet (bool, default=False): Do not print progress.
+
+    """
+
+    def get_output_path(frame):
+        _, number = split_frame_path(frame)
+        return '%s%05d%s' % (output, number, fopts['outext'])
 
-        write(fnout, data, info, ftype=to_ftype, **kwargs)
+    fopts = pop_fileopts(kwargs)
+    quiet = kwargs.pop('quiet', False)
+    to_ftype = kwargs.pop('ftype', 'gmx')
+    jobs = kwargs.pop('jobs', 1)
+    writers = kwargs.pop('writers', 1)
 
+    frames = list(find_datamap_files(path, **fopts))
+    zip_files = [(frame, get_output_path(frame)) for frame in frames]
+
+    if not quiet:
+        widgets = ['Unpacking frames: ',
+                pbar.Bar(), ' (', pbar.SimpleProgress(), ') ', pbar.ETA()]
+        progress = pbar.ProgressBar(widgets=widgets, max_value=len(frames))
+        progress.start()
+
+    conversions = convert_files(zip_files, to_ftype, jobs, writers, **kwargs)
+
+    for i, _ in enumerate(conversions):
         if not quiet:
             progress.update(i+1)
 
     if not quiet:
         progress.finish()
+
+
+def convert_file(fnin, fnout, ftype='gmx', write_data=write, **kwargs):
+    """Convert a single file to another format.
+
+    Files are converted to formats in `SPARSE_FTYPES` from their non-empty
+    bins, without creating their full grids. Other formats store all bins
+    and the files are read in full.
+
+    Args:
+        fnin (str): Path to input file.
+
+        fnout (str): Path to output file.
+
+    Keyword Args:
+        ftype (str, default='gmx'): File type to write. See `convert`.
+
+        write_data (function, default=write): Function which writes the
+            data, see `strata.dataformats.write.write_behind`.
+
+    """
+
+    data, info, _ = read_data_file(fnin, sparse=(ftype in SPARSE_FTYPES))
+    write_data(fnout, data, info, ftype=ftype, **kwargs)
+
+
+def convert_files(zip_files, ftype='gmx', jobs=1, writers=1, **kwargs):
+    """Convert pairs of input and output files and yield as they are done.
+
+    The conversions are performed by a pool of `jobs` workers which
+    run ahead of the yielded files. Files are still yielded in order
+    and errors from converting a file are raised when it is yielded.
+
+    With a single job the files are read in turn while `writers` threads
+    write the converted files in the background. They are then yielded
+    when queued to be written and all are written when the generator
+    is exhausted.
+
+    Args:
+        zip_files (list): 2-tuples of input and output file paths.
+
+    Keyword Args:
+        ftype (str, default='gmx'): File type to write. See `convert`.
+
+        jobs (int, default=1): Number of files to convert at the same time.
+
+        writers (int, default=1): Number of threads which write the
+            files in the background for a single job.
+
+    Yields:
+        str: Path to the converted output file.
+
+    """
+
+    if jobs <= 1:
+        with write_behind(writers) as write_data:
+            for fnin, fnout in zip_files:
+                convert_file(fnin, fnout, ftype, write_data, **kwargs)
+                yield fnout
+
+        return
+
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        queue = deque()
+        pairs = iter(zip_files)
+
+        def submit(num):
+            for fnin, fnout in islice(pairs, num):
+                future = executor.submit(convert_file, fnin, fnout, ftype, **kwargs)
+                queue.append((future, fnout))
+
+        try:
+            # Keep twice as many conversions queued as there are workers,
+            # to not hold on to every pending conversion of a long series
+            submit(2 * jobs)
+
+            while queue:
+                future, fnout = queue.popleft()
+                future.result()
+
+                submit(1)
+
+                yield fnout
+        finally:
+            for future, _ in queue:
+                future.cancel()
@@ -1,2 +1,3 @@
 import strata.dataformats.gmx_flow_version_1.main
 import strata.dataformats.simple.main
+import strata.dataformats.trajectory.main
@@ -0,0 +1,266 @@
+"""Read data map files out of tar and zip archives.
+
+Files in an archive are referred to by paths which go through the archive
+as if it was a directory: 'runs.tar/flow00001.dat' is the member
+'flow00001.dat' of the archive 'runs.tar'. Such paths can be found and
+read like the paths of any other files, without extracting the archive.
+
+An archive is opened and its members are indexed once, after which the
+index is kept with the archive and used to open members. Members are
+opened as files which are read while the data is parsed, without reading
+them whole into memory. Members of uncompressed tar archives are read
+by a file handle each and members of zip archives through the kept open
+archive, so that threads which read ahead of each other do so in
+parallel. Compressed tar archives ('.tar.gz') are kept open as a single
+stream which is held by one open member at a time, which means that a
+series of members is read in a single pass through the archive as long
+as they are read in the order they are stored. At most
+`MAX_OPEN_ARCHIVES` archives are kept and the archives which were used
+the longest time ago are closed.
+
+"""
+
+import collections
+import io
+import os
+import tarfile
+import threading
+import zipfile
+
+# Number of archives which are kept open with their members, see `get_archive`
+MAX_OPEN_ARCHIVES = 4
+
+_open_archives = collections.OrderedDict()
+_open_archives_lock = threading.Lock()
+
+
+def split_archive_path(path):
+    """Return the archive path and member name of a path into an archive.
+
+    Paths which are not inside an archive are returned with their member
+    name as None.
+
+    Args:
+        path (str): Path to split.
+
+    Returns:
+        (str, str): 2-tuple with the archive path and member name.
+
+    """
+
+    if os.path.exists(path):
+        return path, None
+
+    archive = path
+    names = []
+
+    while archive not in ('', os.sep):
+        archive, name = os.path.split(archive)
+        names.insert(0, name)
+
+        if os.path.isfile(archive):
+            if get_archive(archive) != None:
+                return archive, '/'.join(names)
+
+            break
+
+    return path, None
+
+
+def list_archive_directory(path):
+    """Return the names of members in a directory of an archive.
+
+    Args:
+        path (str): Path to an archive or a directory inside one.
+
+    Returns:
+        list: Names of the members in the directory, or None if the path
+            is not an archive or a directory inside one.
+
+    """
+
+    archive, directory = split_archive_path(path)
+
+    if directory == None:
+        directory = ''
+
+    handle = get_archive(archive)
+
+    if handle == None:
+        return None
+
+    _, _, _, members = handle
+    prefix = directory.rstrip('/') + '/' if directory != '' else ''
+
+    return [name[len(prefix):] for name in members.keys()
+        if name.startswith(prefix) and '/' not in name[len(prefix):]]
+
+
+def open_member(archive, name):
+    """Open a member of an archive for reading bytes.
+
+    Members of compressed tar archives hold the archive stream until
+    they are closed, they should be closed when they have been read.
+
+    Raises:
+        FileNotFoundError: If the path is not to an archive or the member
+            does not exist in it.
+
+    """
+
+    handle = get_archive(archive)
+
+    if handle == None:
+        raise FileNotFoundError("%r is not an archive" % archive)
+
+    kind, archive_file, lock, members = handle
+
+    try:
+        member = members[name]
+    except KeyError:
+        raise FileNotFoundError("no member %r in archive %r" % (name, archive))
+
+    if kind == 'zip':
+        # Opened members are read in parallel and are kept if the archive
+        # is closed, the archive only holds its file while reading bytes
+        with lock:
+            return archive_file.open(member)
+
+    if kind == 'tar':
+        # The indexed member is read from its position by a new handle
+        tar_file = tarfile.open(archive, 'r:')
+
+        try:
+            return MemberFile(tar_file.extractfile(member), tar_file.close)
+        except:
+            tar_file.close()
+            raise
+
+    # The stream is shared by threads which read ahead, and is decompressed
+    # again from its beginning if it is read back from an earlier position
+    lock.acquire()
+
+    try:
+        return MemberFile(archive_file.extractfile(member), lock.release)
+    except:
+        lock.release()
+        raise
+
+
+class MemberFile(io.BufferedIOBase):
+    """Open file which releases what it was opened from when it is closed.
+
+    Args:
+        fp (file): Open file to read bytes from.
+
+        release (callable): Called once when the file is closed.
+
+    """
+
+    def __init__(self, fp, release):
+        self._fp = fp
+        self._release = release
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return self._fp.seekable()
+
+    def read(self, size=-1):
+        return self._fp.read(size)
+
+    def read1(self, size=-1):
+        return self._fp.read1(size)
+
+    def readinto(self, b):
+        return self._fp.readinto(b)
+
+    def readline(self, size=-1):
+        return self._fp.readline(size)
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        return self._fp.seek(offset, whence)
+
+    def tell(self):
+        return self._fp.tell()
+
+    def close(self):
+        if not self.closed:
+            try:
+                self._fp.close()
+            finally:
+                self._release()
+                super().close()
+
+
+def get_archive(path):
+    """Return the open archive at a path, or None if it is not an archive.
+
+    The archive is returned as a 4-tuple with its kind ('zip', 'tar' or
+    'stream' for compressed tar archives), the open archive, a lock which
+    is held by an open member of a stream and the index of its file
+    members, a dict with their normalised names as keys. Uncompressed tar
+    archives are not kept open and are returned with None as their open
+    archive, since their members are read by a file handle each. Archives are
+    kept while they have not been changed on disk, see `MAX_OPEN_ARCHIVES`.
+
+    """
+
+    try:
+        stat = os.stat(path)
+    except (OSError, TypeError):
+        return None
+
+    key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+
+    with _open_archives_lock:
+        try:
+            handle = _open_archives.pop(key)
+        except KeyError:
+            handle = _open_archive(*key)
+
+        _open_archives[key] = handle
+
+        while len(_open_archives) > MAX_OPEN_ARCHIVES:
+            _, evicted = _open_archives.popitem(last=False)
+            _close_archive(evicted)
+
+    return handle
+
+
+def _close_archive(handle):
+    # Zip archives are closed when their open members have been read
+    if handle != None and handle[1] != None:
+        _, archive_file, lock, _ = handle
+
+        with lock:
+            archive_file.close()
+
+
+def _open_archive(path, size, mtime):
+    def normalise(name):
+        return os.path.normpath(name).replace(os.sep, '/')
+
+    if zipfile.is_zipfile(path):
+        archive_file = zipfile.ZipFile(path)
+        members = {normalise(info.filename): info
+            for info in archive_file.infolist() if not info.is_dir()}
+
+        return 'zip', archive_file, threading.Lock(), members
+
+    try:
+        archive_file = tarfile.open(path, 'r:*')
+    except (tarfile.TarError, OSError):
+        return None
+
+    members = {normalise(info.name): info
+        for info in archive_file.getmembers() if info.isfile()}
+
+    if isinstance(archive_file.fileobj, io.BufferedReader):
+        archive_file.close()
+        return 'tar', None, threading.Lock(), members
+
+    # Members are opened and closed by the same thread, which may hold
+    # one while it opens another
+    return 'stream', archive_file, threading.RLock(), members
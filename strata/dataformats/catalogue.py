@@ -0,0 +1,197 @@
+import json
+import os
+
+from strata.dataformats.archive import split_archive_path
+from strata.dataformats.read import read_file_info
+from strata.dataformats.trajectory.read import split_frame_path
+
+"""Catalogue the header information of a series of data maps.
+
+A catalogue holds the grid geometry ('shape', 'spacing', 'origin' and
+'num_bins') and number of stored bins ('num_values') of every file in
+a series, as read from their headers by
+`strata.dataformats.read.read_file_info`. It is kept in a sidecar file
+next to the files, as a JSON object with the file paths as keys.
+
+Every entry records the size and modification time of its file. An
+entry is only used while these match the file on disk, otherwise the
+header is read again. Frames of trajectories and members of archives
+are recorded with the size and modification time of their trajectory
+or archive file.
+
+"""
+
+CATALOGUE_EXT = '.index.json'
+
+GEOMETRY_KEYS = ('shape', 'spacing', 'origin')
+
+
+def get_catalogue_path(base):
+    """Return the path of the sidecar catalogue for files at a base.
+
+    The catalogue of files in an archive is kept next to the archive.
+
+    """
+
+    archive, member = split_archive_path(base)
+
+    if member != None:
+        return '%s.%s%s' % (archive, member.replace('/', '.'), CATALOGUE_EXT)
+
+    return '%s%s' % (base, CATALOGUE_EXT)
+
+
+def catalogue_files(files, path=None):
+    """Return the catalogue entries of files.
+
+    Entries are taken from the catalogue at the input path if they are
+    up to date with their files. The headers of other files are read,
+    after which the catalogue is updated with their entries.
+
+    Args:
+        files (list): Paths of files to catalogue.
+
+    Keyword Args:
+        path (str, optional): Path to a sidecar catalogue to use and update.
+
+    Returns:
+        (dict, int): 2-tuple with the entries of the files with their
+            paths as keys and the number of files whose headers were read.
+
+    """
+
+    catalogue = read_catalogue(path) if path != None else {}
+
+    entries = {}
+    num_read = 0
+
+    for filename in files:
+        file_path, _ = split_frame_path(filename)
+        file_path, _ = split_archive_path(file_path)
+        stat = os.stat(file_path)
+
+        entry = catalogue.get(filename)
+
+        if entry == None or entry['size'] != stat.st_size \
+                or entry['mtime_ns'] != stat.st_mtime_ns:
+            entry = read_entry(filename, stat)
+            num_read += 1
+
+        entries[filename] = entry
+
+    if path != None and num_read > 0:
+        catalogue.update(entries)
+
+        try:
+            write_catalogue(path, catalogue)
+        except OSError:
+            print("[WARNING] Could not write the catalogue to '%s'." % path)
+
+    return entries, num_read
+
+
+def read_entry(filename, stat):
+    """Return the catalogue entry of a file from its header."""
+
+    info, num_values, meta = read_file_info(filename)
+
+    entry = {
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'format': meta['module'].__name__.split('.')[-2],
+        'num_values': num_values,
+    }
+
+    for key in GEOMETRY_KEYS + ('num_bins', ):
+        entry[key] = info[key] if info != None else None
+
+    return normalise_entry(entry)
+
+
+def normalise_entry(entry):
+    """Return an entry with its values as plain numbers and tuples.
+
+    Entries read from disk have lists for tuples and header values can
+    be numpy numbers, which are all converted for them to be comparable.
+
+    """
+
+    for key in ('size', 'mtime_ns', 'num_values', 'num_bins'):
+        if entry[key] != None:
+            entry[key] = int(entry[key])
+
+    for key, convert in zip(GEOMETRY_KEYS, (int, float, float)):
+        if entry[key] != None:
+            entry[key] = tuple(convert(v) for v in entry[key])
+
+    return entry
+
+
+def read_catalogue(path):
+    """Return the entries of a catalogue file.
+
+    An empty catalogue is returned if the file does not exist
+    or can not be read.
+
+    """
+
+    try:
+        with open(path, 'r') as fp:
+            catalogue = json.load(fp)
+
+        return {filename: normalise_entry(entry)
+            for filename, entry in catalogue.items()}
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        return {}
+
+
+def write_catalogue(path, catalogue):
+    """Write catalogue entries to a file.
+
+    The file is written in full and then moved into place, to not leave
+    a partial catalogue behind if writing fails.
+
+    """
+
+    tmp_path = '%s.tmp' % path
+
+    with open(tmp_path, 'w') as fp:
+        json.dump(catalogue, fp, indent=1, sort_keys=True)
+
+    os.replace(tmp_path, path)
+
+
+def check_geometry(entries):
+    """Return the grid geometry shared by all catalogue entries.
+
+    Args:
+        entries (dict): Catalogue entries with file paths as keys.
+
+    Returns:
+        dict: The common 'shape', 'spacing' and 'origin' of the grids,
+            or None if there are no entries.
+
+    Raises:
+        ValueError: If the geometry is unknown for a file or differs
+            between files.
+
+    """
+
+    geometry = None
+    first = None
+
+    for filename, entry in entries.items():
+        current = {key: entry[key] for key in GEOMETRY_KEYS}
+
+        if any(value == None for value in current.values()):
+            raise ValueError("the grid geometry of %r is not stored in its header"
+                % filename)
+
+        if geometry == None:
+            geometry = current
+            first = filename
+        elif current != geometry:
+            raise ValueError("the grid geometry of %r differs from that of %r"
+                % (filename, first))
+
+    return geometry
@@ -0,0 +1,202 @@
+"""Read files which are compressed as a whole.
+
+Data map files can be stored compressed with gzip, bzip2 or xz, for
+instance as '.dat.gz' files. Such files are recognised by the magic
+bytes at their beginning, not by their extension, and are decompressed
+while they are read. The values are decompressed straight into the
+arrays which are returned, without a decompressed copy of the file on
+disk or in memory.
+
+Files in tar and zip archives are opened through the same function,
+see `strata.dataformats.archive`. They can also be compressed.
+
+Compressed files can not be memory mapped, their data is then read
+into memory. Seeking in them requires decompressing up to the new
+position, which means that skipping fields still decompresses them
+but does not keep them.
+
+"""
+
+import bz2
+import gzip
+import io
+import lzma
+import numpy as np
+
+from strata.dataformats.archive import MemberFile, open_member, split_archive_path
+
+# Magic bytes, names and functions which open files of compressors
+COMPRESSORS = (
+    (b'\x1f\x8b', 'gzip', gzip.open),
+    (b'BZh', 'bz2', bz2.open),
+    (b'\xfd7zXZ\x00', 'xz', lzma.open),
+)
+
+# Extensions of compressed files
+COMPRESSED_EXTS = ('.gz', '.bz2', '.xz')
+
+
+def get_compression(path):
+    """Return the name of the compressor of a file or None if uncompressed."""
+
+    try:
+        with open(path, 'rb') as fp:
+            return get_stream_compression(fp)
+    except (OSError, TypeError):
+        return None
+
+
+def get_stream_compression(fp):
+    """Return the compressor name of an open file from its first bytes.
+
+    The file pointer is moved back to where it was.
+
+    """
+
+    pos = fp.tell()
+    buf = fp.read(8)
+    fp.seek(pos)
+
+    for magic, name, _ in COMPRESSORS:
+        if buf.startswith(magic):
+            return name
+
+    return None
+
+
+def open_file(path):
+    """Open a file for reading bytes, which are decompressed if compressed.
+
+    Paths to members of archives are opened as files which are read
+    from the archive, see `strata.dataformats.archive.open_member`.
+
+    Args:
+        path (str): Path to file.
+
+    Returns:
+        file: Open file object.
+
+    """
+
+    archive, member = split_archive_path(path)
+
+    if member != None:
+        fp = open_member(archive, member)
+    else:
+        fp = open(path, 'rb')
+
+    compression = get_stream_compression(fp)
+
+    for _, name, open_compressed in COMPRESSORS:
+        if name == compression:
+            # Decompressed members close the member from the archive
+            if member != None:
+                return MemberFile(open_compressed(fp, 'rb'), fp.close)
+
+            fp.close()
+            return open_compressed(path, 'rb')
+
+    return fp
+
+
+def is_stream(fp):
+    """Return whether an open file object is not read directly from disk.
+
+    Such files are decompressed, read from archives or pipes and can
+    not be memory mapped or read with `numpy.fromfile`.
+
+    """
+
+    return not isinstance(getattr(fp, 'raw', None), io.FileIO) \
+        or not fp.seekable()
+
+
+def skip_bytes(fp, num_bytes, chunk_size=2**20):
+    """Move the pointer of an open file forward by a number of bytes.
+
+    Files which can not seek, such as pipes, are read past the bytes.
+
+    """
+
+    if fp.seekable():
+        fp.seek(num_bytes, 1)
+        return
+
+    while num_bytes > 0:
+        buf = fp.read(min(num_bytes, chunk_size))
+
+        if buf == b'':
+            break
+
+        num_bytes -= len(buf)
+
+
+def read_array(fp, dtype, count=-1, chunk_size=2**24):
+    """Read values from an open file into an array.
+
+    Uncompressed files are read with `numpy.fromfile`. Compressed files
+    and other streams are read straight into the array. If the number of
+    values is not known the array is grown while reading until the file ends.
+    As for `numpy.fromfile` fewer values are returned if the file ends
+    before all are read.
+
+    Args:
+        fp (file): Open file object with its pointer at the values.
+
+        dtype (data-type): Data type of values.
+
+    Keyword Args:
+        count (int, default=-1): Number of values to read, -1 to read
+            until the file ends.
+
+        chunk_size (int, default=16 MiB): Initial number of bytes to read
+            into if the number of values is not known.
+
+    Returns:
+        ndarray: Read values.
+
+    """
+
+    def read_into(data, num_bytes):
+        buf = memoryview(data.view(np.uint8))[num_bytes:]
+
+        while buf.nbytes > 0:
+            num_read = fp.readinto(buf)
+
+            if num_read == 0:
+                break
+
+            buf = buf[num_read:]
+            num_bytes += num_read
+
+        return num_bytes
+
+    dtype = np.dtype(dtype)
+
+    if not is_stream(fp):
+        return np.fromfile(fp, dtype=dtype, count=count)
+
+    if count >= 0:
+        data = np.empty(count, dtype=dtype)
+        num_bytes = read_into(data, 0)
+    else:
+        data = np.empty(max(chunk_size // dtype.itemsize, 1), dtype=dtype)
+        num_bytes = read_into(data, 0)
+
+        while num_bytes == data.nbytes:
+            grown_data = np.empty(2 * data.size, dtype=dtype)
+            grown_data[:data.size] = data
+            data = grown_data
+            num_bytes = read_into(data, num_bytes)
+
+    return data[:num_bytes // dtype.itemsize]
+
+
+def strip_compressed_ext(ext):
+    """Return a file extension without a compressed file extension."""
+
+    for compressed_ext in COMPRESSED_EXTS:
+        if ext.endswith(compressed_ext):
+            return ext[:-len(compressed_ext)]
+
+    return ext
@@ -0,0 +1,62 @@
+import functools
+import numpy as np
+
+"""Shared coordinates of data map grids.
+
+The maps of a series are binned on the same grid, which means that their
+coordinates are identical. Instead of creating them for every map they
+are created once per grid geometry and the same arrays are returned for
+all maps with that grid. Since the arrays are shared they are read-only.
+
+Code which compares the coordinates of maps can first compare them by
+identity, which is immediate for maps read with the same grid.
+
+"""
+
+def get_grid_coords(origin, shape, spacing, dtype=np.float64, offset=0.5):
+    """Return the shared coordinates of the bins of a grid.
+
+    The coordinates of bin (i, j) are `origin + spacing * (index + offset)`
+    and are returned for all bins along x first and then y, as the data
+    of the maps is ordered. The arrays are cached by the grid geometry,
+    data type and offset.
+
+    Args:
+        origin (2-tuple): Origin of the grid.
+
+        shape (2-tuple): Number of bins along x and y.
+
+        spacing (2-tuple): Bin spacing along x and y.
+
+    Keyword Args:
+        dtype (data-type, default=np.float64): Data type of the coordinates.
+
+        offset (float, default=0.5): Offset of bin coordinates from their
+            index in units of the spacing, 0.5 for bin centers of grids
+            whose origin is at the edge of the first bin and 0 for grids
+            whose origin is at its center.
+
+    Returns:
+        (ndarray, ndarray): 2-tuple with read-only X and Y coordinates.
+
+    """
+
+    return _get_grid_coords(
+        tuple(float(v) for v in origin),
+        tuple(int(n) for n in shape),
+        tuple(float(v) for v in spacing),
+        np.dtype(dtype).str,
+        float(offset))
+
+
+@functools.lru_cache(maxsize=8)
+def _get_grid_coords(origin, shape, spacing, dtype, offset):
+    x, y = [(x0 + dx * (np.arange(n, dtype=np.float64) + offset)).astype(dtype)
+        for x0, dx, n in zip(origin, spacing, shape)]
+
+    xs, ys = (v.ravel() for v in np.meshgrid(x, y, indexing='ij'))
+
+    for v in (xs, ys):
+        v.flags.writeable = False
+
+    return xs, ys
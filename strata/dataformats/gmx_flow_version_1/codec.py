@@ -0,0 +1,153 @@
+import lzma
+import numpy as np
+import zlib
+
+"""Compression of the field data stored in GMX_FLOW_1 files.
+
+Every field is encoded on its own by first applying a filter to its values
+and then compressing the filtered bytes. Filters make the data easier to
+compress:
+
+    'none'    - The values are stored as they are.
+    'delta'   - Differences between consecutive values are stored, which
+                makes the increasing bin indices small and repetitive.
+    'shuffle' - The bytes of the values are grouped by their significance,
+                such that the similar sign and exponent bytes of floating
+                point numbers end up next to each other.
+
+The filtered bytes are compressed by a compressor from the standard
+library, either 'zlib' or 'lzma', or stored uncompressed as 'none'.
+
+"""
+
+COMPRESSORS = {
+    'none': (lambda buf: buf, lambda buf: buf),
+    'zlib': (lambda buf: zlib.compress(buf, 6), zlib.decompress),
+    'lzma': (lzma.compress, lzma.decompress),
+}
+
+FILTERS = ('none', 'delta', 'shuffle')
+
+
+def encode_field(values, dtype, compressor='zlib', filters=None):
+    """Return the field values encoded with the best codec.
+
+    Every input filter is tried with the compressor and the codec which
+    gives the smallest output is chosen. Data which is not made smaller
+    by the compression is stored uncompressed.
+
+    Args:
+        values (ndarray): Values of the field.
+
+        dtype (data-type): Data-type to store the values with.
+
+        compressor (str, default='zlib'): Compressor to use.
+
+        filters (list, optional): Filters to try, by default 'delta' for
+            integers and 'shuffle' for floating point numbers along with
+            no filter.
+
+    Returns:
+        (str, str, bytes): 3-tuple with the filter and compressor names
+            and the encoded data.
+
+    Raises:
+        ValueError: If a compressor or filter does not exist.
+
+    """
+
+    try:
+        compress, _ = COMPRESSORS[compressor]
+    except KeyError:
+        raise ValueError("unknown compressor %r, must be one of %r"
+            % (compressor, tuple(COMPRESSORS.keys())))
+
+    values = np.ascontiguousarray(values, dtype=dtype)
+
+    if filters == None:
+        if np.issubdtype(values.dtype, np.integer):
+            filters = ['delta', 'none']
+        else:
+            filters = ['shuffle', 'none']
+
+    raw = values.tobytes()
+    best = ('none', 'none', raw)
+
+    for filter_name in filters:
+        buf = compress(apply_filter(values, filter_name))
+
+        if len(buf) < len(best[2]):
+            best = (filter_name, compressor, buf)
+
+    return best
+
+
+def decode_field(buf, num_values, dtype, filter_name, compressor):
+    """Return field values decoded from their stored bytes.
+
+    The values are decompressed and unfiltered into the returned array
+    with at most a single copy. Unfiltered values are returned as a
+    read-only view of the decompressed bytes.
+
+    Args:
+        buf (bytes): Encoded data.
+
+        num_values (int): Number of stored values.
+
+        dtype (data-type): Data-type of the stored values.
+
+        filter_name (str): Filter applied to the values.
+
+        compressor (str): Compressor used for the data.
+
+    Returns:
+        ndarray: The decoded values.
+
+    Raises:
+        ValueError: If the compressor or filter does not exist or
+            the decoded data does not have the expected size.
+
+    """
+
+    try:
+        _, decompress = COMPRESSORS[compressor]
+    except KeyError:
+        raise ValueError("unknown compressor %r" % compressor)
+
+    dtype = np.dtype(dtype)
+    raw = np.frombuffer(decompress(buf), dtype=np.uint8)
+
+    if raw.size != num_values * dtype.itemsize:
+        raise ValueError("decoded data has %d bytes but should have %d"
+            % (raw.size, num_values * dtype.itemsize))
+
+    if filter_name == 'none':
+        return raw.view(dtype)
+    elif filter_name == 'delta':
+        values = np.empty(num_values, dtype=dtype)
+        return np.cumsum(raw.view(dtype), dtype=dtype, out=values)
+    elif filter_name == 'shuffle':
+        values = np.empty(num_values, dtype=dtype)
+        values.view(np.uint8).reshape(num_values, dtype.itemsize)[:] = \
+            raw.reshape(dtype.itemsize, num_values).T
+        return values
+    else:
+        raise ValueError("unknown filter %r, must be one of %r" % (filter_name, FILTERS))
+
+
+def apply_filter(values, filter_name):
+    """Return the bytes of the values with a filter applied."""
+
+    if filter_name == 'none':
+        return values.tobytes()
+    elif filter_name == 'delta':
+        # Wrap around for decreasing integers is undone by the sum
+        deltas = np.empty_like(values)
+        deltas[:1] = values[:1]
+        np.subtract(values[1:], values[:-1], out=deltas[1:])
+        return deltas.tobytes()
+    elif filter_name == 'shuffle':
+        itemsize = values.dtype.itemsize
+        return values.view(np.uint8).reshape(values.size, itemsize).T.tobytes()
+    else:
+        raise ValueError("unknown filter %r, must be one of %r" % (filter_name, FILTERS))
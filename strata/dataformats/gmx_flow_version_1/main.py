@@ -1,5 +1,5 @@
 from strata.dataformats.simple.average import average_data, combine_bins
-from strata.dataformats.gmx_flow_version_1.read import read_data
+from strata.dataformats.gmx_flow_version_1.read import read_data, read_frames, read_info
 from strata.dataformats.gmx_flow_version_1.write import write_data
 
 """Main functionality of this module is called from here."""
\ No newline at end of file
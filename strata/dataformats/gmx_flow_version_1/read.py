@@ -1,60 +1,418 @@
 import numpy as np
 
+from droplets.flow import INDEX_LABELS, ScatteredFields, get_float_dtype, \
+    get_precision
+from strata.dataformats.compressed import is_stream, open_file, read_array, \
+    skip_bytes
+from strata.dataformats.gmx_flow_version_1.codec import decode_field
+from strata.dataformats.geometry import get_grid_coords
+
 FIELDS = ['X', 'Y', 'N', 'T', 'M', 'U', 'V']
 
-def read_data(filename):
+DTYPES = {
+    'IX': np.uint64,
+    'IY': np.uint64,
+    'N': np.float32,
+    'T': np.float32,
+    'M': np.float32,
+    'U': np.float32,
+    'V': np.float32,
+}
+
+def read_data(filename, mmap=False, sparse=False, fields=None,
+        xlim=None, ylim=None):
     """Read field data from a file.
 
     Args:
         filename (str): A file to read data from.
 
+    Keyword Args:
+        mmap (bool, default=False): Memory map the data section of the file
+            instead of reading it into memory. See `map_values`. The full
+            grid is then returned as `droplets.flow.ScatteredFields`, which
+            reads and expands the stored values of a field when it is
+            first accessed.
+
+        sparse (bool, default=False): Return only the non-empty bins stored
+            in the file along with their bin indices 'IX' and 'IY', instead
+            of expanding them onto the full grid.
+
+        fields (list, optional): Read only these fields, along with the
+            coordinates. The data of other fields is skipped in the file.
+
+        xlim, ylim (2-tuples, optional): Return only the bins with center
+            coordinates inside these limits. See `get_window`.
+
     Returns:
         (dict, dict): 2-tuple of dict's with data and informatioin. See
             strata.dataformats.read.read_data_file for more information.
 
+    Compressed files (see `strata.dataformats.gmx_flow_version_1.codec`)
+    are decompressed while reading, for which memory mapping has no effect.
+    This is also the case for files which are compressed as a whole, see
+    `strata.dataformats.compressed`.
+
+    The data is returned with the precision set by
+    `droplets.flow.set_precision`. If none is set the stored values of
+    sparse data keep their single precision and the full grid is created
+    with double precision.
+
     """
 
-    with open(filename, 'rb') as fp:
-        fields, num_values, info = read_header(fp)
-        data = read_values(fp, num_values, fields)
+    with open_file(filename) as fp:
+        return read_frame(fp, mmap, sparse, fields, xlim, ylim)
+
+def read_frame(fp, mmap=False, sparse=False, fields=None, xlim=None, ylim=None):
+    """Read field data of a map from an open file with its pointer at the header.
+
+    The pointer is left after the data of the map, which is at the header
+    of the next map if several are concatenated in the file. See `read_data`
+    for the keyword arguments.
+
+    Args:
+        fp (file): Open binary file.
+
+    Returns:
+        (dict, dict): 2-tuple of dict's with data and information.
+
+    Raises:
+        EOFError: If the file ends before the header.
+
+    """
+
+    stored_fields, num_values, info, codecs = parse_header(fp)
+    selected = select_fields(stored_fields, fields)
+
+    mapped = codecs == {} and mmap and not is_stream(fp)
+
+    if codecs != {}:
+        data = decode_values(fp, num_values, stored_fields, codecs, selected)
+    elif mapped:
+        data = map_values(fp, num_values, stored_fields, selected)
+    else:
+        data = read_values(fp, num_values, stored_fields, selected)
+
+    if xlim != None or ylim != None:
+        data, info = get_window_data(data, info, xlim, ylim)
+
+    if sparse:
+        return get_sparse_data(data, info), info
+
+    return get_grid_data(data, info, lazy=mapped), info
+
+def read_frames(fp, **kwargs):
+    """Yield field data of maps which are concatenated in an open file.
+
+    The maps are read in turn as they are written to the file, which can
+    be a stream such as a named pipe or the standard input. Streams are
+    read without seeking. Maps are yielded until the file ends.
+
+    Args:
+        fp (file): Open binary file.
+
+    Keyword Args:
+        sparse, fields, xlim, ylim: See `read_data`.
+
+    Yields:
+        (dict, dict): 2-tuple of dict's with data and information.
+
+    """
+
+    while True:
+        try:
+            data, info = read_frame(fp, **kwargs)
+        except EOFError:
+            return
+
+        yield data, info
+
+def get_window(info, xlim=None, ylim=None):
+    """Return the bin index ranges and information of a window of the grid.
+
+    The window contains the bins with center coordinates inside the limits,
+    which include their end points. Either limit can be None to not limit
+    the window in that direction.
+
+    Args:
+        info (dict): Information about the full grid.
+
+    Keyword Args:
+        xlim, ylim (2-tuples, optional): Limits of the window.
+
+    Returns:
+        (list, dict): 2-tuple with the (begin, end) bin index ranges along
+            x and y and the information about the window.
+
+    """
+
+    def get_range(x0, dx, n, lims):
+        vmin, vmax = lims if lims != None else (None, None)
+        vmin = vmin if vmin != None else -np.inf
+        vmax = vmax if vmax != None else np.inf
+
+        xs = x0 + dx * (np.arange(n) + 0.5)
+        inds = np.nonzero((xs >= vmin) & (xs <= vmax))[0]
+
+        if inds.size == 0:
+            return 0, 0
+
+        return int(inds[0]), int(inds[-1]) + 1
+
+    ranges = [get_range(x0, dx, n, lims) for x0, dx, n, lims
+        in zip(info['origin'], info['spacing'], info['shape'], (xlim, ylim))]
+
+    shape = tuple(end - begin for begin, end in ranges)
+
+    window_info = {
+        'shape': shape,
+        'spacing': info['spacing'],
+        'origin': tuple(x0 + dx * begin for x0, dx, (begin, _)
+            in zip(info['origin'], info['spacing'], ranges)),
+        'num_bins': shape[0] * shape[1],
+    }
+
+    return ranges, window_info
+
+def get_window_data(values, info, xlim=None, ylim=None):
+    """Return the stored bins inside a window and its information.
+
+    The bins are selected by their indices before they are expanded or
+    converted to coordinates, and their indices are moved to the origin
+    of the window.
+
+    """
+
+    ranges, window_info = get_window(info, xlim, ylim)
+
+    if window_info['shape'] == tuple(info['shape']):
+        return values, info
+
+    (ix0, ix1), (iy0, iy1) = ranges
+    ix = values['IX']
+    iy = values['IY']
+
+    inds = (ix >= ix0) & (ix < ix1) & (iy >= iy0) & (iy < iy1)
+
+    data = {l: values[l][inds] for l in values.keys()}
+    data['IX'] = data['IX'] - np.uint64(ix0)
+    data['IY'] = data['IY'] - np.uint64(iy0)
+
+    return data, window_info
+
+def get_grid_data(values, info, lazy=False):
+    """Return the stored bins of a file expanded onto the full grid.
+
+    The coordinates are the read-only arrays shared by all maps with the
+    same grid, see `strata.dataformats.geometry`.
+
+    With `lazy` set the fields are returned as `droplets.flow.ScatteredFields`,
+    which expands a field when it is first accessed. This is used for
+    memory mapped values, which are then not read until they are used.
+
+    """
 
-    x0, y0 = info['origin']
     nx, ny = info['shape']
+
+    data = {}
+    data['X'], data['Y'] = get_grid_coords(info['origin'], info['shape'],
+        info['spacing'], dtype=get_float_dtype())
+
+    if lazy:
+        stored = {l: values[l] for l in list(INDEX_LABELS) + FIELDS[2:]
+            if l in values.keys()}
+
+        return ScatteredFields(stored, (nx, ny), get_float_dtype(), fields=data)
+
+    inds = values['IX'] * np.uint64(ny) + values['IY']
+
+    for l in FIELDS[2:]:
+        if l in values.keys():
+            data[l] = np.zeros(nx * ny, dtype=get_float_dtype())
+            data[l][inds] = values[l]
+
+    return data
+
+def get_sparse_data(values, info):
+    """Return the stored bins of a file with coordinates and indices.
+
+    The field values are returned as they were read, which means that
+    no copies are made of memory mapped values.
+
+    """
+
+    x0, y0 = info['origin']
     dx, dy = info['spacing']
 
-    x = x0 + dx * (np.arange(nx) + 0.5)
-    y = y0 + dy * (np.arange(ny) + 0.5)
-    xs, ys = np.meshgrid(x, y, indexing='ij')
+    data = {l: values[l] for l in values.keys()}
 
-    grid = np.zeros((nx, ny), dtype=[(l, np.float) for l in FIELDS])
-    grid['X'] = xs
-    grid['Y'] = ys
+    if get_precision() is not None:
+        for l in values.keys():
+            if np.issubdtype(values[l].dtype, np.floating):
+                data[l] = values[l].astype(get_precision(), copy=False)
 
-    for l in ['N', 'T', 'M', 'U', 'V']:
-        grid[l][data['IX'], data['IY']] = data[l]
+    data['X'] = (x0 + dx * (values['IX'] + 0.5)).astype(get_float_dtype())
+    data['Y'] = (y0 + dy * (values['IY'] + 0.5)).astype(get_float_dtype())
 
-    grid = grid.ravel()
+    return data
 
-    return {l: grid[l] for l in FIELDS}, info
+def select_fields(stored_fields, fields=None):
+    """Return the stored fields to read, with the bin indices.
 
-def read_values(fp, num_values, fields):
-    dtypes = {
-        'IX': np.uint64,
-        'IY': np.uint64,
-        'N': np.float32,
-        'T': np.float32,
-        'M': np.float32,
-        'U': np.float32,
-        'V': np.float32,
-    }
+    Raises:
+        KeyError: If a field is not stored in the file.
 
-    return {
-        l: np.fromfile(fp, dtype=dtypes[l], count=num_values)
-        for l in fields
-    }
+    """
+
+    if fields == None:
+        return list(stored_fields)
+
+    for l in fields:
+        if l not in stored_fields and l not in ('X', 'Y'):
+            raise KeyError("field %r is not stored in the file" % l)
+
+    return [l for l in stored_fields if l in ('IX', 'IY') or l in fields]
+
+def read_values(fp, num_values, fields, selected=None):
+    """Return the field values read from the data section.
+
+    Fields which are not selected are skipped over.
+
+    """
+
+    data = {}
+    for l in fields:
+        dtype = np.dtype(DTYPES[l])
+
+        if selected == None or l in selected:
+            data[l] = read_array(fp, dtype, num_values)
+        else:
+            skip_bytes(fp, num_values * dtype.itemsize)
+
+    return data
+
+def decode_values(fp, num_values, fields, codecs, selected=None):
+    """Return the field values of compressed data.
+
+    Args:
+        fp (file): Open binary file with its pointer at the data section,
+            as left by `read_header`.
+
+        num_values (int): Number of values stored for each field.
+
+        fields (list): Field labels in the order they are stored.
+
+        codecs (dict): Filter and compressor names and number of stored
+            bytes of each field, as read by `parse_header`.
+
+        selected (list, optional): Fields to decode, others are skipped.
+
+    Returns:
+        dict: Arrays with field labels as keys.
+
+    """
+
+    data = {}
+    for l in fields:
+        filter_name, compressor, num_bytes = codecs[l]
+
+        if selected == None or l in selected:
+            data[l] = decode_field(fp.read(num_bytes), num_values, DTYPES[l],
+                filter_name, compressor)
+        else:
+            skip_bytes(fp, num_bytes)
+
+    return data
+
+def map_values(fp, num_values, fields, selected=None):
+    """Return read-only views of the field values in memory maps.
+
+    The values of every selected field are memory mapped from the data
+    section following the header, and exposed as an array backed directly
+    by the map. Only the values of this map are mapped, not the rest of
+    the file, which may hold many more maps. No values are read or copied
+    until an array is accessed, after which the operating system pages in
+    only the part of the file that is used. The maps are kept alive by the
+    returned arrays and the file pointer need not stay open. The pointer
+    is moved past the data section.
+
+    Args:
+        fp (file): Open binary file with its pointer at the data section,
+            as left by `read_header`.
+
+        num_values (int): Number of values stored for each field.
+
+        fields (list): Field labels in the order they are stored.
+
+        selected (list, optional): Fields to map, others are skipped.
+
+    Returns:
+        dict: Read-only arrays with field labels as keys.
+
+    """
+
+    def map_field(dtype, offset):
+        # Empty ranges can not be mapped
+        if num_values == 0:
+            return np.empty((0, ), dtype=dtype)
+
+        values = np.memmap(fp, dtype=dtype, mode='r',
+                offset=offset, shape=(num_values, ))
+
+        return values.view(np.ndarray)
+
+    offset = fp.tell()
+
+    data = {}
+    for l in fields:
+        dtype = np.dtype(DTYPES[l])
+
+        if selected == None or l in selected:
+            data[l] = map_field(dtype, offset)
+
+        offset += num_values * dtype.itemsize
+
+    fp.seek(offset)
+
+    return data
+
+def read_info(filename):
+    """Return the grid information and number of stored bins of a file.
+
+    Only the header of the file is read.
+
+    Args:
+        filename (str): A file to read information from.
+
+    Returns:
+        (dict, int): 2-tuple with the information and number of stored
+            bins, which is None if the header has no 'NUMDATA' line.
+
+    """
+
+    with open_file(filename) as fp:
+        _, num_values, info, _ = parse_header(fp)
+
+    return info, num_values
 
 def read_header(fp):
-    """Read header information and forward the pointer to the data."""
+    """Read header information and forward the pointer to the data.
+
+    The number of values is None if the header has no 'NUMDATA' line.
+
+    """
+
+    fields, num_values, info, _ = parse_header(fp)
+
+    return fields, num_values, info
+
+def parse_header(fp):
+    """Read header information including the codecs of compressed data.
+
+    The codecs are returned as a dict with field labels as keys and
+    the filter and compressor names and number of stored bytes as
+    values. It is empty for data which is not compressed.
+
+    """
 
     def read_shape(line):
         return tuple(int(v) for v in line.split()[1:3])
@@ -68,19 +426,31 @@ def read_header(fp):
     def parse_field_labels(line):
         return line.split()[1:]
 
+    def parse_codec(line):
+        label, filter_name, compressor, num_bytes = line.split()[1:5]
+        return label, (filter_name, compressor, int(num_bytes))
+
     def read_header_string(fp):
-        buf_size = 1024
+        # Streams are read a byte at a time to not read past the header
+        buf_size = 1024 if fp.seekable() else 1
         header_str = ""
 
         while True:
             buf = fp.read(buf_size)
 
+            if buf == b'':
+                if header_str == "":
+                    raise EOFError("no header to read")
+
+                raise ValueError("the header is not ended by a null byte")
+
             pos = buf.find(b'\0')
 
             if pos != -1:
                 header_str += buf[:pos].decode("ascii")
-                offset = buf_size - pos - 1
-                fp.seek(-offset, 1)
+                offset = len(buf) - pos - 1
+                if offset > 0:
+                    fp.seek(-offset, 1)
                 break
             else:
                 header_str += buf.decode("ascii")
@@ -88,6 +458,8 @@ def read_header(fp):
         return header_str
 
     info = {}
+    codecs = {}
+    num_values = None
     header_str = read_header_string(fp)
 
     for line in header_str.splitlines():
@@ -103,7 +475,10 @@ def read_header(fp):
             fields = parse_field_labels(line)
         elif line_type == "NUMDATA":
             num_values = read_num_values(line)
+        elif line_type == "CODEC":
+            label, codec = parse_codec(line)
+            codecs[label] = codec
 
     info['num_bins'] = info['shape'][0] * info['shape'][1]
 
-    return fields, num_values, info
+    return fields, num_values, info, codecs
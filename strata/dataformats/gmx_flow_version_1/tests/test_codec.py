@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+from strata.dataformats.gmx_flow_version_1.codec import encode_field, decode_field
+
+def test_encode_and_decode_indices_with_delta_filter():
+    ixs = np.repeat(np.arange(50, dtype=np.uint64), 20)
+
+    filter_name, compressor, buf = encode_field(ixs, np.uint64, 'zlib')
+    assert (filter_name == 'delta')
+    assert (compressor == 'zlib')
+    assert (len(buf) < ixs.nbytes)
+
+    values = decode_field(buf, ixs.size, np.uint64, filter_name, compressor)
+    assert (values.dtype == np.uint64)
+    assert (np.array_equal(values, ixs))
+
+def test_encode_and_decode_decreasing_integers():
+    iys = np.tile(np.arange(10, dtype=np.uint64), 10)
+
+    for filters in (['delta'], ['none'], ['shuffle']):
+        filter_name, compressor, buf = encode_field(iys, np.uint64, 'lzma', filters)
+        values = decode_field(buf, iys.size, np.uint64, filter_name, compressor)
+        assert (np.array_equal(values, iys))
+
+def test_encode_and_decode_floats():
+    temps = (300. + np.random.normal(scale=0.1, size=1000)).astype(np.float32)
+    flows = np.zeros(1000, dtype=np.float32)
+    flows[::10] = np.random.sample(100)
+
+    for data in (temps, flows):
+        for compressor in ('zlib', 'lzma'):
+            filter_name, compressor, buf = encode_field(data, np.float32, compressor)
+            assert (len(buf) < data.nbytes)
+
+            values = decode_field(buf, data.size, np.float32, filter_name, compressor)
+            assert (values.dtype == np.float32)
+            assert (np.array_equal(values, data))
+
+def test_incompressible_data_is_stored_raw():
+    data = np.random.sample(4).astype(np.float32)
+
+    filter_name, compressor, buf = encode_field(data, np.float32, 'zlib')
+    assert ((filter_name, compressor) == ('none', 'none'))
+    assert (buf == data.tobytes())
+
+    assert (np.array_equal(decode_field(buf, 4, np.float32, 'none', 'none'), data))
+
+def test_bad_codecs_raise_errors():
+    data = np.arange(4, dtype=np.uint64)
+
+    with pytest.raises(ValueError):
+        encode_field(data, np.uint64, 'bz2')
+
+    with pytest.raises(ValueError):
+        encode_field(data, np.uint64, 'zlib', ['rle'])
+
+    _, _, buf = encode_field(data, np.uint64, 'zlib', ['delta'])
+
+    with pytest.raises(ValueError):
+        decode_field(buf, 5, np.uint64, 'delta', 'zlib')
@@ -0,0 +1,297 @@
+import numpy as np
+import os
+import pytest
+import tempfile as tmp
+
+from strata.dataformats.gmx_flow_version_1.read import read_data, read_header, map_values
+from strata.dataformats.gmx_flow_version_1.write import write_data
+from droplets.flow import FlowData, ScatteredFields, set_precision
+
+tmpfn = 'tmp.dat'
+fields = ('N', 'T', 'M', 'U', 'V')
+
+info = {'shape': (3, 2), 'origin': (0., 0.), 'spacing': (1., 1.), 'num_bins': 6}
+
+x = np.arange(3) + 0.5
+y = np.arange(2) + 0.5
+xs, ys = np.meshgrid(x, y, indexing='ij')
+
+save_data = {'X': xs.ravel(), 'Y': ys.ravel()}
+for l in fields:
+    save_data[l] = np.random.sample(6)
+
+# Leave two bins empty to verify that they are filled with zeros
+save_data['M'][[1, 4]] = 0.
+
+
+def test_read_mmap_matches_read():
+    with tmp.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, tmpfn)
+        write_data(path, save_data, info)
+
+        data, read_info = read_data(path)
+        mapped_data, mapped_info = read_data(path, mmap=True)
+
+        assert (read_info == mapped_info)
+
+        for l in data.keys():
+            assert (np.array_equal(data[l], mapped_data[l]))
+
+        for l in ('M', 'U'):
+            inds = save_data['M'] != 0.
+            assert (np.allclose(mapped_data[l][inds], save_data[l][inds]))
+            assert (np.array_equal(mapped_data[l][~inds], [0., 0.]))
+
+
+def test_read_mmap_expands_fields_when_accessed():
+    with tmp.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, tmpfn)
+        write_data(path, save_data, info)
+
+        data, _ = read_data(path)
+        mapped_data, _ = read_data(path, mmap=True)
+
+        assert (type(mapped_data) == ScatteredFields)
+        assert (list(mapped_data.keys()) == list(data.keys()))
+        assert (mapped_data._expanded == {})
+
+        flow = FlowData(mapped_data, info=info)
+        assert (np.array_equal(flow.fields['U'], data['U']))
+        assert (list(mapped_data._expanded.keys()) == ['U'])
+        assert (not flow.fields['U'].flags.writeable)
+
+        # Fields are expanded once and shared with the read data
+        assert (flow.fields['U'] is mapped_data['U'])
+        assert (flow.copy().fields['U'] is flow.fields['U'])
+
+
+def test_map_values_are_read_only_views():
+    with tmp.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, tmpfn)
+        write_data(path, save_data, info)
+
+        with open(path, 'rb') as fp:
+            fields, num_values, _ = read_header(fp)
+            values = map_values(fp, num_values, fields)
+
+        assert (num_values == 4)
+        assert (set(values.keys()) == set(['IX', 'IY', 'N', 'T', 'M', 'U', 'V']))
+        assert (np.array_equal(values['IX'], [0, 1, 1, 2]))
+        assert (np.array_equal(values['IY'], [0, 0, 1, 1]))
+
+        for l in fields:
+            assert (values[l].size == num_values)
+            assert (not values[l].flags.writeable)
+            assert (not values[l].flags.owndata)
+
+        with pytest.raises(ValueError):
+            values['M'][0] = 1.
+
+
+def test_map_values_maps_only_the_values_of_the_map():
+    with tmp.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, tmpfn)
+        write_data(path, save_data, info)
+
+        with open(path, 'rb') as fp:
+            single = fp.read()
+
+        # Concatenate several maps into one file
+        with open(path, 'wb') as fp:
+            fp.write(single * 3)
+
+        with open(path, 'rb') as fp:
+            for _ in range(3):
+                fields, num_values, _ = read_header(fp)
+                values = map_values(fp, num_values, fields, selected=['U'])
+
+                assert (np.allclose(values['U'], save_data['U'][save_data['M'] != 0.]))
+
+                # The memory map ends with the values of the field
+                mapped = values['U'].base._mmap
+                assert (len(mapped) <= fp.tell())
+
+
+def test_read_file_without_filled_bins():
+    empty_data = save_data.copy()
+    empty_data['M'] = np.zeros(6)
+
+    with tmp.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, tmpfn)
+        write_data(path, empty_data, info)
+
+        for mmap in (False, True):
+            data, _ = read_data(path, mmap=mmap)
+            assert (np.array_equal(data['M'], np.zeros(6)))
+            assert (np.array_equal(data['X'], save_data['X']))
+
+
+def test_read_sparse_data_keeps_only_filled_bins():
+    with tmp.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, tmpfn)
+        write_data(path, save_data, info)
+
+        for mmap in (False, True):
+            data, read_info = read_data(path, mmap=mmap, sparse=True)
+            assert (read_info['num_bins'] == 6)
+
+            inds = save_data['M'] != 0.
+            assert (np.array_equal(data['IX'], [0, 1, 1, 2]))
+            assert (np.array_equal(data['IY'], [0, 0, 1, 1]))
+
+            for l in ('X', 'Y'):
+                assert (np.allclose(data[l], save_data[l][inds]))
+
+            for l in fields:
+                assert (np.allclose(data[l], save_data[l][inds]))
+
+
+def test_write_sparse_data_roundtrip():
+    with tmp.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, tmpfn)
+        write_data(path, save_data, info)
+        sparse_data, _ = read_data(path, sparse=True)
+
+        sparse_path = os.path.join(tmpdir, 'sparse.dat')
+        write_data(sparse_path, sparse_data, info)
+
+        data, _ = read_data(path)
+        roundtrip_data, _ = read_data(sparse_path)
+
+        for l in data.keys():
+            assert (np.array_equal(data[l], roundtrip_data[l]))
+
+
+def test_read_data_with_set_precision():
+    with tmp.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, tmpfn)
+        write_data(path, save_data, info)
+
+        data, _ = read_data(path)
+        sparse_data, _ = read_data(path, sparse=True)
+
+        for l in ('X', 'Y') + fields:
+            assert (data[l].dtype == np.float64)
+            assert (sparse_data[l].dtype == (np.float64 if l in ('X', 'Y') else np.float32))
+
+        try:
+            set_precision('float32')
+
+            for mmap in (False, True):
+                single_data, _ = read_data(path, mmap=mmap)
+                single_sparse_data, _ = read_data(path, mmap=mmap, sparse=True)
+
+                for l in ('X', 'Y') + fields:
+                    assert (single_data[l].dtype == np.float32)
+                    assert (single_sparse_data[l].dtype == np.float32)
+                    assert (np.allclose(single_data[l], data[l]))
+        finally:
+            set_precision(None)
+
+
+def test_write_and_read_compressed_data():
+    with tmp.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, tmpfn)
+        write_data(path, save_data, info)
+        data, _ = read_data(path)
+
+        for compression in ('zlib', 'lzma'):
+            compressed_path = os.path.join(tmpdir, 'compressed.dat')
+            write_data(compressed_path, save_data, info, compression=compression,
+                _pp_verbose=False)
+
+            with open(compressed_path, 'rb') as fp:
+                assert (fp.read(28) == b"FORMAT GMX_FLOW_1_COMPRESSED")
+
+            for mmap in (False, True):
+                compressed_data, compressed_info = read_data(compressed_path, mmap=mmap)
+                assert (compressed_info == info)
+
+                for l in data.keys():
+                    assert (np.array_equal(data[l], compressed_data[l]))
+
+            sparse_data, _ = read_data(compressed_path, sparse=True)
+            assert (np.array_equal(sparse_data['IX'], [0, 1, 1, 2]))
+            assert (np.array_equal(sparse_data['IY'], [0, 0, 1, 1]))
+
+
+def test_read_selected_fields():
+    with tmp.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, tmpfn)
+        write_data(path, save_data, info)
+
+        compressed_path = os.path.join(tmpdir, 'compressed.dat')
+        write_data(compressed_path, save_data, info, compression='zlib',
+            _pp_verbose=False)
+
+        all_data, _ = read_data(path)
+
+        for fn in (path, compressed_path):
+            for mmap in (False, True):
+                data, read_info = read_data(fn, mmap=mmap, fields=['U', 'M'])
+                assert (read_info == info)
+                assert (set(data.keys()) == set(['X', 'Y', 'U', 'M']))
+
+                for l in data.keys():
+                    assert (np.array_equal(data[l], all_data[l]))
+
+            sparse_data, _ = read_data(fn, sparse=True, fields=['T'])
+            assert (set(sparse_data.keys()) == set(['X', 'Y', 'IX', 'IY', 'T']))
+            assert (np.array_equal(sparse_data['T'], all_data['T'][[0, 2, 3, 5]]))
+
+
+def test_read_selected_fields_not_in_file_raises_error():
+    with tmp.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, tmpfn)
+        write_data(path, save_data, info)
+
+        with pytest.raises(KeyError):
+            read_data(path, fields=['U', 'bad_field'])
+
+
+def test_read_data_inside_limits():
+    with tmp.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, tmpfn)
+        write_data(path, save_data, info)
+
+        compressed_path = os.path.join(tmpdir, 'compressed.dat')
+        write_data(compressed_path, save_data, info, compression='zlib',
+            _pp_verbose=False)
+
+        all_data, _ = read_data(path)
+
+        # Bin centers are at x = 0.5, 1.5, 2.5 and y = 0.5, 1.5
+        xlim = (1., 3.)
+        ylim = (None, 1.)
+        inds = (all_data['X'] >= 1.) & (all_data['Y'] <= 1.)
+
+        for fn in (path, compressed_path):
+            for mmap in (False, True):
+                data, window_info = read_data(fn, mmap=mmap, xlim=xlim, ylim=ylim)
+
+                assert (window_info['shape'] == (2, 1))
+                assert (window_info['origin'] == (1., 0.))
+                assert (window_info['spacing'] == info['spacing'])
+                assert (window_info['num_bins'] == 2)
+
+                for l in all_data.keys():
+                    assert (np.array_equal(data[l], all_data[l][inds]))
+
+            # Sparse data keeps only the filled bins with indices in the window
+            sparse_data, _ = read_data(fn, sparse=True, xlim=xlim, ylim=ylim)
+            assert (np.array_equal(sparse_data['IX'], [0]))
+            assert (np.array_equal(sparse_data['IY'], [0]))
+            assert (np.array_equal(sparse_data['X'], [1.5]))
+            assert (np.array_equal(sparse_data['Y'], [0.5]))
+
+
+def test_read_data_with_limits_outside_of_grid():
+    with tmp.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, tmpfn)
+        write_data(path, save_data, info)
+
+        data, window_info = read_data(path, xlim=(10., None))
+
+        assert (window_info['shape'] == (0, 2))
+        assert (window_info['num_bins'] == 0)
+        assert (data['X'].size == 0)
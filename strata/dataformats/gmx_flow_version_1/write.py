@@ -1,4 +1,5 @@
 import numpy as np
+from strata.dataformats.gmx_flow_version_1.codec import encode_field
 from strata.utils import prepare_path
 
 """Module for writing data to disk in a specified format."""
@@ -6,7 +7,7 @@ from strata.utils import prepare_path
 FIELDS_ORDERED = ['N', 'T', 'M', 'U', 'V']
 
 @prepare_path
-def write_data(path, data, info, check_label='M'):
+def write_data(path, data, info, check_label='M', compression=None):
     """Write data to disk in a data format with only non-empty bins.
 
     Args:
@@ -23,32 +24,77 @@ def write_data(path, data, info, check_label='M'):
     Keyword args:
         check_label (str): Label in dict which must be non-zero for a bin.
 
-    """
+        compression (str, optional): Compress the fields with this
+            compressor, 'zlib' or 'lzma'. Each field is stored with the
+            filter which compresses it best, see
+            strata.dataformats.gmx_flow_version_1.codec.
+
+    Sparse data with bin indices 'IX' and 'IY' is written directly,
+    without being expanded onto the full grid.
 
-    nx, ny = info['shape']
+    """
 
-    inds = data[check_label] != 0.0
-    num_elements = data[check_label][inds].size
+    output_data, num_elements = get_output_data(data, info, check_label)
 
-    ix = np.arange(nx, dtype=np.uint64)
-    iy = np.arange(ny, dtype=np.uint64)
-    ixs, iys = np.meshgrid(ix, iy, indexing='ij')
+    if compression != None:
+        codecs = []
+        encoded_data = []
 
-    output_data = [
-            ixs.ravel()[inds],
-            iys.ravel()[inds]
-        ] + [np.array(data[l][inds], dtype=np.float32) for l in FIELDS_ORDERED]
+        for l, vs in zip(['IX', 'IY'] + FIELDS_ORDERED, output_data):
+            filter_name, compressor, buf = encode_field(vs, vs.dtype, compression)
+            codecs.append((l, filter_name, compressor, len(buf)))
+            encoded_data.append(buf)
+    else:
+        codecs = None
 
     with open(path, "wb") as fp:
         write_header(
-            fp, info['shape'], info['spacing'], info['origin'], num_elements
+            fp, info['shape'], info['spacing'], info['origin'], num_elements,
+            codecs
         )
 
-        for vs in output_data:
-            vs.tofile(fp)
+        if codecs != None:
+            for buf in encoded_data:
+                fp.write(buf)
+        else:
+            for vs in output_data:
+                vs.tofile(fp)
+
+def get_output_data(data, info, check_label='M'):
+    """Return the arrays to store for the non-empty bins and their number.
+
+    The arrays are the bin indices 'IX' and 'IY' followed by the fields
+    in the order of `FIELDS_ORDERED`.
+
+    """
+
+    try:
+        labels = data.dtype.names
+    except AttributeError:
+        labels = data.keys()
+
+    inds = np.asarray(data[check_label]).ravel() != 0.0
+    num_elements = np.count_nonzero(inds)
+
+    if 'IX' in labels and 'IY' in labels:
+        ixs, iys = (np.asarray(data[l], dtype=np.uint64).ravel()[inds]
+            for l in ('IX', 'IY'))
+    else:
+        # Bin indices of the non-empty bins, without creating them for the grid
+        _, ny = info['shape']
+        ixs, iys = np.divmod(np.flatnonzero(inds).astype(np.uint64), np.uint64(ny))
+
+    output_data = [ixs, iys] + [
+        np.asarray(data[l], dtype=np.float32).ravel()[inds] for l in FIELDS_ORDERED]
+
+    return output_data, num_elements
+
+def write_header(fp, shape, spacing, origin, num_elements, codecs=None):
+    if codecs != None:
+        fp.write("FORMAT GMX_FLOW_1_COMPRESSED\n".encode())
+    else:
+        fp.write("FORMAT GMX_FLOW_1\n".encode())
 
-def write_header(fp, shape, spacing, origin, num_elements):
-    fp.write("FORMAT GMX_FLOW_1\n".encode())
     fp.write("ORIGIN {:12f} {:12f}\n".format(origin[0], origin[1]).encode())
     fp.write("SHAPE {} {}\n".format(shape[0], shape[1]).encode())
     fp.write("SPACING {:12f} {:12f}\n".format(spacing[0], spacing[1]).encode())
@@ -59,6 +105,11 @@ def write_header(fp, shape, spacing, origin, num_elements):
         fp.write(" {}".format(l).encode())
     fp.write("\n".encode())
 
+    if codecs != None:
+        for l, filter_name, compressor, num_bytes in codecs:
+            fp.write("CODEC {} {} {} {}\n".format(
+                l, filter_name, compressor, num_bytes).encode())
+
     fp.write("COMMENT Grid is regular but only non-empty bins are output\n".encode())
     fp.write("COMMENT There are 'NUMDATA' non-empty bins and that many values are stored for each field\n".encode())
     fp.write("COMMENT 'FIELDS' is the different fields for each bin:\n".encode())
@@ -74,4 +125,8 @@ def write_header(fp, shape, spacing, origin, num_elements):
              "the data following the '\\0' marker is 4 + 4 64-bit integers "
              "and then 4 + 4 32-bit floating point numbers\n".encode())
 
+    if codecs != None:
+        fp.write("COMMENT Each field is stored compressed as described by its 'CODEC': "
+                 "field, filter, compressor and number of stored bytes\n".encode())
+
     fp.write(b"\0")
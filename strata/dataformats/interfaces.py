@@ -0,0 +1,207 @@
+import functools
+import numpy as np
+import os
+
+from strata.dataformats.series import HEADER_KEY, SERIES_EXT
+from strata.dataformats.trajectory.read import FRAME_SEPARATOR, split_frame_path
+
+"""Read and write series of interfaces in a single indexed file.
+
+The interfaces of a series of data maps are by default written as a text
+file per map, see `strata.interface.collect`. They can instead be written
+to a single interface series file, which is an uncompressed numpy archive
+('.npz') with the coordinates of all interfaces concatenated into arrays
+'X' and 'Y'. Since the interfaces have different lengths an offset table
+gives where each one begins and ends in the arrays, along with an array
+of their numbers.
+
+The interfaces of a series file are referred to by frame paths, which
+join the file path and interface number as for the frames of trajectories
+('%s#%05d'). Such paths are found by `strata.utils.find_datamap_files` and
+read by `read_interface_coordinates` like the paths of text files. The
+series file is read once in bulk, after which the interfaces are returned
+as views into its arrays.
+
+"""
+
+# Names of the index arrays in interface series files
+OFFSETS_KEY = 'offsets'
+NUMBERS_KEY = 'numbers'
+
+
+def write_interfaces(path, interfaces, numbers=None, header=''):
+    """Write a series of interfaces to an interface series file.
+
+    Args:
+        path (str): Path to output file.
+
+        interfaces (list): List of 2-tuples with x and y coordinates for
+            each interface.
+
+    Keyword Args:
+        numbers (list, optional): Number of each interface, by default
+            they are numbered in order from 1.
+
+        header (str, optional): Text header with information about the
+            interfaces.
+
+    Raises:
+        ValueError: If the numbers do not match the interfaces or the
+            coordinates of an interface have different lengths.
+
+    """
+
+    if numbers is None:
+        numbers = range(1, len(interfaces) + 1)
+
+    numbers = np.array(numbers, dtype=np.int64)
+
+    if numbers.size != len(interfaces):
+        raise ValueError("the number of interfaces and numbers do not match")
+
+    lengths = []
+    for xs, ys in interfaces:
+        if len(xs) != len(ys):
+            raise ValueError("interface coordinates must have the same length")
+
+        lengths.append(len(xs))
+
+    offsets = np.zeros(len(interfaces) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum(lengths, dtype=np.int64)
+
+    coords = [np.zeros(offsets[-1], dtype=np.float64) for _ in range(2)]
+    for (start, stop), interface in zip(zip(offsets[:-1], offsets[1:]), interfaces):
+        for values, values_interface in zip(coords, interface):
+            values[start:stop] = values_interface
+
+    xs, ys = coords
+
+    with open(path, 'wb') as fp:
+        np.savez(fp, X=xs, Y=ys, **{OFFSETS_KEY: offsets, NUMBERS_KEY: numbers,
+            HEADER_KEY: np.array(header)})
+
+
+def read_interfaces(path, begin=1, end=np.inf):
+    """Return the numbers and coordinates of interfaces in a series file.
+
+    Args:
+        path (str): Path to interface series file.
+
+    Keyword Args:
+        begin (int, default=1): First interface number.
+
+        end (int, default=inf): Final interface number.
+
+    Returns:
+        (list, list): 2-tuple with the numbers of the interfaces and a list
+            of 2-tuples with their x and y coordinates.
+
+    """
+
+    numbers, offsets, xs, ys, _ = get_interface_series(path)
+
+    selected = np.flatnonzero((numbers >= begin) & (numbers <= end))
+    interfaces = [(xs[offsets[i]:offsets[i + 1]], ys[offsets[i]:offsets[i + 1]])
+        for i in selected]
+
+    return [int(numbers[i]) for i in selected], interfaces
+
+
+def read_interface_coordinates(path):
+    """Return the x and y coordinates of an interface.
+
+    The path is to an interface in a series file (see `gen_interface_paths`)
+    or to a text file with the coordinates in two columns.
+
+    Returns:
+        ndarray, ndarray: 2-tuple with x and y coordinates.
+
+    Raises:
+        FileNotFoundError: If the interface number is not in the series file.
+
+    """
+
+    series_path, number = split_frame_path(path)
+
+    if number == None or not is_interface_series(series_path):
+        xs, ys = np.genfromtxt(path, unpack=True)
+        return xs, ys
+
+    numbers, interfaces = read_interfaces(series_path, number, number)
+
+    if numbers == []:
+        raise FileNotFoundError("no interface number %d in %r"
+            % (number, series_path))
+
+    return interfaces[0]
+
+
+def gen_interface_paths(path, begin=1, end=np.inf):
+    """Generate paths to the interfaces of a series file in order.
+
+    Args:
+        path (str): Path to an interface series file.
+
+    Keyword Args:
+        begin (int, default=1): First interface number.
+
+        end (int, default=inf): Final interface number.
+
+    Yields:
+        str: Interface paths.
+
+    """
+
+    numbers, _, _, _, _ = get_interface_series(path)
+
+    for number in sorted(int(n) for n in numbers):
+        if begin <= number <= end:
+            yield '%s%s%05d' % (path, FRAME_SEPARATOR, number)
+
+
+def is_interface_series(path):
+    """Return whether the input path is to an interface series file."""
+
+    try:
+        if os.path.splitext(path)[1] != SERIES_EXT or not os.path.isfile(path):
+            return False
+    except TypeError:
+        return False
+
+    return get_interface_series(path) != None
+
+
+def get_interface_series(path):
+    """Return the read arrays of an interface series file.
+
+    The arrays are returned as a 5-tuple with the interface numbers, the
+    offset table and the concatenated x and y coordinates, along with the
+    header. The file is read once while it is not changed on disk. None
+    is returned if the file is not an interface series file.
+
+    """
+
+    try:
+        stat = os.stat(path)
+    except (OSError, TypeError):
+        return None
+
+    return _read_interface_series(os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+
+
+@functools.lru_cache(maxsize=4)
+def _read_interface_series(path, size, mtime):
+    try:
+        with np.load(path, allow_pickle=False) as fp:
+            if OFFSETS_KEY not in fp.files:
+                return None
+
+            arrays = [fp[l] for l in (NUMBERS_KEY, OFFSETS_KEY, 'X', 'Y')]
+            header = str(fp[HEADER_KEY]) if HEADER_KEY in fp.files else ''
+    except (OSError, ValueError):
+        return None
+
+    for values in arrays:
+        values.flags.writeable = False
+
+    return (*arrays, header)
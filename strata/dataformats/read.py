@@ -1,4 +1,15 @@
+import numpy as np
+import os
+import stat
+import sys
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
 import strata.dataformats as formats
+from strata.dataformats.compressed import open_file
+from strata.utils import find_datamap_files
 
 """Module for reading flow field data from specific file formats.
 
@@ -7,6 +18,10 @@ this module through the 'read_data_file' and 'read_files' functions.
 These function call the 'guess_read_module' to determine the file format
 and uses the returned handle to call the correct submodule.
 
+Maps can also be read from a stream of concatenated GMX_FLOW_1 maps, as
+written to a named pipe or the standard input ('-'). See 'read_from_stream'
+and 'read_from_base', which reads from either files or a stream.
+
 """
 
 def guess_read_module(filename):
@@ -14,7 +29,8 @@ def guess_read_module(filename):
 
     Makes a guess on the data format by trying to access the file and assess
     its characteristics, judging which of the implemented data formats is
-    the best match.
+    the best match. Compressed files are assessed by their decompressed
+    data, see strata.dataformats.compressed.
 
     Args:
         filename (str): File to read.
@@ -24,12 +40,17 @@ def guess_read_module(filename):
 
     """
 
+    # Frames of trajectories are read from the trajectory file
+    path, _ = formats.trajectory.read.split_frame_path(filename)
+
     try:
-        with open(filename, "rb") as fp:
+        with open_file(path) as fp:
             buf = fp.read(100)
 
             if buf.startswith(b"FORMAT GMX_FLOW_1") or buf.startswith(b"FORMAT GMX_FLOW_2"):
                 return formats.gmx_flow_version_1.main
+            elif buf.startswith(formats.trajectory.read.FORMAT):
+                return formats.trajectory.main
             else:
                 return formats.simple.main
     except:
@@ -37,12 +58,34 @@ def guess_read_module(filename):
 
 
 
-def read_from_files(*files):
+def read_from_files(*files, prefetch=0, **kwargs):
     """Yield data and information from a set of files to read.
 
+    The files can be read ahead of time in background threads by setting
+    the keyword argument `prefetch` to the number of files to read ahead.
+    This reads the next files from disk while the current one is being
+    worked on. The files are still yielded in order and errors from reading
+    a file are raised when it is yielded.
+
     Args:
         files (str's): File names to yield data from, one per argument.
 
+    Keyword Args:
+        prefetch (int, default=0): Number of files to read ahead in the
+            background.
+
+        mmap (bool, default=False): Memory map the files instead of reading
+            them into memory. See read_data_file.
+
+        sparse (bool, default=False): Read only non-empty bins.
+            See read_data_file.
+
+        fields (list, optional): Read only these fields and the coordinates.
+            See read_data_file.
+
+        xlim, ylim (2-tuples, optional): Read only the bins inside these
+            limits. See read_data_file.
+
     Yields:
         (dict, dict, module): 3-tuple of dict's with read data and
             information and a handle to the used read module. See
@@ -50,11 +93,35 @@ def read_from_files(*files):
 
     """
 
-    for filename in files:
-        yield read_data_file(filename)
+    if prefetch < 1:
+        for filename in files:
+            yield read_data_file(filename, **kwargs)
+
+        return
 
+    with ThreadPoolExecutor(max_workers=prefetch) as executor:
+        queue = deque()
+        filenames = iter(files)
 
-def read_data_file(filename):
+        try:
+            for filename in islice(filenames, prefetch):
+                queue.append(executor.submit(read_data_file, filename, **kwargs))
+
+            while queue:
+                result = queue.popleft().result()
+
+                # Keep the queue filled while the result is being used
+                for filename in islice(filenames, 1):
+                    queue.append(executor.submit(read_data_file, filename, **kwargs))
+
+                yield result
+        finally:
+            for future in queue:
+                future.cancel()
+
+
+def read_data_file(filename, mmap=False, sparse=False, fields=None,
+        xlim=None, ylim=None):
     """Return data and information about a flow field map.
 
     Data and information are separate dict's returned as tuple. The data
@@ -80,18 +147,195 @@ def read_data_file(filename):
             'path': path to read file
             }
 
+    Frames of trajectory files are read by their frame paths, see
+    strata.dataformats.trajectory.read.
+
+    With the keyword argument `mmap` the data section of binary files is
+    memory mapped instead of read into memory. Field values are then only
+    read from disk when they are used, which saves a full copy of every
+    file when reading large series. For formats which store only the
+    non-empty bins the data is then returned as a mapping of the type
+    droplets.flow.ScatteredFields, which expands a field onto the full
+    grid when it is first accessed. FlowData objects created from it keep
+    the fields which are not used unread.
+
+    With the keyword argument `sparse` only the non-empty bins of the map
+    are returned, along with their integer bin indices along x and y as
+    the fields 'IX' and 'IY'. The information still describes the full
+    grid. See droplets.flow.FlowData for how such data is handled.
+
+    With the keyword argument `fields` only the listed fields are read
+    and returned, along with the coordinates. The data of other fields
+    is skipped over in the file where the format allows it. This saves
+    work for analyses which only use some of the fields.
+
+    With the keyword arguments `xlim` and `ylim` only the bins with
+    center coordinates inside the limits are returned. The bins outside
+    of them are dropped while reading, before the grid is created, and
+    the information describes the window of the grid which was read.
+    Either value of a limit can be None to not limit that side.
+
     Args:
         filename (str): File to read data from.
 
+    Keyword Args:
+        mmap (bool, default=False): Memory map the file data.
+
+        sparse (bool, default=False): Return only the non-empty bins.
+
+        fields (list, optional): Return only these fields and the
+            coordinates. By default all fields are returned.
+
+        xlim, ylim (2-tuples, optional): Return only the bins inside
+            these limits along x and y.
+
     Returns:
         (dict, dict, module): 3-tuple of dict's with read data and information
             from the data map and one with metadata.
 
     """
 
+    # Limits which do not cut anything are not passed on
+    if xlim == (None, None):
+        xlim = None
+    if ylim == (None, None):
+        ylim = None
+
     module = guess_read_module(filename)
-    data, info = module.read_data(filename)
+    data, info = module.read_data(filename, mmap=mmap, sparse=sparse,
+        fields=fields, xlim=xlim, ylim=ylim)
 
     metadata = {'path': filename, 'module': module}
 
     return data, info, metadata
+
+
+def read_file_info(filename):
+    """Return information about a flow field map read from its header.
+
+    Only the header of the file is read, which is much faster than reading
+    its data with read_data_file. The information dictionary is of the same
+    form as that returned by read_data_file.
+
+    Files which do not store their grid in a header, like simple plaintext
+    files, have their information returned as None.
+
+    Args:
+        filename (str): File to read information about.
+
+    Returns:
+        (dict, int, dict): 3-tuple with the information, the number of
+            stored bins (or None if it is not known from the header) and
+            metadata. See read_data_file for the metadata.
+
+    """
+
+    module = guess_read_module(filename)
+    info, num_values = module.read_info(filename)
+
+    metadata = {'path': filename, 'module': module}
+
+    return info, num_values, metadata
+
+
+def is_stream_path(path):
+    """Return whether a path is the standard input ('-') or a named pipe."""
+
+    if path == '-':
+        return True
+
+    try:
+        return stat.S_ISFIFO(os.stat(path).st_mode)
+    except (OSError, TypeError, ValueError):
+        return False
+
+
+def read_from_stream(path, begin=1, end=np.inf, **kwargs):
+    """Yield data and information of maps read from a stream.
+
+    The stream consists of maps in the GMX_FLOW_1 format which are written
+    back to back, see strata.dataformats.gmx_flow_version_1. The maps are
+    read as they arrive and are numbered in order from 1. The stream is
+    read until it is closed by the writer.
+
+    Args:
+        path (str): Path to a named pipe or file, or '-' for standard input.
+
+    Keyword Args:
+        begin (int, default=1): First map number to yield.
+
+        end (int, default=inf): Final map number to yield.
+
+        sparse, fields, xlim, ylim: See read_data_file.
+
+    Yields:
+        (dict, dict, dict): 3-tuple of dict's with read data, information
+            and metadata as for read_data_file. The path of the metadata
+            joins the stream path and map number ('%s#%05d').
+
+    """
+
+    # Limits which do not cut anything are not passed on
+    for lims in ('xlim', 'ylim'):
+        if kwargs.get(lims) == (None, None):
+            kwargs[lims] = None
+
+    module = formats.gmx_flow_version_1.main
+
+    if path == '-':
+        fp = sys.stdin.buffer
+    else:
+        fp = open(path, 'rb')
+
+    try:
+        for number, (data, info) in enumerate(module.read_frames(fp, **kwargs), 1):
+            if number > end:
+                break
+
+            if number >= begin:
+                metadata = {'path': '%s#%05d' % (path, number), 'module': module}
+                yield data, info, metadata
+    finally:
+        if fp is not sys.stdin.buffer:
+            fp.close()
+
+
+def read_from_base(base, begin=1, end=np.inf, ext='.dat', prefetch=0, **kwargs):
+    """Return the number of maps at a base and a generator of their data.
+
+    If the base is a stream (see `is_stream_path`) the maps are read from
+    it by `read_from_stream`, otherwise the files at the base are found
+    and read by `read_from_files`.
+
+    Args:
+        base (str): Base path to input files or path to a stream.
+
+    Keyword Args:
+        begin (int, default=1): First data map number.
+
+        end (int, default=inf): Final data map number.
+
+        ext (str, default='.dat'): File extension.
+
+        prefetch (int, default=0): Number of files to read ahead in the
+            background. Not used for streams.
+
+        mmap, sparse, fields, xlim, ylim: See `read_from_files`.
+
+    Returns:
+        (int, generator): 2-tuple with the number of maps, which is None
+            for streams, and a generator of the data and information of
+            the maps as yielded by `read_from_files`.
+
+    """
+
+    # The output extension of options from `strata.utils.pop_fileopts`
+    kwargs.pop('outext', None)
+
+    if is_stream_path(base):
+        kwargs.pop('mmap', None)
+        return None, read_from_stream(base, begin, end, **kwargs)
+
+    files = list(find_datamap_files(base, begin=begin, end=end, ext=ext))
+
+    return len(files), read_from_files(*files, prefetch=prefetch, **kwargs)
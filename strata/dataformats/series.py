@@ -0,0 +1,113 @@
+import numpy as np
+import os
+
+"""Read and write time series results in a binary columnar format.
+
+Results which are collected over a series of data maps, such as the
+spreading radius or sampled values as functions of time, are by default
+written as text files with a commented header and a row per time. For
+long series these files can instead be written in binary: output paths
+with the extension '.npz' are written as an uncompressed numpy archive
+with one array per named column and the text header as metadata. The
+columns are loaded without any parsing.
+
+Since the archive can not be appended to, the producers first write the
+text header to the path, which verifies that it is writable, and then
+replace it by the archive with all columns when they are finished. See
+`finish_series`.
+
+"""
+
+# Extension of binary series files
+SERIES_EXT = '.npz'
+
+# Names of the metadata arrays in series files
+HEADER_KEY = '__header__'
+COLUMNS_KEY = '__columns__'
+
+
+def is_series_path(path):
+    """Return whether a path is to a binary series file by its extension."""
+
+    try:
+        return os.path.splitext(path)[1] == SERIES_EXT
+    except TypeError:
+        return False
+
+
+def write_series(path, columns, header=''):
+    """Write named columns of a time series to a binary series file.
+
+    Args:
+        path (str): Path to output file. Unlike `numpy.savez` no extension
+            is added to it.
+
+        columns (dict): Column names as keys and 1D arrays of values,
+            in the order they are written.
+
+    Keyword Args:
+        header (str, optional): Text header with information about the
+            series, as written to text output files.
+
+    Raises:
+        ValueError: If the columns do not have the same length or a
+            column name is reserved for metadata.
+
+    """
+
+    arrays = {l: np.asarray(v) for l, v in columns.items()}
+
+    if len(set(v.size for v in arrays.values())) > 1:
+        raise ValueError("all columns must have the same number of values")
+
+    if HEADER_KEY in arrays or COLUMNS_KEY in arrays:
+        raise ValueError("column names %r and %r are reserved"
+            % (HEADER_KEY, COLUMNS_KEY))
+
+    arrays[HEADER_KEY] = np.array(header)
+    arrays[COLUMNS_KEY] = np.array(list(columns.keys()), dtype=str)
+
+    with open(path, 'wb') as fp:
+        np.savez(fp, **arrays)
+
+
+def read_series(path):
+    """Return the named columns and header of a binary series file.
+
+    Args:
+        path (str): Path to series file.
+
+    Returns:
+        (dict, str): 2-tuple with the columns as a dict of arrays in
+            their written order and the text header.
+
+    """
+
+    with np.load(path, allow_pickle=False) as fp:
+        labels = [str(l) for l in fp[COLUMNS_KEY]]
+        columns = {l: fp[l] for l in labels}
+        header = str(fp[HEADER_KEY])
+
+    return columns, header
+
+
+def finish_series(path, columns):
+    """Replace the text header at a path by a series file with the columns.
+
+    The text which has been written to the path, usually the header from
+    the producer's `write_header`, is kept as the header of the series.
+
+    Args:
+        path (str): Path to output file with the text header.
+
+        columns (dict): Column names as keys and 1D arrays of values.
+
+    """
+
+    try:
+        with open(path) as fp:
+            header = fp.read()
+    except (OSError, UnicodeDecodeError):
+        header = ''
+
+    write_series(path, columns, header)
@@ -1,15 +1,22 @@
 import numpy as np
 import warnings
 
+from droplets.flow import get_float_dtype
+
 def average_data(*data, atol=1e-3, rtol=1e-05):
     """Return a sample average of several plain maps.
 
     Note that flows ('U', 'V') are mass averaged and that the temperature
     ('T') is number averaged.
 
+    The averages are accumulated in double precision and returned with
+    the precision set by `droplets.flow.set_precision`, or that of the
+    input data if none is set.
+
     Relative and absolute tolerances are used to ascertain that the input
     map coordinates are identical for each map. These can be controlled by
-    the keyword arguments 'atol' and 'rtol'.
+    the keyword arguments 'atol' and 'rtol'. Coordinates which are the same
+    arrays, as for maps read with the same grid, are not compared.
 
     Args:
         data (dict): List of dict's with data read from a simple data map,
@@ -32,6 +39,11 @@ def average_data(*data, atol=1e-3, rtol=1e-05):
         coords = {l: data[0][l] for l in ('X', 'Y')}
         for d in data[1:]:
             for l in ('X', 'Y'):
+                # Maps read with the same grid share their coordinates,
+                # see strata.dataformats.geometry
+                if d[l] is coords[l]:
+                    continue
+
                 # Check that input coordinates of all maps match each other
                 # An absolute tolerance value is used but might not be the
                 # best solution, better might be for the caller to assert
@@ -43,20 +55,26 @@ def average_data(*data, atol=1e-3, rtol=1e-05):
 
     def get_sum_weights():
         weights = ('N', 'M')
-        return {w: np.sum([d[w] for d in data], 0) for w in weights}
+        return {w: np.sum([d[w] for d in data], 0, dtype=np.float64) for w in weights}
+
+    def get_dtype(field):
+        return get_float_dtype(np.result_type(*[d[field] for d in data]))
 
     def get_avg(field):
-        return np.mean([d[field] for d in data], 0)
+        avg = np.mean([d[field] for d in data], 0, dtype=np.float64)
+
+        return avg.astype(get_dtype(field))
 
     def get_weighted_avg(field, weight):
-        weighted_sum = np.sum([d[field]*d[weight] for d in data], 0)
+        weighted_sum = np.sum([np.multiply(d[field], d[weight], dtype=np.float64)
+            for d in data], 0)
 
         # A warning will be raised if any summed weight is 0. Catch that
         # warning, then set all nan-results to 0. 
         with warnings.catch_warnings(record=True):
             weighted_avg = weighted_sum/sum_weights[weight]
 
-        return np.nan_to_num(weighted_avg)
+        return np.nan_to_num(weighted_avg).astype(get_dtype(field))
 
     if list(data) == []:
         return {}
@@ -125,7 +143,7 @@ def combine_bins(data, info, nx, ny):
     labels_and_weights = ('N', None), ('M', None), ('T', 'N'), ('U', 'M'), ('V', 'M')
     for label, weight in labels_and_weights:
         ds = data[label].reshape(info['shape'])
-        new_data[label] = np.zeros(xs.shape)
+        new_data[label] = np.zeros(xs.shape, dtype=get_float_dtype())
 
         try:
             ws = data[weight].reshape(info['shape'])
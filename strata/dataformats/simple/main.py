@@ -1,5 +1,5 @@
 from strata.dataformats.simple.average import average_data, combine_bins
-from strata.dataformats.simple.read import read_data
+from strata.dataformats.simple.read import read_data, read_info
 from strata.dataformats.simple.write import write_data
 
 """Main functionality of this module is called from here."""
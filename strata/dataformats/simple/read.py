@@ -1,12 +1,25 @@
+import io
 import numpy as np
+import os
+
+from droplets.flow import get_float_dtype
+from strata.dataformats.compressed import is_stream, open_file, read_array
+from strata.dataformats.geometry import get_grid_coords
+from strata.dataformats.gmx_flow_version_1.read import parse_header
 
 """Read data from simple, naive file formats."""
 
-def read_data(filename, decimals=5):
+# Binary files of version 2 begin with this line, older files have no header
+FORMAT_V2 = b"FORMAT SIMPLE_2"
+
+def read_data(filename, decimals=5, mmap=False, sparse=False, fields=None,
+        xlim=None, ylim=None):
     """Read field data from a file name.
 
     Determines which of the simple formats in this module to use and
-    returns data read using the proper function.
+    returns data read using the proper function. The information of
+    binary files of version 2 is read from their header, otherwise it
+    is calculated from the coordinates.
 
     Coordinates are rounded to input number of decimals.
 
@@ -16,50 +29,263 @@ def read_data(filename, decimals=5):
     Keyword Args:
         decimals (int): Number of decimals for coordinates.
 
+        mmap (bool, default=False): Memory map binary files instead of
+            reading them into memory. Has no effect for plaintext files.
+
+        sparse (bool, default=False): Return only bins with non-zero
+            mass along with their bin indices 'IX' and 'IY'.
+
+        fields (list, optional): Return only these fields, along with the
+            coordinates. Other fields of binary files are not read.
+
+        xlim, ylim (2-tuples, optional): Return only the bins with
+            coordinates inside these limits. Only the rows of these bins
+            are read from binary files.
+
     Returns:
         (dict, dict): 2-tuple of dict's with data and information. See
             strata.dataformats.read.read_data_file for more information.
+            Files or windows without bins return empty data, along with
+            the spacing and origin of the grid if it can be read.
+
+    The data is returned with the precision set by
+    `droplets.flow.set_precision`. If none is set the fields keep the
+    precision they were read with and the coordinates use double precision.
 
     """
 
     def guess_read_function(filename):
         """Return handle to binary or plaintext function."""
 
-        def is_binary(filename, checksize=512):
-            with open(filename, 'r') as fp:
-                try:
-                    fp.read(checksize)
-                    return False
-                except UnicodeDecodeError:
-                    return True
-
         if is_binary(filename):
-            return read_binsimple
+            return lambda filename: read_binsimple(filename, mmap=mmap,
+                fields=read_fields, xlim=xlim, ylim=ylim, decimals=decimals)
         else:
-            return read_plainsimple
+            return lambda filename: cut_window(read_plainsimple(filename),
+                xlim, ylim, decimals)
 
-    read_function = guess_read_function(filename)
-    data = read_function(filename)
-    for coord in ['X', 'Y']:
-        data[coord] = data[coord].round(decimals)
+    def get_empty_info():
+        """Return the information of data without bins."""
 
-    info = calc_information(data['X'], data['Y'])
+        try:
+            grid_info, _ = read_info(filename, decimals)
+        except (IndexError, ValueError):
+            grid_info = None
+
+        if grid_info == None:
+            grid_info = {'spacing': (0., 0.), 'origin': (0., 0.)}
+
+        return {
+            'shape': (0, 0),
+            'spacing': grid_info['spacing'],
+            'origin': grid_info['origin'],
+            'num_bins': 0,
+        }
+
+    # The mass is needed to find the non-empty bins of sparse data
+    read_fields = fields
+    if fields != None and sparse and 'M' not in fields:
+        read_fields = list(fields) + ['M']
+
+    header = read_header(filename)
+
+    if header != None:
+        data, info = read_binsimple_v2(filename, header, mmap=mmap,
+            fields=read_fields, xlim=xlim, ylim=ylim, decimals=decimals)
+    else:
+        read_function = guess_read_function(filename)
+        data = read_function(filename)
+        info = None
+
+        if read_fields != None:
+            labels = ['X', 'Y'] + [l for l in read_fields if l not in ('X', 'Y')]
 
-    x0, y0 = info['origin']
-    dx, dy = info['spacing']
-    nx, ny = info['shape']
+            try:
+                data = {l: data[l] for l in labels}
+            except KeyError as err:
+                raise KeyError("field %s is not stored in the file" % err)
+
+    for l in data.keys():
+        data[l] = data[l].astype(get_float_dtype(data[l].dtype), copy=False)
+
+    num_bins = info['num_bins'] if info != None else data['X'].size
 
-    x = x0 + dx * np.arange(nx, dtype=np.float64)
-    y = y0 + dy * np.arange(ny, dtype=np.float64)
+    if num_bins == 0:
+        if info == None:
+            info = get_empty_info()
 
-    xs, ys = np.meshgrid(x, y, indexing='ij')
+        data['X'], data['Y'] = (np.zeros(0, dtype=get_float_dtype()) for _ in range(2))
+    else:
+        if info == None:
+            info = calc_ordered_information(data['X'], data['Y'], decimals)
 
-    data['X'] = xs.ravel()
-    data['Y'] = ys.ravel()
+        if info == None:
+            info = calc_information(*[data[coord].round(decimals) for coord in ('X', 'Y')])
+
+        # The coordinates are shared by all maps with this grid
+        data['X'], data['Y'] = get_grid_coords(info['origin'], info['shape'],
+            info['spacing'], dtype=get_float_dtype(), offset=0.)
+
+    nx, ny = info['shape']
+
+    if sparse:
+        inds = np.nonzero(data['M'])[0]
+        data = {l: data[l][inds] for l in data.keys()
+            if fields == None or l in ('X', 'Y') or l in fields}
+        data['IX'] = (inds // ny).astype(np.uint64)
+        data['IY'] = (inds % ny).astype(np.uint64)
 
     return data, info
 
 
+def read_info(filename, decimals=5):
+    """Return the grid information and number of bins of a file.
+
+    The information of binary files of version 2 is read from their
+    header. For older binary files it is calculated from their size and
+    the coordinates of the first and final bins, without reading the
+    other bins. Plaintext files are not read and their information is
+    returned as None.
+
+    Args:
+        filename (str): A file to read information from.
+
+    Keyword Args:
+        decimals (int): Number of decimals for coordinates.
+
+    Returns:
+        (dict, int): 2-tuple with the information and number of stored bins.
+
+    """
+
+    header = read_header(filename)
+
+    if header != None:
+        _, info, _ = header
+        return info, info['num_bins']
+
+    if not is_binary(filename):
+        return None, None
+
+    rows = load_values(filename, mmap=True).reshape(-1, 7)
+    num_values = rows.shape[0]
+
+    ny = count_column_rows(rows[:, 0])
+    nx = num_values // ny
+
+    x0, y0 = (float(v) for v in rows[0, :2].round(decimals))
+    x1, y1 = (float(v) for v in rows[-1, :2].round(decimals))
+
+    info = {
+        'shape': (nx, ny),
+        'spacing': tuple((v1 - v0) / (n - 1) if n > 1 else 0.0
+            for v0, v1, n in ((x0, x1, nx), (y0, y1, ny))),
+        'num_bins': nx * ny,
+        'origin': (x0, y0),
+    }
+
+    return info, num_values
+
+
+def read_header(filename):
+    """Return the header of a binary file of version 2.
+
+    Args:
+        filename (str): A file to read the header of.
+
+    Returns:
+        (list, dict, int): 3-tuple with the stored fields, the grid
+            information and the byte offset of the data, or None if the
+            file is not of version 2.
+
+    """
+
+    with open_file(filename) as fp:
+        if not fp.read(len(FORMAT_V2)) == FORMAT_V2:
+            return None
+
+        fp.seek(0)
+        fields, _, info, _ = parse_header(fp)
+        offset = fp.tell()
+
+    return fields, info, offset
+
+
+def is_binary(filename, checksize=512):
+    """Return whether a file is in the binary format.
+
+    The first bytes of the file are checked for null bytes or bytes
+    which are not text. A character which is cut at the end of the
+    checked bytes is not counted.
+
+    """
+
+    with open_file(filename) as fp:
+        buf = fp.read(checksize)
+
+    if b'\0' in buf:
+        return True
+
+    try:
+        buf.decode('utf-8')
+    except UnicodeDecodeError as err:
+        return err.reason != 'unexpected end of data'
+
+    return False
+
+
+def calc_ordered_information(X, Y, decimals=5):
+    """Return the grid information of coordinates ordered along x first.
+
+    The bins of the files are stored for every x position in turn, with
+    increasing x and y coordinates. The information is then calculated
+    from the first and final bins and the number of bins with the first
+    x position, instead of sorting all coordinates as in `calc_information`.
+
+    Args:
+        X, Y (array_like): Arrays with cell positions.
+
+    Keyword Args:
+        decimals (int): Number of decimals for coordinates.
+
+    Returns:
+        dict: Information about the system, or None if the coordinates
+            are not ordered in this way.
+
+    """
+
+    if X.size == 0 or X.size != Y.size:
+        return None
+
+    ny = count_column_rows(X)
+    nx = X.size // ny
+
+    if nx * ny != X.size:
+        return None
+
+    x0, y0, x1, y1 = (v.round(decimals) for v in (X[0], Y[0], X[-1], Y[-1]))
+
+    # The final column and first row must end at the final bin
+    if x1 < x0 or y1 < y0 or np.abs(X[-ny] - X[-1]) >= 1e-4 \
+            or np.abs(Y[ny - 1] - Y[-1]) >= 1e-4:
+        return None
+
+    def calc_1d(v0, v1, n):
+        try:
+            return (v1 - v0) / (n - 1)
+        except:
+            return 0.0
+
+    info = {
+        'shape': (nx, ny),
+        'spacing': (calc_1d(x0, x1, nx), calc_1d(y0, y1, ny)),
+        'num_bins': nx * ny,
+        'origin': (x0, y0),
+    }
+
+    return info
+
+
 def calc_information(X, Y):
     """Return a dict of system information calculated from input cell positions.
 
@@ -75,7 +301,7 @@ def calc_information(X, Y):
     """
 
     def calc_shape(X, Y):
-        data = np.zeros((len(X), ), dtype=[('X', np.float), ('Y', np.float)])
+        data = np.zeros((len(X), ), dtype=[(l, get_float_dtype()) for l in ('X', 'Y')])
         data['X'] = X
         data['Y'] = Y
 
@@ -129,12 +355,26 @@ def calc_information(X, Y):
     return info
 
 
-def read_binsimple(filename):
+def read_binsimple(filename, mmap=False, fields=None, xlim=None, ylim=None,
+        decimals=5):
     """Return data and information read from a simple binary format.
 
     Args:
         filename (str): A file to read data from.
 
+    Keyword Args:
+        mmap (bool, default=False): Return read-only views of a memory map
+            of the file instead of reading it into memory.
+
+        fields (list, optional): Return only these fields along with the
+            coordinates.
+
+        xlim, ylim (2-tuples, optional): Return only the bins with
+            coordinates inside these limits. See `get_window_rows`.
+
+        decimals (int, default=5): Number of decimals to round coordinates
+            to before comparing them to the limits.
+
     Returns:
         dict: Data with field labels as keys.
 
@@ -142,14 +382,25 @@ def read_binsimple(filename):
 
     def read_file(filename):
         # Fixed field order of format
-        fields = ['X', 'Y', 'N', 'T', 'M', 'U', 'V']
-        raw_data = np.fromfile(filename, dtype='float32')
+        stored_fields = ['X', 'Y', 'N', 'T', 'M', 'U', 'V']
+        set_window = xlim != None or ylim != None
+
+        # Only the rows of a window are read from a map of the file
+        raw_data = load_values(filename, mmap=(mmap or set_window))
+
+        rows = raw_data.reshape(-1, len(stored_fields))
+
+        if set_window:
+            rows = get_window_rows(rows, xlim, ylim, decimals)
+
+            if not mmap:
+                rows = np.array(rows)
 
         # Unpack into dictionary
         data = {}
-        stride = len(fields)
-        for i, field in enumerate(fields):
-            data[field] = raw_data[i::stride]
+        for i, field in enumerate(stored_fields):
+            if fields == None or field in ('X', 'Y') or field in fields:
+                data[field] = rows[:, i]
 
         return data
 
@@ -158,18 +409,266 @@ def read_binsimple(filename):
     return data
 
 
-def read_plainsimple(filename):
+def read_binsimple_v2(filename, header, mmap=False, fields=None,
+        xlim=None, ylim=None, decimals=5):
+    """Return data and information read from the simple binary format 2.
+
+    The values of every field are stored in a contiguous block after the
+    header, which means that the fields are read without separating them
+    from each other and that only the blocks of the selected fields are
+    read. The coordinates are not stored and are not returned.
+
+    Args:
+        filename (str): A file to read data from.
+
+        header (tuple): Header of the file, see `read_header`.
+
+    Keyword Args:
+        mmap (bool, default=False): Return read-only views of a memory map
+            of the file instead of reading it into memory.
+
+        fields (list, optional): Return only these fields.
+
+        xlim, ylim (2-tuples, optional): Return only the bins with
+            coordinates inside these limits.
+
+        decimals (int, default=5): Number of decimals to round coordinates
+            to before comparing them to the limits.
+
+    Returns:
+        (dict, dict): 2-tuple with data with field labels as keys and
+            information about the grid of the data.
+
+    Raises:
+        KeyError: If a selected field is not stored in the file.
+
+    """
+
+    stored_fields, info, offset = header
+    nx, ny = info['shape']
+    num_bins = nx * ny
+
+    if fields == None:
+        fields = stored_fields
+    else:
+        fields = [l for l in fields if l not in ('X', 'Y')]
+
+    for l in fields:
+        if l not in stored_fields:
+            raise KeyError("field %r is not stored in the file" % l)
+
+    set_window = xlim != None or ylim != None
+
+    if mmap or set_window:
+        blocks = load_values(filename, mmap=True, offset=offset,
+            count=len(stored_fields) * num_bins).reshape(len(stored_fields), nx, ny)
+
+        if set_window:
+            (ix0, ix1), (iy0, iy1) = get_window_ranges(info, xlim, ylim, decimals)
+            blocks = blocks[:, ix0:ix1, iy0:iy1]
+            info = {
+                'shape': (ix1 - ix0, iy1 - iy0),
+                'spacing': info['spacing'],
+                'origin': tuple(x0 + dx * i for x0, dx, i
+                    in zip(info['origin'], info['spacing'], (ix0, iy0))),
+                'num_bins': (ix1 - ix0) * (iy1 - iy0),
+            }
+
+        data = {}
+        for l in fields:
+            values = blocks[stored_fields.index(l)]
+            data[l] = values.reshape(-1) if mmap else np.array(values).ravel()
+    else:
+        data = {}
+
+        # Fields are read in the stored order to only seek forward
+        # in compressed files
+        with open_file(filename) as fp:
+            for i, l in enumerate(stored_fields):
+                if l in fields:
+                    fp.seek(offset + i * num_bins * 4)
+                    data[l] = read_array(fp, 'float32', num_bins)
+
+    return data, info
+
+
+def load_values(filename, mmap=False, offset=0, count=-1):
+    """Return the 32-bit floating point values of a binary file.
+
+    Uncompressed files are memory mapped if `mmap` is set, otherwise
+    and for compressed files the values are read into memory.
+
+    Args:
+        filename (str): A file to read values from.
+
+    Keyword Args:
+        mmap (bool, default=False): Return a read-only memory map.
+
+        offset (int, default=0): Byte offset of the first value.
+
+        count (int, default=-1): Number of values, -1 for all.
+
+    Returns:
+        ndarray: The values.
+
+    """
+
+    with open_file(filename) as fp:
+        if mmap and not is_stream(fp):
+            shape = (count, ) if count >= 0 else None
+            return np.memmap(filename, dtype='float32', mode='r',
+                offset=offset, shape=shape)
+
+        fp.seek(offset)
+        return read_array(fp, 'float32', count)
+
+
+def get_window_ranges(info, xlim=None, ylim=None, decimals=5):
+    """Return the bin index ranges along x and y of bins inside limits.
+
+    The bin positions are calculated from the grid information and rounded
+    to the number of decimals before they are compared to the limits,
+    as for the coordinates of files without a header.
+
+    """
+
+    def get_range(x0, dx, n, lims):
+        vmin, vmax = lims if lims != None else (None, None)
+        vmin = vmin if vmin != None else -np.inf
+        vmax = vmax if vmax != None else np.inf
+
+        xs = (x0 + dx * np.arange(n)).round(decimals)
+        inds = np.nonzero((xs >= vmin) & (xs <= vmax))[0]
+
+        if inds.size == 0:
+            return 0, 0
+
+        return int(inds[0]), int(inds[-1]) + 1
+
+    return [get_range(x0, dx, n, lims) for x0, dx, n, lims
+        in zip(info['origin'], info['spacing'], info['shape'], (xlim, ylim))]
+
+
+def get_window_rows(rows, xlim=None, ylim=None, decimals=5):
+    """Return the rows of binary data for bins inside a window.
+
+    The bins are stored in rows ordered along x first and then y, which
+    means that the bins of every x position are stored together. The
+    number of bins along y is found from the first rows, after which
+    the range of rows of every x position inside the window is known
+    without reading the other rows.
+
+    The window contains the bins with coordinates inside the limits,
+    which include their end points. Either limit can be None to not limit
+    the window in that direction.
+
+    Args:
+        rows (ndarray): Data of the file with one bin per row, starting
+            with the x and y coordinates.
+
+    Keyword Args:
+        xlim, ylim (2-tuples, optional): Limits of the window.
+
+        decimals (int, default=5): Number of decimals to round coordinates
+            to before comparing them to the limits.
+
+    Returns:
+        ndarray: Rows of the bins inside the window.
+
+    """
+
+    def get_range(values, lims):
+        vmin, vmax = lims if lims != None else (None, None)
+        vmin = vmin if vmin != None else -np.inf
+        vmax = vmax if vmax != None else np.inf
+
+        values = values.astype(get_float_dtype(values.dtype)).round(decimals)
+        inds = np.nonzero((values >= vmin) & (values <= vmax))[0]
+
+        if inds.size == 0:
+            return 0, 0
+
+        return inds[0], inds[-1] + 1
+
+    if rows.shape[0] == 0:
+        return rows
+
+    ny = count_column_rows(rows[:, 0])
+    nx = rows.shape[0] // ny
+
+    grid = rows.reshape(nx, ny, rows.shape[1])
+    ix0, ix1 = get_range(grid[:, 0, 0], xlim)
+    iy0, iy1 = get_range(grid[0, :, 1], ylim)
+
+    return grid[ix0:ix1, iy0:iy1].reshape(-1, rows.shape[1])
+
+
+def count_column_rows(xs, chunk_size=4096):
+    """Return the number of bins with the first x position.
+
+    The x positions of bins are read in chunks until the first changes,
+    to not read more than needed of memory mapped files.
+
+    """
+
+    x0 = xs[0]
+    num_rows = 0
+
+    while num_rows < xs.size:
+        chunk = xs[num_rows:num_rows + chunk_size]
+        inds = np.nonzero(np.abs(chunk - x0) >= 1e-4)[0]
+
+        if inds.size > 0:
+            return num_rows + int(inds[0])
+
+        num_rows += chunk.size
+
+    return num_rows
+
+
+def cut_window(data, xlim=None, ylim=None, decimals=5):
+    """Return the data of bins with coordinates inside the limits."""
+
+    if xlim == None and ylim == None:
+        return data
+
+    inds = np.ones(data['X'].shape, dtype=bool)
+
+    for coord, lims in zip(('X', 'Y'), (xlim, ylim)):
+        vmin, vmax = lims if lims != None else (None, None)
+        values = data[coord].round(decimals)
+
+        if vmin != None:
+            inds &= values >= vmin
+        if vmax != None:
+            inds &= values <= vmax
+
+    return {l: data[l][inds] for l in data.keys()}
+
+
+def read_plainsimple(filename, chunk_size=2**22):
     """Return field data from a simple plaintext format.
 
+    The file has a header line with the field labels, followed by a line
+    of whitespace separated values for every bin. The lines are parsed in
+    large chunks by `numpy.loadtxt` into single precision columns, which are
+    allocated from an estimate of the number of lines and grown if needed.
+    Files which can not be parsed this way, for instance if values are
+    missing, are read with `numpy.genfromtxt`.
+
     Args:
         filename (str): A file to read data from.
 
+    Keyword Args:
+        chunk_size (int, default=4 MiB): Number of bytes to parse at once.
+
     Returns:
         dict: Data with field labels as keys.
     """
 
     def read_file(filename):
-        raw_data = np.genfromtxt(filename, names=True)
+        with open_file(filename) as fp:
+            raw_data = np.genfromtxt(fp, names=True)
 
         # Unpack into dictionary
         data = {}
@@ -178,6 +677,70 @@ def read_plainsimple(filename):
 
         return data
 
-    data = read_file(filename)
+    def parse_values(chunk):
+        # Values which are not numbers or lines of different lengths
+        # raise a ValueError
+        if chunk.strip() == b'':
+            return np.empty((0, len(labels)), dtype=np.float32)
 
-    return data
+        values = np.loadtxt(io.BytesIO(chunk), dtype=np.float32,
+                comments=None, ndmin=2)
+
+        if values.shape[1] != len(labels):
+            raise ValueError("lines do not have a value for every field")
+
+        return values
+
+    def gen_chunks(fp):
+        remainder = b''
+
+        while True:
+            buf = fp.read(chunk_size)
+
+            if buf == b'':
+                yield remainder
+                return
+
+            # Parse only full lines and keep the rest for the next chunk
+            pos = buf.rfind(b'\n') + 1
+            yield remainder + buf[:pos]
+            remainder = buf[pos:]
+
+    def get_num_bytes(fp):
+        # The size of compressed files is only used as a first estimate
+        try:
+            return max(os.fstat(fp.fileno()).st_size - fp.tell(), 0)
+        except (OSError, io.UnsupportedOperation):
+            return 0
+
+    with open_file(filename) as fp:
+        labels = fp.readline().decode('ascii', errors='replace').lstrip('#').split()
+        num_bytes = get_num_bytes(fp)
+
+        if labels == []:
+            return read_file(filename)
+
+        columns = None
+        num_rows = 0
+
+        try:
+            for chunk in gen_chunks(fp):
+                rows = parse_values(chunk)
+
+                if columns is None:
+                    bytes_per_row = len(chunk) / max(rows.shape[0], 1)
+                    size = int(1.05 * num_bytes / max(bytes_per_row, 1.)) + 1
+                    columns = np.empty((len(labels), size), dtype=np.float32)
+
+                if num_rows + rows.shape[0] > columns.shape[1]:
+                    size = max(2 * columns.shape[1], num_rows + rows.shape[0])
+                    grown_columns = np.empty((len(labels), size), dtype=np.float32)
+                    grown_columns[:, :num_rows] = columns[:, :num_rows]
+                    columns = grown_columns
+
+                columns[:, num_rows:num_rows + rows.shape[0]] = rows.T
+                num_rows += rows.shape[0]
+        except ValueError:
+            return read_file(filename)
+
+    return {l: columns[i, :num_rows] for i, l in enumerate(labels)}
@@ -92,3 +92,219 @@ def test_calc_badinfo():
 
     with pytest.raises(ValueError):
         calc_information(X, Y)
+
+def test_read_selected_fields():
+    import os
+    import tempfile as tmp
+    from strata.dataformats.simple.write import write_data
+
+    filename = 'strata/dataformats/simple/tests/data_plainsimple.dat'
+    save_data, info = read_data(filename)
+
+    with tmp.TemporaryDirectory() as tmpdir:
+        for binary, version in ((True, 1), (True, 2), (False, 1)):
+            path = os.path.join(tmpdir, 'data.dat')
+            write_data(path, save_data, binary=binary, version=version)
+
+            for mmap in (False, True):
+                data, read_info = read_data(path, mmap=mmap, fields=['T', 'U'])
+                assert (set(data.keys()) == set(['X', 'Y', 'T', 'U']))
+                assert np.array_equal(read_info['shape'], info['shape'])
+
+                for l in data.keys():
+                    assert (np.allclose(data[l], save_data[l]))
+
+            with pytest.raises(KeyError):
+                read_data(path, fields=['bad_field'])
+
+def test_read_data_inside_limits():
+    import os
+    import tempfile as tmp
+    from strata.dataformats.simple.write import write_data
+
+    filename = 'strata/dataformats/simple/tests/data_plainsimple.dat'
+    save_data, info = read_data(filename)
+
+    xlim = (133.3, None)
+    ylim = (0.5, 1.)
+    inds = (save_data['X'] >= 133.3) & (save_data['Y'] >= 0.5) & (save_data['Y'] <= 1.)
+
+    with tmp.TemporaryDirectory() as tmpdir:
+        for binary, version in ((True, 1), (True, 2), (False, 1)):
+            path = os.path.join(tmpdir, 'data.dat')
+            write_data(path, save_data, binary=binary, version=version)
+
+            for mmap in (False, True):
+                data, window_info = read_data(path, mmap=mmap, xlim=xlim, ylim=ylim)
+
+                assert np.array_equal(window_info['shape'], [2, 2])
+                assert np.allclose(window_info['origin'], [133.375, 0.625])
+                assert np.allclose(window_info['spacing'], info['spacing'])
+
+                for l in data.keys():
+                    assert (np.allclose(data[l], save_data[l][inds]))
+
+            # Windows without bins return empty data
+            for mmap in (False, True):
+                data, window_info = read_data(path, mmap=mmap, xlim=(200., None))
+                assert (window_info['num_bins'] == 0)
+                assert (set(data.keys()) == FIELDS)
+
+                for l in data.keys():
+                    assert (data[l].size == 0)
+
+                if binary:
+                    assert np.allclose(window_info['spacing'], info['spacing'])
+
+            sparse_data, _ = read_data(path, xlim=(200., None), sparse=True)
+            assert (sparse_data['IX'].size == 0)
+
+def test_read_data_without_bins():
+    import os
+    import tempfile as tmp
+    from strata.dataformats.simple.write import write_data
+
+    empty_data = {l: np.zeros(0) for l in FIELDS}
+
+    with tmp.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, 'data.dat')
+        write_data(path, empty_data, binary=False)
+
+        data, info = read_data(path)
+        assert (info['num_bins'] == 0)
+        assert (set(data.keys()) == FIELDS)
+
+        for l in data.keys():
+            assert (data[l].size == 0)
+
+def test_read_binsimple_v2():
+    import os
+    import tempfile as tmp
+    from strata.dataformats.simple.write import write_data
+
+    filename = 'strata/dataformats/simple/tests/data_plainsimple.dat'
+    save_data, info = read_data(filename)
+
+    with tmp.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, 'data.dat')
+
+        # Shuffled bins are ordered when written
+        order = np.random.permutation(save_data['X'].size)
+        write_data(path, {l: v[order] for l, v in save_data.items()}, version=2)
+
+        assert (is_binary(path))
+        stored_fields, header_info, offset = read_header(path)
+        assert (stored_fields == ['N', 'T', 'M', 'U', 'V'])
+        assert (os.path.getsize(path) == offset + 5 * 4 * info['num_bins'])
+
+        data, data_info = read_data(path)
+        assert np.array_equal(data_info['shape'], info['shape'])
+        assert np.allclose(data_info['origin'], info['origin'])
+        assert np.allclose(data_info['spacing'], info['spacing'])
+
+        for l in save_data.keys():
+            assert (np.allclose(data[l], save_data[l]))
+
+        # Fields are contiguous blocks
+        assert (data['M'].flags.c_contiguous)
+
+        sparse_data, _ = read_data(path, sparse=True)
+        inds = np.nonzero(save_data['M'])[0]
+        assert (np.allclose(sparse_data['M'], save_data['M'][inds]))
+        assert (np.array_equal(sparse_data['IX'], inds // info['shape'][1]))
+
+        header_info, num_values = read_info(path)
+        assert (header_info == data_info)
+        assert (num_values == info['num_bins'])
+
+        assert (read_header(filename) == None)
+
+def test_write_binsimple_v2_incomplete_grid_error():
+    import os
+    import tempfile as tmp
+    from strata.dataformats.simple.write import write_data
+
+    # Five bins of which four could be mistaken for a 2x2 grid
+    xs = np.array([0.5, 0.5, 1.5, 1.5, 2.5])
+    ys = np.array([0.5, 2.5, 0.5, 2.5, 0.5])
+    save_data = {'X': xs, 'Y': ys}
+    for l in ('N', 'T', 'M', 'U', 'V'):
+        save_data[l] = np.arange(5.)
+
+    with tmp.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, 'data.dat')
+
+        with pytest.raises(ValueError):
+            write_data(path, save_data, version=2)
+
+        assert (not os.path.exists(path))
+
+def test_read_plainsimple_in_chunks_matches_genfromtxt():
+    import os
+    import tempfile as tmp
+    from strata.dataformats.simple.write import write_data
+
+    xs, ys = np.meshgrid(np.arange(50) + 0.5, np.arange(40) + 0.5, indexing='ij')
+    save_data = {'X': xs.ravel(), 'Y': ys.ravel()}
+    for l in ('N', 'T', 'M', 'U', 'V'):
+        save_data[l] = np.random.sample(xs.size)
+
+    with tmp.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, 'data.dat')
+        write_data(path, save_data, binary=False)
+
+        raw_data = np.genfromtxt(path, names=True)
+
+        # Small chunks split lines and make the columns grow
+        for chunk_size in (100, 4096, 2**22):
+            data = read_plainsimple(path, chunk_size=chunk_size)
+
+            assert (list(data.keys()) == list(raw_data.dtype.names))
+            for l in data.keys():
+                assert (data[l].dtype == np.float32)
+                assert (data[l].size == xs.size)
+                assert (np.array_equal(data[l], raw_data[l].astype(np.float32)))
+
+def test_read_plainsimple_with_missing_values_falls_back_to_genfromtxt():
+    import os
+    import tempfile as tmp
+
+    with tmp.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, 'data.dat')
+        with open(path, 'w') as fp:
+            fp.write("X Y M\n0.5 0.5 1.0\n1.5 0.5 nan\n2.5 0.5 bad\n")
+
+        data = read_plainsimple(path)
+
+        assert (list(data.keys()) == ['X', 'Y', 'M'])
+        assert (np.array_equal(data['X'], [0.5, 1.5, 2.5]))
+        assert (np.isnan(data['M'][1:]).all())
+
+def test_read_plainsimple_does_not_reshape_lines_with_wrong_number_of_values():
+    import os
+    import tempfile as tmp
+
+    with tmp.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, 'data.dat')
+
+        # The number of values is a multiple of the number of fields
+        with open(path, 'w') as fp:
+            fp.write("X Y\n0.5 0.5 1.0\n1.5\n")
+
+        with pytest.raises(ValueError):
+            read_plainsimple(path)
+
+def test_is_binary():
+    import os
+    import tempfile as tmp
+    from strata.dataformats.simple.write import write_data
+
+    filename = 'strata/dataformats/simple/tests/data_plainsimple.dat'
+    save_data, _ = read_data(filename)
+
+    with tmp.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, 'data.dat')
+        write_data(path, save_data, binary=True)
+
+        assert (is_binary(path))
+        assert (not is_binary(filename))
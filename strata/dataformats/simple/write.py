@@ -1,10 +1,13 @@
 import numpy as np
+from strata.dataformats.geometry import get_grid_coords
+from strata.dataformats.simple.read import FORMAT_V2, calc_information, \
+        calc_ordered_information
 from strata.utils import prepare_path
 
 """Module for writing data to disk in simple formats."""
 
 @prepare_path
-def write_data(path, data, binary=True):
+def write_data(path, data, binary=True, version=1):
     """Write data to disk in a simple data format.
 
     Input data must contain fields ('X', 'Y', 'U', 'V', 'N', 'T', 'M').
@@ -17,14 +20,21 @@ def write_data(path, data, binary=True):
         binary (bool): If True write to the simple binary format else
             to simple plaintext.
 
+        version (int, default=1): Version of the simple binary format.
+            Version 2 has a header with the grid information followed by
+            the values of each field in turn, see `write_binsimple_v2`.
+
     """
 
     def write_binsimple():
-        save_data.tofile(path)
+        if version == 2:
+            write_binsimple_v2(path, columns)
+        else:
+            columns.T.tofile(path)
 
     def write_plainsimple():
         header = ' '.join(fields_ordered)
-        np.savetxt(path, save_data, fmt='%6f', delimiter=' ',
+        np.savetxt(path, columns.T, fmt='%6f', delimiter=' ',
                 header=header, comments='')
 
     fields_ordered = ['X', 'Y', 'N', 'T', 'M', 'U', 'V']
@@ -34,7 +44,7 @@ def write_data(path, data, binary=True):
         data.sort(order=['X', 'Y'])
 
     try:
-        save_data = np.array([data[l] for l in fields_ordered], dtype=btype).T
+        columns = np.array([data[l] for l in fields_ordered], dtype=btype)
     except KeyError:
         raise KeyError("Can not write desired file format: Missing keys %r."
                 % set(fields_ordered).difference(data.keys()))
@@ -43,3 +53,61 @@ def write_data(path, data, binary=True):
         write_binsimple()
     else:
         write_plainsimple()
+
+
+def write_binsimple_v2(path, columns):
+    """Write columns of X, Y and field values in the simple binary format 2.
+
+    The file begins with a header of text lines with the grid 'SHAPE',
+    'ORIGIN' and 'SPACING' and the 'FIELDS' which are stored, ended by
+    a null byte. The origin is the position of the first bin. Then the
+    32-bit floating point values of every field are stored in a single
+    block, in the order of the fields and ordered along x first and then
+    y within the block. The coordinates are not stored.
+
+    Raises:
+        ValueError: If the bins are not all the bins of a regular grid,
+            which can not be stored without their coordinates.
+
+    """
+
+    def matches_grid(info, xs, ys):
+        # The grid must have a bin for every stored bin, at its position
+        if info == None or info['shape'][0] * info['shape'][1] != xs.size:
+            return False
+
+        grid_xs, grid_ys = get_grid_coords(info['origin'], info['shape'],
+            info['spacing'], offset=0.)
+
+        return np.allclose(xs, grid_xs, atol=1e-4) \
+            and np.allclose(ys, grid_ys, atol=1e-4)
+
+    fields = ['N', 'T', 'M', 'U', 'V']
+    xs, ys = columns[:2].astype(np.float64)
+
+    # The grid found from the first and final bins must match all bins
+    info = calc_ordered_information(xs, ys)
+
+    if not matches_grid(info, xs, ys):
+        order = np.lexsort((ys, xs))
+        columns = columns[:, order]
+        xs, ys = xs[order], ys[order]
+
+        info = calc_information(xs.round(5), ys.round(5))
+
+        if not matches_grid(info, xs, ys):
+            raise ValueError("can not write {!r} in the simple binary format 2: "
+                "the bins are not all the bins of a regular grid".format(path))
+
+    with open(path, 'wb') as fp:
+        fp.write(FORMAT_V2 + b"\n")
+        fp.write("SHAPE {} {}\n".format(*info['shape']).encode())
+        fp.write("ORIGIN {!r} {!r}\n".format(*(float(v) for v in info['origin'])).encode())
+        fp.write("SPACING {!r} {!r}\n".format(*(float(v) for v in info['spacing'])).encode())
+        fp.write("FIELDS {}\n".format(' '.join(fields)).encode())
+        fp.write("COMMENT 'ORIGIN' is the position of the first bin\n".encode())
+        fp.write("COMMENT Each field is stored as 'SHAPE' 32-bit floating point "
+                 "numbers in turn, ordered along x first and then y\n".encode())
+        fp.write(b"\0")
+
+        columns[2:].tofile(fp)
@@ -0,0 +1,185 @@
+import gzip
+import numpy as np
+import os
+import pytest
+import tarfile
+import tempfile as tmp
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+from strata.dataformats.archive import *
+from strata.dataformats.catalogue import catalogue_files, get_catalogue_path
+from strata.dataformats.read import read_data_file, read_from_files
+from strata.dataformats.write import write
+from strata.utils import find_datamap_files
+
+
+info = {'shape': (3, 2), 'origin': (1., 2.), 'spacing': (0.5, 0.25), 'num_bins': 6}
+
+x = 1. + 0.5 * (np.arange(3) + 0.5)
+y = 2. + 0.25 * (np.arange(2) + 0.5)
+xs, ys = np.meshgrid(x, y, indexing='ij')
+
+num_files = 4
+
+
+def write_files(directory):
+    files = []
+
+    for i in range(num_files):
+        data = {'X': xs.ravel(), 'Y': ys.ravel()}
+        for l in ('N', 'T', 'M', 'U', 'V'):
+            data[l] = np.arange(6, dtype=np.float64) + i
+
+        ftype = 'gmx' if i % 2 == 0 else 'simple'
+        path = os.path.join(directory, 'flow%05d.dat' % (i + 1))
+        write(path, data, info, ftype=ftype)
+        files.append(path)
+
+    # Members can also be compressed
+    with open(files[-1], 'rb') as fp:
+        buf = fp.read()
+    with gzip.open(files[-1], 'wb') as fp:
+        fp.write(buf)
+
+    return files
+
+
+def create_archive(path, files, kind):
+    if kind == 'zip':
+        with zipfile.ZipFile(path, 'w') as fp:
+            for fn in files:
+                fp.write(fn, 'run/%s' % os.path.basename(fn))
+    else:
+        with tarfile.open(path, 'w:%s' % kind) as fp:
+            for fn in files:
+                fp.add(fn, './run/%s' % os.path.basename(fn))
+
+
+def test_read_files_in_archives():
+    with tmp.TemporaryDirectory() as tmpdir:
+        files = write_files(tmpdir)
+
+        for kind, ext in (('', '.tar'), ('gz', '.tar.gz'), ('zip', '.zip')):
+            archive = os.path.join(tmpdir, 'runs%s' % ext)
+            create_archive(archive, files, kind)
+
+            base = os.path.join(archive, 'run', 'flow')
+            assert (split_archive_path(base + '00001.dat') == (archive, 'run/flow00001.dat'))
+            assert (sorted(list_archive_directory(os.path.join(archive, 'run')))
+                == [os.path.basename(fn) for fn in files])
+
+            members = list(find_datamap_files(base))
+            assert (members == ['%s%05d.dat' % (base, i + 1) for i in range(num_files)])
+
+            for prefetch in (0, 2):
+                read_data = read_from_files(*members, prefetch=prefetch, fields=['M'])
+
+                for fn, (data, read_info, _) in zip(files, read_data):
+                    file_data, file_info, _ = read_data_file(fn, fields=['M'])
+
+                    assert (read_info == file_info)
+                    for l in ('X', 'Y', 'M'):
+                        assert (np.allclose(data[l], file_data[l]))
+
+            catalogue = get_catalogue_path(base)
+            assert (catalogue == '%s.run.flow.index.json' % archive)
+
+            entries, num_read = catalogue_files(members, catalogue)
+            assert (num_read == num_files)
+            assert (entries[members[0]]['shape'] == info['shape'])
+            assert (catalogue_files(members, catalogue)[1] == 0)
+
+            with pytest.raises(FileNotFoundError):
+                read_data_file(os.path.join(archive, 'run', 'bad.dat'))
+
+
+def test_split_path_outside_archive():
+    with tmp.TemporaryDirectory() as tmpdir:
+        files = write_files(tmpdir)
+
+        assert (split_archive_path(files[0]) == (files[0], None))
+
+        path = os.path.join(files[0], 'member')
+        assert (split_archive_path(path) == (path, None))
+        assert (list_archive_directory(tmpdir) == None)
+
+
+def test_open_member_outside_archive():
+    with tmp.TemporaryDirectory() as tmpdir:
+        files = write_files(tmpdir)
+
+        with pytest.raises(FileNotFoundError):
+            open_member(files[0], 'member')
+
+        with pytest.raises(FileNotFoundError):
+            open_member(os.path.join(tmpdir, 'missing.tar'), 'member')
+
+
+def read_member(archive, name):
+    with open_member(archive, name) as fp:
+        return fp.read()
+
+
+def try_lock(lock):
+    if lock.acquire(blocking=False):
+        lock.release()
+        return True
+
+    return False
+
+
+def test_open_member_streams_from_archive():
+    with tmp.TemporaryDirectory() as tmpdir:
+        files = write_files(tmpdir)
+
+        for kind, ext in (('', '.tar'), ('gz', '.tar.gz'), ('zip', '.zip')):
+            archive = os.path.join(tmpdir, 'runs%s' % ext)
+            create_archive(archive, files, kind)
+
+            _, _, lock, _ = get_archive(archive)
+
+            for fn in files:
+                with open(fn, 'rb') as fp:
+                    buf = fp.read()
+
+                member = 'run/%s' % os.path.basename(fn)
+
+                with open_member(archive, member) as fp:
+                    assert (fp.read(8) == buf[:8])
+                    fp.seek(0)
+                    assert (fp.read() == buf)
+
+                # The member has released the archive for other threads
+                with ThreadPoolExecutor(1) as executor:
+                    assert (executor.submit(try_lock, lock).result())
+
+
+def test_archives_are_closed_when_evicted():
+    with tmp.TemporaryDirectory() as tmpdir:
+        files = write_files(tmpdir)
+
+        archives = []
+        for i in range(MAX_OPEN_ARCHIVES + 1):
+            for kind, ext in (('gz', '.tar.gz'), ('zip', '.zip'), ('', '.tar')):
+                archive = os.path.join(tmpdir, 'runs%d%s' % (i, ext))
+                create_archive(archive, files, kind)
+                archives.append(archive)
+
+        member = 'run/%s' % os.path.basename(files[0])
+        with open(files[0], 'rb') as fp:
+            buf = fp.read()
+
+        # Uncompressed tar archives are not kept open
+        kind, archive_file, _, _ = get_archive(archives[2])
+        assert (kind == 'tar' and archive_file == None)
+
+        stream, zip_archive = (get_archive(archive)[1] for archive in archives[:2])
+        assert (read_member(archives[1], member) == buf)
+
+        for archive in archives:
+            assert (read_member(archive, member) == buf)
+
+        assert (stream.closed)
+        assert (zip_archive.fp == None)
+
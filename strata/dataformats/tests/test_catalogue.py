@@ -0,0 +1,136 @@
+import numpy as np
+import os
+import pytest
+import tempfile as tmp
+
+from strata.dataformats.catalogue import *
+from strata.dataformats.read import read_data_file, read_file_info
+from strata.dataformats.write import write
+
+
+plain_filename = 'strata/dataformats/simple/tests/data_plainsimple.dat'
+
+info = {'shape': (3, 2), 'origin': (1., 2.), 'spacing': (0.5, 0.25), 'num_bins': 6}
+
+x = 1. + 0.5 * (np.arange(3) + 0.5)
+y = 2. + 0.25 * (np.arange(2) + 0.5)
+xs, ys = np.meshgrid(x, y, indexing='ij')
+
+data = {'X': xs.ravel(), 'Y': ys.ravel()}
+for l in ('N', 'T', 'M', 'U', 'V'):
+    data[l] = np.arange(6, dtype=np.float64) + 1.
+
+# A single empty bin is not stored in the gmx format
+data['M'][3] = 0.
+for l in ('N', 'T', 'U', 'V'):
+    data[l][3] = 0.
+
+
+def write_series(base, num_files, ftype='gmx'):
+    files = []
+
+    for i in range(num_files):
+        path = '%s%05d.dat' % (base, i + 1)
+        write(path, data, info, ftype=ftype)
+        files.append(path)
+
+    return files
+
+
+def test_read_file_info_matches_read_data():
+    with tmp.TemporaryDirectory() as tmpdir:
+        for ftype in ('gmx', 'simple'):
+            path = os.path.join(tmpdir, '%s.dat' % ftype)
+            write(path, data, info, ftype=ftype)
+
+            _, read_info, _ = read_data_file(path)
+            header_info, num_values, _ = read_file_info(path)
+
+            assert (header_info['shape'] == tuple(read_info['shape']))
+            assert (np.allclose(header_info['spacing'], read_info['spacing']))
+            assert (np.allclose(header_info['origin'], read_info['origin']))
+            assert (header_info['num_bins'] == read_info['num_bins'])
+
+        assert (read_file_info(os.path.join(tmpdir, 'gmx.dat'))[1] == 5)
+        assert (read_file_info(os.path.join(tmpdir, 'simple.dat'))[1] == 6)
+
+
+def test_read_file_info_of_plaintext_is_none():
+    header_info, num_values, _ = read_file_info(plain_filename)
+
+    assert (header_info == None)
+    assert (num_values == None)
+
+
+def test_catalogue_files_writes_and_reuses_sidecar():
+    with tmp.TemporaryDirectory() as tmpdir:
+        base = os.path.join(tmpdir, 'data')
+        files = write_series(base, 3)
+        path = get_catalogue_path(base)
+
+        entries, num_read = catalogue_files(files, path)
+        assert (num_read == 3)
+        assert (os.path.exists(path))
+        assert (list(entries.keys()) == files)
+
+        for entry in entries.values():
+            assert (entry['format'] == 'gmx_flow_version_1')
+            assert (entry['shape'] == info['shape'])
+            assert (entry['spacing'] == info['spacing'])
+            assert (entry['origin'] == info['origin'])
+            assert (entry['num_bins'] == 6)
+            assert (entry['num_values'] == 5)
+
+        # Unchanged files are taken from the catalogue
+        cached_entries, num_read = catalogue_files(files, path)
+        assert (num_read == 0)
+        assert (cached_entries == entries)
+
+        # Changed files are read again
+        write(files[1], data, info, ftype='simple')
+        os.utime(files[1], ns=(0, 0))
+
+        cached_entries, num_read = catalogue_files(files, path)
+        assert (num_read == 1)
+        assert (cached_entries[files[1]]['format'] == 'simple')
+        assert (cached_entries[files[1]]['num_values'] == 6)
+
+
+def test_catalogue_files_with_bad_sidecar_reads_headers():
+    with tmp.TemporaryDirectory() as tmpdir:
+        base = os.path.join(tmpdir, 'data')
+        files = write_series(base, 2)
+        path = get_catalogue_path(base)
+
+        with open(path, 'w') as fp:
+            fp.write("not a catalogue")
+
+        entries, num_read = catalogue_files(files, path)
+        assert (num_read == 2)
+        assert (read_catalogue(path) == entries)
+
+
+def test_check_geometry():
+    with tmp.TemporaryDirectory() as tmpdir:
+        base = os.path.join(tmpdir, 'data')
+        files = write_series(base, 3)
+
+        entries, _ = catalogue_files(files)
+        geometry = check_geometry(entries)
+
+        assert (geometry == {
+            'shape': info['shape'],
+            'spacing': info['spacing'],
+            'origin': info['origin'],
+        })
+
+        moved_info = info.copy()
+        moved_info['origin'] = (0., 0.)
+        write(files[2], data, moved_info)
+
+        entries, _ = catalogue_files(files)
+
+        with pytest.raises(ValueError):
+            check_geometry(entries)
+
+    assert (check_geometry({}) == None)
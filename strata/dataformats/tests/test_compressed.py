@@ -0,0 +1,114 @@
+import bz2
+import gzip
+import lzma
+import numpy as np
+import os
+import tempfile as tmp
+
+from strata.dataformats.compressed import *
+from strata.dataformats.read import read_data_file, read_file_info
+from strata.dataformats.write import write
+from strata.utils import find_datamap_files, pop_fileopts
+
+
+info = {'shape': (3, 2), 'origin': (1., 2.), 'spacing': (0.5, 0.25), 'num_bins': 6}
+
+x = 1. + 0.5 * (np.arange(3) + 0.5)
+y = 2. + 0.25 * (np.arange(2) + 0.5)
+xs, ys = np.meshgrid(x, y, indexing='ij')
+
+data = {'X': xs.ravel(), 'Y': ys.ravel()}
+for l in ('N', 'T', 'M', 'U', 'V'):
+    data[l] = np.arange(6, dtype=np.float64) + 1.
+
+compressors = {'gzip': gzip.open, 'bz2': bz2.open, 'xz': lzma.open}
+compressed_exts = {'gzip': '.gz', 'bz2': '.bz2', 'xz': '.xz'}
+
+
+def compress_file(path, compression):
+    compressed_path = path + compressed_exts[compression]
+
+    with open(path, 'rb') as fp:
+        with compressors[compression](compressed_path, 'wb') as fpout:
+            fpout.write(fp.read())
+
+    return compressed_path
+
+
+def test_get_compression():
+    with tmp.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, 'data.dat')
+        write(path, data, info)
+
+        assert (get_compression(path) == None)
+
+        for compression in compressors.keys():
+            assert (get_compression(compress_file(path, compression)) == compression)
+
+    assert (get_compression(os.path.join(tmpdir, 'not_a_file')) == None)
+
+
+def test_read_array_grows_to_fit_values():
+    values = np.arange(1000, dtype=np.float32)
+
+    with tmp.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, 'values.gz')
+
+        with gzip.open(path, 'wb') as fp:
+            fp.write(values.tobytes())
+
+        with open_file(path) as fp:
+            assert (is_stream(fp))
+            assert (np.array_equal(read_array(fp, np.float32, chunk_size=64), values))
+
+        with open_file(path) as fp:
+            assert (np.array_equal(read_array(fp, np.float32, 10), values[:10]))
+            assert (np.array_equal(read_array(fp, np.float32, 2000), values[10:]))
+
+
+def test_read_compressed_files():
+    kwargs_list = [
+        {},
+        {'mmap': True},
+        {'sparse': True},
+        {'fields': ['M']},
+        {'xlim': (1.5, None), 'ylim': (None, 2.4)},
+    ]
+
+    with tmp.TemporaryDirectory() as tmpdir:
+        for ftype in ('gmx', 'simple', 'simple_v2', 'simple_plain'):
+            path = os.path.join(tmpdir, '%s.dat' % ftype)
+            write(path, data, info, ftype=ftype)
+
+            for compression in compressors.keys():
+                compressed_path = compress_file(path, compression)
+
+                for kwargs in kwargs_list:
+                    read_data, read_info, _ = read_data_file(path, **kwargs)
+                    compressed_data, compressed_info, _ = \
+                        read_data_file(compressed_path, **kwargs)
+
+                    assert (compressed_info == read_info)
+                    assert (set(compressed_data.keys()) == set(read_data.keys()))
+
+                    for l in read_data.keys():
+                        assert (np.allclose(compressed_data[l], read_data[l]))
+
+                assert (read_file_info(compressed_path)[:2] == read_file_info(path)[:2])
+
+
+def test_find_compressed_files_and_output_extension():
+    with tmp.TemporaryDirectory() as tmpdir:
+        base = os.path.join(tmpdir, 'data')
+
+        for i in range(3):
+            path = '%s%05d.dat' % (base, i + 1)
+            write(path, data, info)
+            compress_file(path, 'gzip')
+
+        files = list(find_datamap_files(base, ext='.dat.gz'))
+        assert (files == ['%s%05d.dat.gz' % (base, i + 1) for i in range(3)])
+
+    fopts = pop_fileopts({'ext': '.dat.gz'})
+    assert (fopts['ext'] == '.dat.gz')
+    assert (fopts['outext'] == '.dat')
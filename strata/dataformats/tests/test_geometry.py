@@ -0,0 +1,65 @@
+import numpy as np
+import os
+import pytest
+import tempfile as tmp
+
+from strata.dataformats.geometry import get_grid_coords
+from strata.dataformats.read import read_data_file
+from strata.dataformats.simple.average import average_data
+from strata.dataformats.write import write
+
+
+info = {'shape': (3, 2), 'origin': (1., 2.), 'spacing': (0.5, 0.25), 'num_bins': 6}
+
+
+def test_grid_coords_are_shared_and_read_only():
+    xs, ys = get_grid_coords(info['origin'], info['shape'], info['spacing'])
+
+    x = 1. + 0.5 * (np.arange(3) + 0.5)
+    y = 2. + 0.25 * (np.arange(2) + 0.5)
+    control_xs, control_ys = np.meshgrid(x, y, indexing='ij')
+
+    assert (np.array_equal(xs, control_xs.ravel()))
+    assert (np.array_equal(ys, control_ys.ravel()))
+
+    with pytest.raises(ValueError):
+        xs[0] = 0.
+
+    # Equal geometries given with other types share the arrays
+    same_xs, same_ys = get_grid_coords([1, 2], np.array([3, 2]), (0.5, 0.25))
+    assert (same_xs is xs and same_ys is ys)
+
+    other_xs, _ = get_grid_coords(info['origin'], info['shape'], info['spacing'], offset=0.)
+    assert (other_xs is not xs)
+    assert (np.array_equal(other_xs, control_xs.ravel() - 0.25))
+
+    single_xs, _ = get_grid_coords(info['origin'], info['shape'], info['spacing'],
+        dtype=np.float32)
+    assert (single_xs.dtype == np.float32)
+
+
+def test_maps_of_series_share_coordinates():
+    xs, ys = get_grid_coords(info['origin'], info['shape'], info['spacing'])
+
+    with tmp.TemporaryDirectory() as tmpdir:
+        for ftype in ('gmx', 'simple'):
+            maps = []
+
+            for i in range(3):
+                data = {'X': xs, 'Y': ys}
+                for l in ('N', 'T', 'M', 'U', 'V'):
+                    data[l] = np.random.sample(6) + 1.
+
+                path = os.path.join(tmpdir, '%s%05d.dat' % (ftype, i + 1))
+                write(path, data, info, ftype=ftype)
+
+                read_data, _, _ = read_data_file(path)
+                maps.append(read_data)
+
+            for data in maps[1:]:
+                assert (data['X'] is maps[0]['X'])
+                assert (data['Y'] is maps[0]['Y'])
+
+            avg_data = average_data(*maps)
+            assert (avg_data['X'] is maps[0]['X'])
+            assert (np.allclose(avg_data['M'], np.mean([d['M'] for d in maps], axis=0)))
@@ -0,0 +1,157 @@
+import numpy as np
+import os
+import pytest
+import tempfile as tmp
+
+import strata.strata
+
+from strata.dataformats.interfaces import *
+from strata.dataformats.trajectory.write import write_frames
+from strata.dataformats.write import write
+from strata.interface.angle import interface_contact_angle
+from strata.interface.collect import collect_interfaces
+from strata.interface.sample import sample_interfaces
+from strata.interface.view import view_interfaces
+from strata.utils import find_datamap_files
+
+
+interfaces = [
+    (np.array([0., 0.5, 1.5, 2.]), np.array([0., 1., 1., 0.])),
+    (np.array([-1., 3.]), np.array([0., 0.])),
+    (np.array([-2., -1., 0., 4., 5., 6.]), np.array([0., 1., 2., 2., 1., 0.])),
+]
+
+
+def test_write_and_read_interfaces():
+    with tmp.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, 'interfaces.npz')
+        write_interfaces(path, interfaces, numbers=[3, 4, 5], header='# Header')
+
+        assert (is_interface_series(path))
+        assert (get_interface_series(path)[-1] == '# Header')
+
+        numbers, read = read_interfaces(path)
+        assert (numbers == [3, 4, 5])
+        for (xs, ys), (read_xs, read_ys) in zip(interfaces, read):
+            assert (np.array_equal(xs, read_xs))
+            assert (np.array_equal(ys, read_ys))
+
+        numbers, read = read_interfaces(path, begin=4, end=4)
+        assert (numbers == [4])
+        assert (np.array_equal(read[0][0], interfaces[1][0]))
+
+        paths = list(find_datamap_files(path, begin=4))
+        assert (paths == ['%s#%05d' % (path, n) for n in (4, 5)])
+
+        xs, ys = read_interface_coordinates(paths[-1])
+        assert (np.array_equal(xs, interfaces[2][0]))
+        assert (np.array_equal(ys, interfaces[2][1]))
+
+        with pytest.raises(FileNotFoundError):
+            read_interface_coordinates('%s#%05d' % (path, 1))
+
+
+def test_write_interfaces_bad_input():
+    with tmp.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, 'interfaces.npz')
+
+        with pytest.raises(ValueError):
+            write_interfaces(path, interfaces, numbers=[1, 2])
+
+        with pytest.raises(ValueError):
+            write_interfaces(path, [(np.arange(3.), np.arange(2.))])
+
+
+def test_is_interface_series():
+    with tmp.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, 'values.npz')
+        np.savez(path, values=np.arange(3))
+
+        assert (not is_interface_series(path))
+        assert (not is_interface_series(os.path.join(tmpdir, 'not_a_file.npz')))
+
+
+def test_interface_commands_read_series_as_text_files():
+    shape = (12, 6)
+    info = {'shape': shape, 'origin': (0., 0.), 'spacing': (1., 1.),
+        'num_bins': shape[0] * shape[1]}
+
+    x = np.arange(shape[0]) + 0.5
+    y = np.arange(shape[1]) + 0.5
+    xs, ys = np.meshgrid(x, y, indexing='ij')
+
+    with tmp.TemporaryDirectory() as tmpdir:
+        base = os.path.join(tmpdir, 'flow')
+
+        for i in range(3):
+            mass = np.zeros(shape)
+            mass[4 - i:8 + i, :4 - i] = 1.
+
+            data = {'X': xs.ravel(), 'Y': ys.ravel(), 'M': mass.ravel()}
+            for l in ('N', 'T', 'U', 'V'):
+                data[l] = np.zeros(mass.size)
+
+            write('%s%05d.dat' % (base, i + 1), data, info)
+
+        text_base = os.path.join(tmpdir, 'interface')
+        series_path = os.path.join(tmpdir, 'interfaces.npz')
+
+        for output in (text_base, series_path):
+            collect_interfaces(base, output, quiet=True)
+
+        text_files = list(find_datamap_files(text_base, ext='.xvg'))
+        assert (len(text_files) == 3)
+        assert (read_interfaces(series_path)[0] == [1, 2, 3])
+
+        for fn, (numbers, (xs, ys)) in zip(text_files,
+                zip(*read_interfaces(series_path))):
+            text_xs, text_ys = np.genfromtxt(fn, unpack=True)
+            assert (np.allclose(xs, text_xs, atol=1e-3))
+            assert (np.allclose(ys, text_ys, atol=1e-3))
+
+        kwargs = {'quiet': True, 'show': False}
+
+        for variable in ('area', 'length'):
+            text_times, text_samples = sample_interfaces(text_base, variable, **kwargs)
+            series_times, series_samples = sample_interfaces(series_path, variable, **kwargs)
+
+            assert (series_times == text_times)
+            assert (np.allclose(series_samples, text_samples, atol=1e-2))
+
+        text_angles = interface_contact_angle(text_base, height=1., **kwargs)[1]
+        series_angles = interface_contact_angle(series_path, height=1., **kwargs)[1]
+        assert (np.allclose(series_angles['measured'], text_angles['measured'], atol=1e-1))
+
+        # Per-frame text files can be exported from the series
+        export = os.path.join(tmpdir, 'export')
+        view_interfaces(series_path, save_xvg=export, **kwargs)
+
+        for fn, export_fn in zip(text_files, find_datamap_files(export, ext='.xvg')):
+            assert (np.allclose(np.genfromtxt(fn), np.genfromtxt(export_fn), atol=1e-3))
+
+
+def test_collect_interfaces_keeps_frame_numbers():
+    shape = (12, 6)
+    info = {'shape': shape, 'origin': (0., 0.), 'spacing': (1., 1.),
+        'num_bins': shape[0] * shape[1]}
+
+    x = np.arange(shape[0]) + 0.5
+    y = np.arange(shape[1]) + 0.5
+    xs, ys = np.meshgrid(x, y, indexing='ij')
+
+    mass = np.zeros(shape)
+    mass[4:8, :4] = 1.
+
+    data = {'X': xs.ravel(), 'Y': ys.ravel(), 'M': mass.ravel()}
+    for l in ('N', 'T', 'U', 'V'):
+        data[l] = np.zeros(mass.size)
+
+    with tmp.TemporaryDirectory() as tmpdir:
+        # Frames of a trajectory need not be consecutive
+        trajectory = os.path.join(tmpdir, 'traj.dat')
+        write_frames(trajectory, [(n, data, info) for n in (2, 5, 7)])
+
+        series_path = os.path.join(tmpdir, 'interfaces.npz')
+        collect_interfaces(trajectory, series_path, quiet=True)
+
+        assert (read_interfaces(series_path)[0] == [2, 5, 7])
@@ -1,6 +1,11 @@
 import numpy as np
+import os
+import pytest
+import tempfile as tmp
+
 import strata.dataformats as formats
 from strata.dataformats.read import *
+from strata.dataformats.write import write
 
 
 bin_filename = 'strata/dataformats/simple/tests/data_binsimple.dat'
@@ -42,3 +47,42 @@ def test_read_files_generator():
     for i, (_, info, _) in enumerate(read_from_files(*files)):
         pass
     assert (i == 1)
+
+def test_read_files_with_prefetch():
+    with tmp.TemporaryDirectory() as tmpdir:
+        files = []
+        for i in range(6):
+            data = {l: np.arange(4, dtype=np.float64) for l in ('X', 'Y')}
+            for l in ('N', 'T', 'M', 'U', 'V'):
+                data[l] = np.random.sample(4) + 1.
+
+            path = os.path.join(tmpdir, 'tmp%05d.dat' % i)
+            write(path, data, {'shape': (2, 2), 'origin': (0., 0.),
+                'spacing': (1., 1.), 'num_bins': 4})
+            files.append(path)
+
+        serial = list(read_from_files(*files))
+
+        for prefetch in (1, 2, 10):
+            prefetched = list(read_from_files(*files, prefetch=prefetch))
+            assert (len(prefetched) == len(files))
+
+            for (data, info, meta), (pdata, pinfo, pmeta) in zip(serial, prefetched):
+                assert (meta['path'] == pmeta['path'])
+                assert (info == pinfo)
+                for l in data.keys():
+                    assert (np.array_equal(data[l], pdata[l]))
+
+        # Reading can be stopped before all files have been read
+        for i, _ in enumerate(read_from_files(*files, prefetch=2)):
+            if i == 1:
+                break
+
+        # Errors are raised when the failing file is yielded
+        bad_files = files[:2] + [os.path.join(tmpdir, 'nofile.dat')]
+        reader = read_from_files(*bad_files, prefetch=2)
+        next(reader)
+        next(reader)
+
+        with pytest.raises(Exception):
+            next(reader)
@@ -0,0 +1,122 @@
+import numpy as np
+import os
+import pytest
+import tempfile as tmp
+
+import strata.strata
+
+from strata.dataformats.series import *
+from strata.dataformats.write import write
+from strata.sample_average import sample_average_files
+from strata.spreading.collect import collect, write_spreading
+from strata.spreading.view import read_spreading_data
+
+
+info = {'shape': (10, 2), 'origin': (0., 0.), 'spacing': (1., 1.), 'num_bins': 20}
+
+x = np.arange(10) + 0.5
+y = np.arange(2) + 0.5
+xs, ys = np.meshgrid(x, y, indexing='ij')
+
+num_maps = 4
+
+
+def write_maps(directory):
+    base = os.path.join(directory, 'flow')
+
+    for i in range(num_maps):
+        data = {'X': xs.ravel(), 'Y': ys.ravel()}
+
+        # A droplet which spreads by a bin on each side for every map
+        mass = np.zeros(info['shape'])
+        mass[4 - i:6 + i, :] = 1.
+        data['M'] = mass.ravel()
+
+        for l in ('N', 'T', 'U', 'V'):
+            data[l] = np.arange(20, dtype=np.float64) + i
+
+        write('%s%05d.dat' % (base, i + 1), data, info)
+
+    return base
+
+
+def test_write_and_read_series():
+    columns = {'time': np.arange(5.), 'value': np.arange(5) ** 2, 'b': [1, 2, 3, 4, 5]}
+
+    with tmp.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, 'series.npz')
+        write_series(path, columns, header='# A header\n')
+
+        assert (is_series_path(path))
+        assert (not is_series_path(os.path.join(tmpdir, 'series.xvg')))
+
+        read_columns, header = read_series(path)
+
+        assert (list(read_columns.keys()) == list(columns.keys()))
+        for l, values in columns.items():
+            assert (np.array_equal(read_columns[l], values))
+
+        assert (header == '# A header\n')
+
+
+def test_write_series_bad_columns():
+    with tmp.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, 'series.npz')
+
+        with pytest.raises(ValueError):
+            write_series(path, {'time': np.arange(5.), 'value': np.arange(4.)})
+
+        with pytest.raises(ValueError):
+            write_series(path, {HEADER_KEY: np.arange(5.)})
+
+
+def test_finish_series_keeps_text_header():
+    with tmp.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, 'series.npz')
+
+        with open(path, 'w') as fp:
+            fp.write('# Header\n# Time (ps) Value\n')
+
+        finish_series(path, {'time': [0., 1.], 'value': [2., 3.]})
+
+        columns, header = read_series(path)
+        assert (header == '# Header\n# Time (ps) Value\n')
+        assert (np.array_equal(columns['value'], [2., 3.]))
+
+
+def test_spreading_collect_series_output_as_text():
+    with tmp.TemporaryDirectory() as tmpdir:
+        base = write_maps(tmpdir)
+
+        for ext in ('.xvg', '.npz'):
+            write_spreading.impact = False
+            collect(base, save=os.path.join(tmpdir, 'spread%s' % ext), quiet=True)
+
+        text_data = read_spreading_data(os.path.join(tmpdir, 'spread.xvg'))
+        series_data = read_spreading_data(os.path.join(tmpdir, 'spread.npz'))
+
+        assert (len(series_data) == len(text_data) == 3)
+        for series, text in zip(series_data, text_data):
+            assert (np.allclose(series.index, text.index))
+            assert (np.allclose(series.values, text.values, atol=1e-3))
+
+        columns, header = read_series(os.path.join(tmpdir, 'spread.npz'))
+        assert (list(columns.keys()) == ['time', 'radius', 'left', 'right'])
+        assert (np.allclose(columns['radius'], [0.5, 1.5, 2.5, 3.5]))
+        assert ('# Droplet impact:' in header)
+
+
+def test_sample_average_series_output():
+    with tmp.TemporaryDirectory() as tmpdir:
+        base = write_maps(tmpdir)
+        output = os.path.join(tmpdir, 'sample.npz')
+
+        times, values = sample_average_files(base, ['T', 'M'], output=output,
+            dt=2., verbose=False, quiet=True)
+
+        columns, header = read_series(output)
+        assert (list(columns.keys()) == ['time', 'T', 'T_std', 'M', 'M_std'])
+        assert (np.array_equal(columns['time'], times))
+        assert (np.allclose(columns['T'], values[0]))
+        assert (np.allclose(columns['M'], values[1]))
+        assert ('Sample data labels' in header)
@@ -0,0 +1,143 @@
+import numpy as np
+import os
+import tempfile as tmp
+import threading
+
+from strata.average import average
+from strata.dataformats.read import is_stream_path, read_data_file, \
+        read_from_base, read_from_stream
+from strata.dataformats.write import write
+from strata.utils import find_datamap_files
+
+
+info = {'shape': (3, 2), 'origin': (1., 2.), 'spacing': (0.5, 0.25), 'num_bins': 6}
+
+x = 1. + 0.5 * (np.arange(3) + 0.5)
+y = 2. + 0.25 * (np.arange(2) + 0.5)
+xs, ys = np.meshgrid(x, y, indexing='ij')
+
+num_maps = 5
+
+
+def write_maps(directory):
+    files = []
+
+    for i in range(num_maps):
+        data = {'X': xs.ravel(), 'Y': ys.ravel()}
+        for l in ('N', 'T', 'M', 'U', 'V'):
+            data[l] = np.arange(6, dtype=np.float64) + i + 1.
+
+        path = os.path.join(directory, 'flow%05d.dat' % (i + 1))
+        write(path, data, info, ftype='gmx')
+        files.append(path)
+
+    return files
+
+
+def start_writer(fifo, files):
+    """Write the files back to back into a named pipe in a thread."""
+
+    def write_fifo():
+        with open(fifo, 'wb') as fp:
+            for fn in files:
+                with open(fn, 'rb') as fpin:
+                    fp.write(fpin.read())
+
+    thread = threading.Thread(target=write_fifo)
+    thread.start()
+
+    return thread
+
+
+def test_is_stream_path():
+    with tmp.TemporaryDirectory() as tmpdir:
+        files = write_maps(tmpdir)
+
+        fifo = os.path.join(tmpdir, 'fifo')
+        os.mkfifo(fifo)
+
+        assert (is_stream_path('-'))
+        assert (is_stream_path(fifo))
+        assert (not is_stream_path(files[0]))
+        assert (not is_stream_path(os.path.join(tmpdir, 'not_a_file')))
+
+
+def test_read_maps_from_fifo():
+    with tmp.TemporaryDirectory() as tmpdir:
+        files = write_maps(tmpdir)
+
+        fifo = os.path.join(tmpdir, 'fifo')
+        os.mkfifo(fifo)
+
+        for begin, end, kwargs in ((1, np.inf, {}), (2, 4, {'fields': ['M']}),
+                (1, np.inf, {'xlim': (1.5, None), 'ylim': (None, None)})):
+            thread = start_writer(fifo, files)
+            read_maps = list(read_from_stream(fifo, begin, end, **kwargs))
+            thread.join()
+
+            expected_files = files[begin - 1:min(end, num_maps)]
+            assert (len(read_maps) == len(expected_files))
+
+            for fn, (data, read_info, meta) in zip(expected_files, read_maps):
+                file_data, file_info, _ = read_data_file(fn, **kwargs)
+
+                assert (read_info == file_info)
+                assert (set(data.keys()) == set(file_data.keys()))
+                for l in data.keys():
+                    assert (np.array_equal(data[l], file_data[l]))
+
+            assert (read_maps[0][2]['path'] == '%s#%05d' % (fifo, begin))
+
+
+def test_read_from_base_with_files_or_stream():
+    with tmp.TemporaryDirectory() as tmpdir:
+        files = write_maps(tmpdir)
+        base = os.path.join(tmpdir, 'flow')
+
+        num_files, read_maps = read_from_base(base, begin=2, outext='.dat')
+        assert (num_files == num_maps - 1)
+        assert ([meta['path'] for _, _, meta in read_maps] == files[1:])
+
+        fifo = os.path.join(tmpdir, 'fifo')
+        os.mkfifo(fifo)
+
+        thread = start_writer(fifo, files)
+        num_files, read_maps = read_from_base(fifo, begin=2, mmap=True)
+        assert (num_files == None)
+        assert (len(list(read_maps)) == num_maps - 1)
+        thread.join()
+
+
+def test_average_stream_as_files():
+    with tmp.TemporaryDirectory() as tmpdir:
+        files = write_maps(tmpdir)
+        base = os.path.join(tmpdir, 'flow')
+
+        fifo = os.path.join(tmpdir, 'fifo')
+        os.mkfifo(fifo)
+
+        for rolling in (False, True):
+            file_output = os.path.join(tmpdir, 'files%d_' % rolling)
+            stream_output = os.path.join(tmpdir, 'stream%d_' % rolling)
+
+            average(base, file_output, group=2, rolling=rolling, quiet=True)
+
+            thread = start_writer(fifo, files)
+            average(fifo, stream_output, group=2, rolling=rolling, quiet=True)
+            thread.join()
+
+            file_averages = list(find_datamap_files(file_output))
+            stream_averages = list(find_datamap_files(stream_output))
+
+            assert (len(file_averages) == (4 if rolling else 2))
+            assert ([os.path.basename(fn)[len(os.path.basename(file_output)):]
+                    for fn in file_averages]
+                == [os.path.basename(fn)[len(os.path.basename(stream_output)):]
+                    for fn in stream_averages])
+
+            for fn_file, fn_stream in zip(file_averages, stream_averages):
+                file_data, _, _ = read_data_file(fn_file)
+                stream_data, _, _ = read_data_file(fn_stream)
+
+                for l in ('X', 'Y', 'N', 'M', 'T', 'U', 'V'):
+                    assert (np.allclose(stream_data[l], file_data[l]))
@@ -6,7 +6,7 @@ import tempfile as tmp
 from droplets.flow import FlowData
 import strata.dataformats as formats
 from strata.dataformats.read import guess_read_module
-from strata.dataformats.write import write, flowdata_to_dict
+from strata.dataformats.write import write, write_behind, flowdata_to_dict
 from strata.dataformats.simple.read import read_plainsimple, read_binsimple
 
 datasize = 4
@@ -55,3 +55,30 @@ def test_convert_flowdata():
     flow = FlowData(save_data)
     for key, array in flowdata_to_dict(flow).items():
         assert np.array_equal(array, save_data[key])
+
+def test_write_behind_writes_all_queued_data():
+    with tmp.TemporaryDirectory() as tmpdir:
+        paths = [os.path.join(tmpdir, 'sub', 'tmp%05d.dat' % i) for i in range(10)]
+
+        for writers in (0, 1, 3):
+            with write_behind(writers, max_queued=2) as write_data:
+                for path in paths:
+                    write_data(path, save_data, ftype='simple', _pp_verbose=False)
+
+            for path in paths:
+                data = read_binsimple(path)
+                for l in save_data.keys():
+                    assert (np.allclose(data[l], save_data[l]))
+
+def test_write_behind_raises_write_errors():
+    with tmp.TemporaryDirectory() as tmpdir:
+        good_path = os.path.join(tmpdir, 'good.dat')
+        bad_path = os.path.join(tmpdir, 'bad.dat')
+
+        with pytest.raises(KeyError):
+            with write_behind() as write_data:
+                write_data(good_path, save_data, info)
+                write_data(bad_path, save_data, ftype='bad_format')
+
+        # Writes queued before the error are finished
+        assert (guess_read_module(good_path) == default_module)
@@ -0,0 +1,5 @@
+from strata.dataformats.simple.average import average_data, combine_bins
+from strata.dataformats.trajectory.read import read_data, read_info
+from strata.dataformats.trajectory.write import write_data
+
+"""Main functionality of this module is called from here."""
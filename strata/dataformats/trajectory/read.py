@@ -0,0 +1,221 @@
+import functools
+import numpy as np
+import os
+
+from strata.dataformats.compressed import get_compression
+from strata.dataformats.gmx_flow_version_1.read import \
+    get_grid_data, get_sparse_data, get_window_data, map_values, \
+    read_header, read_values, select_fields
+
+"""Read frames from a trajectory file of many flow maps.
+
+A trajectory file stores a series of flow maps, or frames, which share
+their grid geometry. The header is of the same form as that of the
+GMX_FLOW_1 format but without a 'NUMDATA' line. After it follows the
+data of every frame stored in the GMX_FLOW_1 way, with only non-empty
+bins. A table of the frames ends the file, with the frame number, offset
+of its data and number of stored bins for every frame as 64-bit unsigned
+integers. Finally the offset of the table and the number of frames are
+written as 64-bit unsigned integers.
+
+Frames are referred to by paths of the trajectory path and frame number
+joined by a separator ('%s#%05d'), which can be read like any other data
+map path. The table is read once per file, after which any frame can
+be read directly.
+
+"""
+
+FORMAT = b"FORMAT STRATA_TRAJECTORY_1"
+
+FRAME_SEPARATOR = '#'
+
+
+def read_data(filename, mmap=False, sparse=False, fields=None,
+        xlim=None, ylim=None):
+    """Read field data of a frame from a trajectory.
+
+    Args:
+        filename (str): A frame path to read data from. If the path is
+            to the trajectory file itself the first frame is read.
+
+    Keyword Args:
+        mmap (bool, default=False): Memory map the data of the frame
+            instead of reading it into memory. The fields of the full
+            grid are then expanded when they are first accessed.
+
+        sparse (bool, default=False): Return only the non-empty bins of
+            the frame along with their bin indices 'IX' and 'IY'.
+
+        fields (list, optional): Read only these fields, along with the
+            coordinates.
+
+        xlim, ylim (2-tuples, optional): Return only the bins with center
+            coordinates inside these limits.
+
+    Returns:
+        (dict, dict): 2-tuple of dict's with data and information. See
+            strata.dataformats.read.read_data_file for more information.
+
+    Raises:
+        KeyError: If the frame does not exist in the trajectory.
+
+    """
+
+    path, number = split_frame_path(filename)
+    stored_fields, info, frames = read_frame_table(path)
+    selected = select_fields(stored_fields, fields)
+    offset, num_values = get_frame(frames, number, path)
+
+    with open(path, 'rb') as fp:
+        fp.seek(offset)
+
+        if mmap:
+            data = map_values(fp, num_values, stored_fields, selected)
+        else:
+            data = read_values(fp, num_values, stored_fields, selected)
+
+    if xlim != None or ylim != None:
+        data, info = get_window_data(data, info, xlim, ylim)
+
+    if sparse:
+        return get_sparse_data(data, info), info
+
+    return get_grid_data(data, info, lazy=mmap), info
+
+
+def read_info(filename):
+    """Return the grid information and number of stored bins of a frame.
+
+    Only the frame table of the trajectory is read.
+
+    Args:
+        filename (str): A frame path to read information of.
+
+    Returns:
+        (dict, int): 2-tuple with the information and number of stored bins.
+
+    Raises:
+        KeyError: If the frame does not exist in the trajectory.
+
+    """
+
+    path, number = split_frame_path(filename)
+    _, info, frames = read_frame_table(path)
+    _, num_values = get_frame(frames, number, path)
+
+    return info, num_values
+
+
+def get_frame(frames, number, path):
+    """Return the offset and number of stored bins of a frame.
+
+    The first frame is returned if the number is None.
+
+    """
+
+    if number == None:
+        number = min(frames.keys())
+
+    try:
+        return frames[number]
+    except KeyError:
+        raise KeyError("no frame with number %r in trajectory %r" % (number, path))
+
+
+def read_frame_table(path):
+    """Return the fields, information and frame table of a trajectory.
+
+    The frame table is a dict with frame numbers as keys and the offset
+    and number of stored bins of the frames as values. Tables are cached
+    for files which have not been changed since they were last read.
+
+    Args:
+        path (str): Path to a trajectory file.
+
+    Returns:
+        (list, dict, dict): 3-tuple with the field labels, information
+            and frame table of the trajectory.
+
+    Raises:
+        ValueError: If the trajectory file is compressed, since its frames
+            are read from their positions in the file.
+
+    """
+
+    if get_compression(path) != None:
+        raise ValueError("can not read frames of compressed trajectory %r, "
+            "decompress it first" % path)
+
+    stat = os.stat(path)
+    fields, info, frames = _read_frame_table(
+        os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+
+    return fields, info.copy(), frames
+
+
+@functools.lru_cache(maxsize=16)
+def _read_frame_table(path, size, mtime):
+    with open(path, 'rb') as fp:
+        fields, _, info = read_header(fp)
+
+        fp.seek(-16, os.SEEK_END)
+        table_offset, num_frames = (int(v) for v in
+            np.fromfile(fp, dtype=np.uint64, count=2))
+
+        fp.seek(table_offset)
+        table = np.fromfile(fp, dtype=np.uint64, count=3*num_frames)
+
+    frames = {
+        int(number): (int(offset), int(num_values))
+        for number, offset, num_values in table.reshape(-1, 3)
+    }
+
+    return fields, info, frames
+
+
+def is_trajectory(path):
+    """Return whether the input path is to a trajectory file."""
+
+    try:
+        with open(path, 'rb') as fp:
+            return fp.read(len(FORMAT)) == FORMAT
+    except (OSError, TypeError):
+        return False
+
+
+def split_frame_path(filename):
+    """Return the trajectory path and frame number of a frame path.
+
+    The frame number is None if the input is not a frame path.
+
+    """
+
+    path, sep, number = filename.rpartition(FRAME_SEPARATOR)
+
+    if sep == '' or not number.isdigit() or os.path.exists(filename):
+        return filename, None
+
+    return path, int(number)
+
+
+def gen_frame_paths(path, begin=1, end=np.inf):
+    """Generate paths to the frames of a trajectory in order.
+
+    Args:
+        path (str): Path to a trajectory file.
+
+    Keyword Args:
+        begin (int, default=1): First frame number.
+
+        end (int, default=inf): Final frame number.
+
+    Yields:
+        str: Frame paths.
+
+    """
+
+    _, _, frames = read_frame_table(path)
+
+    for number in sorted(frames.keys()):
+        if begin <= number <= end:
+            yield '%s%s%05d' % (path, FRAME_SEPARATOR, number)
@@ -0,0 +1,144 @@
+import numpy as np
+import os
+import pytest
+import tempfile as tmp
+
+from strata.dataformats.read import read_data_file, guess_read_module
+from strata.dataformats.trajectory.read import read_data, read_frame_table, \
+    gen_frame_paths, is_trajectory, split_frame_path
+from strata.dataformats.trajectory.write import write_frames
+from strata.utils import find_datamap_files
+import strata.dataformats.trajectory.main as trajectory
+
+tmpfn = 'traj.dat'
+fields = ('N', 'T', 'M', 'U', 'V')
+
+info = {'shape': (3, 2), 'origin': (0., 0.), 'spacing': (1., 1.), 'num_bins': 6}
+
+x = np.arange(3) + 0.5
+y = np.arange(2) + 0.5
+xs, ys = np.meshgrid(x, y, indexing='ij')
+
+def gen_data():
+    data = {'X': xs.ravel(), 'Y': ys.ravel()}
+    for l in fields:
+        data[l] = np.random.sample(6).astype(np.float32)
+
+    # Empty bins are not stored and are read as zeros
+    inds = np.random.choice(6, 2, replace=False)
+    for l in fields:
+        data[l][inds] = 0.
+
+    return data
+
+numbers = [3, 4, 5, 6]
+save_data = [gen_data() for _ in numbers]
+
+
+def write_trajectory(path):
+    frames = [(n, data, info) for n, data in zip(numbers, save_data)]
+    return write_frames(path, frames)
+
+
+def test_write_and_read_frames():
+    with tmp.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, tmpfn)
+        assert (write_trajectory(path) == len(numbers))
+        assert (is_trajectory(path))
+
+        fields_read, read_info, frames = read_frame_table(path)
+        assert (read_info == info)
+        assert (sorted(frames.keys()) == numbers)
+
+        # Read the frames in reverse to ensure random access
+        for n, data in reversed(list(zip(numbers, save_data))):
+            for mmap in (False, True):
+                frame_data, frame_info = read_data('%s#%05d' % (path, n), mmap=mmap)
+                assert (frame_info == info)
+
+                for l in ('X', 'Y') + fields:
+                    assert (np.allclose(frame_data[l], data[l]))
+
+
+def test_read_sparse_frame():
+    with tmp.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, tmpfn)
+        write_trajectory(path)
+
+        data, _ = read_data('%s#%05d' % (path, numbers[1]), sparse=True)
+        inds = save_data[1]['M'] != 0.
+
+        assert (data['IX'].size == np.sum(inds))
+        for l in ('X', 'Y') + fields:
+            assert (np.allclose(data[l], save_data[1][l][inds]))
+
+
+def test_read_trajectory_path_reads_first_frame():
+    with tmp.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, tmpfn)
+        write_trajectory(path)
+
+        data, _ = read_data(path)
+        assert (np.allclose(data['M'], save_data[0]['M']))
+
+
+def test_read_missing_frame_raises_error():
+    with tmp.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, tmpfn)
+        write_trajectory(path)
+
+        with pytest.raises(KeyError):
+            read_data('%s#%05d' % (path, 1))
+
+
+def test_write_frames_with_different_grids_raises_error():
+    other_info = info.copy()
+    other_info['spacing'] = (2., 1.)
+
+    frames = [(1, save_data[0], info), (2, save_data[1], other_info)]
+
+    with tmp.TemporaryDirectory() as tmpdir:
+        with pytest.raises(ValueError):
+            write_frames(os.path.join(tmpdir, tmpfn), frames)
+
+
+def test_split_frame_path():
+    assert (split_frame_path('traj.dat#00012') == ('traj.dat', 12))
+    assert (split_frame_path('traj.dat') == ('traj.dat', None))
+    assert (split_frame_path('traj.dat#last') == ('traj.dat#last', None))
+
+
+def test_frames_are_found_and_read_as_data_maps():
+    with tmp.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, tmpfn)
+        write_trajectory(path)
+
+        frames = list(find_datamap_files(path, begin=4, end=5))
+        assert (frames == list(gen_frame_paths(path, 4, 5)))
+        assert (frames == ['%s#%05d' % (path, n) for n in (4, 5)])
+
+        groups = list(find_datamap_files(path, begin=3, group=2))
+        assert (len(groups) == 2)
+        assert (groups[1] == ['%s#%05d' % (path, n) for n in (5, 6)])
+
+        for i, frame in enumerate(frames):
+            assert (guess_read_module(frame) == trajectory)
+
+            data, _, meta = read_data_file(frame)
+            assert (meta['module'] == trajectory)
+            assert (np.allclose(data['U'], save_data[i+1]['U']))
+
+
+def test_read_frame_info_from_table():
+    with tmp.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, tmpfn)
+        write_trajectory(path)
+
+        for n, data in zip(numbers, save_data):
+            frame_info, num_values = trajectory.read_info('%s#%05d' % (path, n))
+
+            assert (frame_info == info)
+            assert (num_values == np.sum(data['M'] != 0.))
+
+        with pytest.raises(KeyError):
+            trajectory.read_info('%s#%05d' % (path, 100))
@@ -0,0 +1,117 @@
+import numpy as np
+
+from strata.dataformats.gmx_flow_version_1.write import \
+    FIELDS_ORDERED, get_output_data
+from strata.utils import prepare_path
+
+"""Write frames of flow maps to a trajectory file.
+
+See strata.dataformats.trajectory.read for a description of the format.
+
+"""
+
+@prepare_path
+def write_frames(path, frames, check_label='M'):
+    """Write a series of frames to a trajectory file.
+
+    The frames must have the same grid geometry, which is stored once
+    for the trajectory. Only the non-empty bins of each frame are written.
+
+    Args:
+        path (str): Write to a file at this path.
+
+        frames (iterable): Frames as 3-tuples of the frame number and
+            the data and information of the map. See
+            strata.dataformats.read.read_data_file for these. Sparse
+            data with bin indices 'IX' and 'IY' is written directly.
+
+    Keyword Args:
+        check_label (str): Label in dict which must be non-zero for a bin.
+
+    Returns:
+        int: Number of written frames.
+
+    Raises:
+        ValueError: If the grid of a frame differs from that of the first
+            or if a frame number is repeated.
+
+    """
+
+    def assert_grid_matches(info, first_info, number):
+        try:
+            assert tuple(info['shape']) == tuple(first_info['shape'])
+            for key in ('spacing', 'origin'):
+                assert np.allclose(info[key], first_info[key])
+        except AssertionError:
+            raise ValueError("grid of frame %d does not match the trajectory" % number)
+
+    table = []
+    numbers = set()
+    first_info = None
+
+    with open(path, 'wb') as fp:
+        for number, data, info in frames:
+            if first_info == None:
+                first_info = info
+                write_header(fp, info['shape'], info['spacing'], info['origin'])
+            else:
+                assert_grid_matches(info, first_info, number)
+
+            if number in numbers:
+                raise ValueError("frame number %d is repeated" % number)
+            numbers.add(number)
+
+            output_data, num_elements = get_output_data(data, info, check_label)
+            table.append((number, fp.tell(), num_elements))
+
+            for vs in output_data:
+                vs.tofile(fp)
+
+        if first_info == None:
+            raise ValueError("no frames to write to the trajectory")
+
+        table_offset = fp.tell()
+        np.array(table, dtype=np.uint64).tofile(fp)
+        np.array([table_offset, len(table)], dtype=np.uint64).tofile(fp)
+
+    return len(table)
+
+
+def write_data(path, data, info, check_label='M'):
+    """Write data to disk as a trajectory with a single frame.
+
+    Args:
+        path (str): Write to a file at this path.
+
+        data (dict): Data to write.
+
+        info (dict): Information about the data.
+
+    Keyword args:
+        check_label (str): Label in dict which must be non-zero for a bin.
+
+    """
+
+    write_frames(path, [(1, data, info)], check_label=check_label)
+
+
+def write_header(fp, shape, spacing, origin):
+    fp.write("FORMAT STRATA_TRAJECTORY_1\n".encode())
+    fp.write("ORIGIN {:12f} {:12f}\n".format(origin[0], origin[1]).encode())
+    fp.write("SHAPE {} {}\n".format(shape[0], shape[1]).encode())
+    fp.write("SPACING {:12f} {:12f}\n".format(spacing[0], spacing[1]).encode())
+
+    fp.write("FIELDS IX IY".encode())
+    for l in FIELDS_ORDERED:
+        fp.write(" {}".format(l).encode())
+    fp.write("\n".encode())
+
+    fp.write("COMMENT Series of frames on a common regular grid\n".encode())
+    fp.write("COMMENT Each frame is stored like the data of a GMX_FLOW_1 file, "
+             "with only non-empty bins\n".encode())
+    fp.write("COMMENT The file ends with a table of 64-bit unsigned integers: "
+             "frame number, data offset and number of bins for every frame\n".encode())
+    fp.write("COMMENT The final two 64-bit unsigned integers are the table offset "
+             "and number of frames\n".encode())
+
+    fp.write(b"\0")
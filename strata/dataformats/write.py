@@ -1,5 +1,9 @@
 import strata.dataformats as formats
 
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
 """Module for outputting data."""
 
 # Set module handles for ftype
@@ -8,7 +12,9 @@ modules = {
         'default': default_module,
         'gmx': formats.gmx_flow_version_1.main,
         'simple': formats.simple.main,
-        'simple_plain': formats.simple.main
+        'simple_v2': formats.simple.main,
+        'simple_plain': formats.simple.main,
+        'trajectory': formats.trajectory.main
         }
 
 def write(path, data, *args, **kwargs):
@@ -26,10 +32,15 @@ def write(path, data, *args, **kwargs):
         data (dict): Data to write.
 
     Keyword Args:
+        compression (str, optional): Compress 'gmx' files with this
+            compressor. See strata.dataformats.gmx_flow_version_1.write.
+
         ftype (str, default='gmx'): File type to write. Choices:
             'gmx'          - Gromacs flow format (strata.dataformats.gmx_flow_version_1)
             'simple'       - Simple binary    (strata.dataformats.simple)
+            'simple_v2'    - Simple binary with a header (strata.dataformats.simple)
             'simple_plain' - Simple plaintext (strata.dataformats.simple)
+            'trajectory'   - Single frame trajectory (strata.dataformats.trajectory)
 
     Raises:
         KeyError: If a non-existant 'ftype' is specified.
@@ -39,10 +50,13 @@ def write(path, data, *args, **kwargs):
     def write_simple(ftype):
         if ftype == 'simple_plain':
             kwargs.update({'binary': False})
+        elif ftype == 'simple_v2':
+            kwargs.update({'version': 2})
 
         modules[ftype].write_data(path, data, **kwargs)
 
     ftype = kwargs.pop('ftype', 'default')
+    compression = kwargs.pop('compression', None)
 
     try:
         assert (ftype in modules.keys())
@@ -50,11 +64,68 @@ def write(path, data, *args, **kwargs):
         raise KeyError("specified 'ftype' not existing for writing.")
     
     if ftype in ['gmx', 'default']:
+        modules[ftype].write_data(path, data, *args, compression=compression)
+    elif ftype == 'trajectory':
         modules[ftype].write_data(path, data, *args)
     else:
         write_simple(ftype)
 
 
+@contextmanager
+def write_behind(writers=1, max_queued=None):
+    """Write data in background threads while the caller continues.
+
+    Yields a function with the same arguments as `write`, which queues
+    the data to be written by a pool of writer threads. The threads
+    prepare the paths and serialise the data, so that the caller does
+    not wait for writes to the disk. The data must not be modified
+    after it has been queued.
+
+    The queue is bounded: if `max_queued` writes are pending the function
+    waits for the oldest to finish. Errors from writing are raised by the
+    function or when leaving the context, in the order that the writes
+    were queued. All queued writes are finished when leaving the context.
+
+    Example:
+        with write_behind() as write_data:
+            for path, data in outputs:
+                write_data(path, data, info)
+
+    Keyword Args:
+        writers (int, default=1): Number of writer threads. With 0 threads
+            the yielded function is `write` and data is written directly.
+
+        max_queued (int, default=2*writers): Maximum number of pending writes.
+
+    Yields:
+        function: Queue data to be written, see `write`.
+
+    """
+
+    def raise_finished(num_pending):
+        while queue and (len(queue) > num_pending or queue[0].done()):
+            queue.popleft().result()
+
+    if writers < 1:
+        yield write
+        return
+
+    if max_queued == None:
+        max_queued = 2 * writers
+
+    queue = deque()
+
+    with ThreadPoolExecutor(max_workers=writers) as executor:
+        def queue_write(path, data, *args, **kwargs):
+            raise_finished(max(max_queued - 1, 0))
+            queue.append(executor.submit(write, path, data, *args, **kwargs))
+
+        # If the caller fails the pending writes are still finished
+        # when the pool is shut down, but their errors are not raised
+        yield queue_write
+        raise_finished(0)
+
+
 def flowdata_to_dict(flow):
     """Convert a FlowData object to write-compatible dictionary.
 
@@ -66,4 +137,4 @@ def flowdata_to_dict(flow):
 
     """
 
-    return {key: flow.data[key] for key in flow.data.dtype.names}
+    return dict(flow.fields)
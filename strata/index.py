@@ -0,0 +1,71 @@
+from strata.dataformats.catalogue import catalogue_files, check_geometry, \
+    get_catalogue_path
+from strata.utils import find_datamap_files, pop_fileopts
+
+
+def index_files(base, catalogue=None, **kwargs):
+    """Catalogue the header information of data maps at a base path.
+
+    The grid geometry and number of stored bins of every file is read from
+    its header and kept in a sidecar catalogue. Files which are unchanged
+    since they were catalogued are not read again. A summary of the series
+    is printed, including whether all files share their grid geometry.
+
+    See `strata.dataformats.catalogue` for the catalogue.
+
+    Args:
+        base (str): Base path to input files.
+
+    Keyword Args:
+        catalogue (str, optional): Path to the catalogue file. By default
+            a sidecar file is used at the base path.
+
+        begin (int, default=1): First data map number.
+
+        end (int, default=inf): Final data map number.
+
+        ext (str, default='.dat'): File extension.
+
+        quiet (bool, default=False): Do not print the summary.
+
+    Returns:
+        dict: Catalogue entries of the files with their paths as keys.
+
+    """
+
+    fopts = pop_fileopts(kwargs)
+    quiet = kwargs.pop('quiet', False)
+
+    if catalogue == None:
+        catalogue = get_catalogue_path(base)
+
+    files = list(find_datamap_files(base, **fopts))
+    entries, num_read = catalogue_files(files, catalogue)
+
+    if not quiet:
+        print_summary(entries, num_read, catalogue)
+
+    return entries
+
+
+def print_summary(entries, num_read, catalogue):
+    """Print a summary of catalogued files."""
+
+    print("Catalogued %d files in '%s' (%d headers read)."
+        % (len(entries), catalogue, num_read))
+
+    if len(entries) == 0:
+        return
+
+    try:
+        geometry = check_geometry(entries)
+        print("Grid: shape %r, spacing %r, origin %r"
+            % tuple(geometry[key] for key in ('shape', 'spacing', 'origin')))
+    except ValueError as err:
+        print("[WARNING] Grids are not consistent: %s." % err)
+
+    num_values = [entry['num_values'] for entry in entries.values()
+        if entry['num_values'] != None]
+
+    if num_values != []:
+        print("Stored bins: %d to %d per file" % (min(num_values), max(num_values)))
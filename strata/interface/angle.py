@@ -2,6 +2,7 @@ import numpy as np
 import os
 import progressbar as pbar
 
+from strata.dataformats.interfaces import read_interface_coordinates
 from strata.utils import find_datamap_files, pop_fileopts, prepare_path, decorate_graph
 
 
@@ -22,7 +23,9 @@ def interface_contact_angle(base, fit=False, height=None, delta_t=1., save_xvg=N
     Input files are plaintext files of Grace format, with two columns
     representing x and y coordinates of the interface, connected from
     the bottom left edge, over the droplet and ending at the bottom right
-    edge. Positions should be in units of nanometer.
+    edge. Positions should be in units of nanometer. The base can also be
+    an interface series file with all interfaces, see
+    `strata.dataformats.interfaces`.
 
     Args:
         base (str): Base path to input files.
@@ -192,7 +195,7 @@ def write_angle_data(path, base, height, times, angles, **kwargs):
 def read_interface_file(fn):
     """Return the left and right interfaces read from a file."""
 
-    xs, ys = np.genfromtxt(fn, unpack=True)
+    xs, ys = read_interface_coordinates(fn)
 
     length = int(len(xs)/2)
     base = np.zeros(length, dtype=[('X', 'float'), ('Y', 'float')])
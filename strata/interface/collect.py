@@ -5,12 +5,15 @@ import progressbar as pbar
 
 from collections import namedtuple
 
-from droplets.flow import FlowData
+from droplets.flow import FlowData, RegularGridFlowData, get_float_dtype
 from droplets.interface import get_interface
-from strata.dataformats.read import read_data_file
+from strata.dataformats.interfaces import write_interfaces
+from strata.dataformats.read import read_from_files
+from strata.dataformats.series import is_series_path
 from strata.spreading.collect import init_periodic_info, \
     check_and_update_periodic_info, add_pbc_multipliers_to_edges, PeriodicInfo
-from strata.utils import find_singles_to_singles, pop_fileopts, prepare_path
+from strata.utils import find_singles_to_singles, get_datamap_number, \
+    pop_fileopts, prepare_path
 
 
 def collect_interfaces(base, output, recenter=None, **kwargs):
@@ -19,12 +22,21 @@ def collect_interfaces(base, output, recenter=None, **kwargs):
     Args:
         base (str): Base path to input files.
 
-        output (str): Base path to output interface files.
+        output (str): Base path to output interface files. If the path
+            has the extension '.npz' all interfaces are instead written
+            to a single interface series file at the path, see
+            `strata.dataformats.interfaces`.
 
     Keyword Args:
         recenter (str, optional): Recenter the interface around 'zero',
             the center of mass 'com'.
 
+        sparse (bool, default=False): Read and search only non-empty bins.
+            Maps which are read in full are searched as regular grids.
+
+        prefetch (int, default=0): Number of files to read ahead in the
+            background.
+
         begin (int, default=1): First data map number.
 
         end (int, default=inf): Final data map number.
@@ -37,6 +49,17 @@ def collect_interfaces(base, output, recenter=None, **kwargs):
 
     """
 
+    def get_flow(data, info):
+        flow = FlowData(data, info=info)
+
+        if not sparse:
+            try:
+                flow = RegularGridFlowData.from_flow(flow)
+            except ValueError:
+                pass
+
+        return flow
+
     # Set some default options
     kwargs.setdefault('cutoff', None)
     kwargs.setdefault('cutoff_radius', None)
@@ -47,9 +70,17 @@ def collect_interfaces(base, output, recenter=None, **kwargs):
 
     label = 'M'
     quiet = kwargs.pop('quiet', False)
+    sparse = kwargs.pop('sparse', False)
+    prefetch = kwargs.pop('prefetch', 0)
 
     files = list(find_singles_to_singles(base, output, **fopts))
 
+    # Interfaces are kept with their map numbers to write them all at once
+    # to a series file
+    write_series = is_series_path(output)
+    interfaces = []
+    numbers = []
+
     pbc_info_per_y = None
     yindex_data = None
 
@@ -59,14 +90,20 @@ def collect_interfaces(base, output, recenter=None, **kwargs):
         progress = pbar.ProgressBar(widgets=widgets, max_value=len(files))
         progress.start()
 
-    for i, (fn, fnout) in enumerate(files):
-        data, info, _ = read_data_file(fn)
-        flow = FlowData(data, info=info)
+    read_files = read_from_files(*[fn for fn, _ in files], sparse=sparse,
+        fields=[label], prefetch=prefetch)
+
+    for i, ((data, info, _), (fn, fnout)) in enumerate(zip(read_files, files)):
+        flow = get_flow(data, info)
         interface, pbc_info_per_y, yindex_data = get_interface_coordinates(
             flow, label, pbc_info_per_y, yindex_data, recenter, **kwargs
         )
 
-        write_interface_data(fnout, interface, [fnout], kwargs, recenter)
+        if write_series:
+            interfaces.append((interface['X'], interface['Y']))
+            numbers.append(get_datamap_number(fn, base, fopts['ext']))
+        else:
+            write_interface_data(fnout, interface, [fnout], kwargs, recenter)
 
         if not quiet:
             progress.update(i + 1)
@@ -74,6 +111,10 @@ def collect_interfaces(base, output, recenter=None, **kwargs):
     if not quiet:
         progress.finish()
 
+    if write_series:
+        write_interface_series(output, interfaces, numbers,
+            [fn for fn, _ in files], kwargs, recenter)
+
 
 def get_interface_coordinates(flow, label, pbc_info_per_y, yindex_data,
         recenter=None, **kwargs):
@@ -110,9 +151,9 @@ def get_interface_coordinates(flow, label, pbc_info_per_y, yindex_data,
         get_interface(flow, label, search_longest_connected=True, **kwargs)
     )).T
 
-    ys = flow.data[yl][left]
-    xs_left = flow.data[xl][left]
-    xs_right = flow.data[xl][right]
+    ys = flow.fields[yl][left]
+    xs_left = flow.fields[xl][left]
+    xs_right = flow.fields[xl][right]
 
     box_x, _ = flow.size()
 
@@ -128,7 +169,7 @@ def get_interface_coordinates(flow, label, pbc_info_per_y, yindex_data,
     if recenter == 'zero':
         xs -= np.mean([xs[0], xs[-1]])
     elif recenter == 'com':
-        xs -= np.average(flow.data[xl], weights=flow.data[label])
+        xs -= np.average(flow.fields[xl], weights=flow.fields[label])
 
     return interface, pbc_info_per_y, yindex_data
 
@@ -225,7 +266,7 @@ def create_interface_array(ys, xs_left, xs_right):
     """Merge the left and right interface edges at the top."""
 
     interface = np.zeros(
-        (2 * ys.size, ), dtype=[('Y', np.float), ('X', np.float)]
+        (2 * ys.size, ), dtype=[('Y', get_float_dtype()), ('X', get_float_dtype())]
     )
 
     interface['Y'][:ys.size] = ys
@@ -320,50 +361,75 @@ def write_interface_data(path, interface, fngroup, kwargs, recenter=None):
 
     """
 
-    def get_header(path, fngroup):
-        from strata.strata import version
-        import time
+    header = get_interface_header(fngroup, kwargs, recenter)
+    data = np.array([interface['X'], interface['Y']]).T
+    np.savetxt(path, data, fmt='%.3f', delimiter=' ',
+            header=header, comments='')
+
+
+@prepare_path
+def write_interface_series(path, interfaces, numbers, fngroup, kwargs, recenter=None):
+    """Write all collected interfaces to an interface series file at path.
+
+    Args:
+        path (str): Path to output file.
 
-        time_str = time.strftime('%c', time.localtime())
+        interfaces (list): List of 2-tuples with x and y coordinates for
+            each interface.
 
-        header = (
-                "# Interface coordinates of a droplet\n"
+        numbers (list): Number of each interface.
+
+        fngroup (list): List of data files read from.
+
+    See `strata.dataformats.interfaces` for the file format.
+
+    """
+
+    header = get_interface_header(fngroup, kwargs, recenter)
+    write_interfaces(path, interfaces, numbers, header)
+
+
+def get_interface_header(fngroup, kwargs, recenter=None):
+    """Return the header of interface files with the input files and options."""
+
+    from strata.strata import version
+    import time
+
+    time_str = time.strftime('%c', time.localtime())
+
+    header = (
+            "# Interface coordinates of a droplet\n"
+            "# \n"
+            "# Created by module: %s\n"
+            "# Creation date: %s\n"
+            "# Using module version: %s\n"
+            "# \n"
+            % (__name__, time_str, version))
+
+    inputs = (
+            "# Working directory: '%s'\n"
+            "# Input files:\n"
+            ) % os.path.abspath(os.curdir)
+    for name in fngroup:
+        inputs += "#   '%s'\n" % name
+    inputs += "# \n"
+
+    try:
+        inputs += (
+                "# Input options:\n"
+                "#   Recenter: %r\n"
+                "#   Mass cut-off: %r\n"
+                "#   Radius cut-off: %r\n"
+                "#   Required # of bins: %r\n"
                 "# \n"
-                "# Created by module: %s\n"
-                "# Creation date: %s\n"
-                "# Using module version: %s\n"
+                ) % (recenter, kwargs['cutoff'],
+                        kwargs['cutoff_radius'], kwargs['cutoff_bins'])
+    except KeyError:
+        inputs += (
+                "# Input options: See original files.\n"
                 "# \n"
-                % (__name__, time_str, version))
-
-        inputs = (
-                "# Working directory: '%s'\n"
-                "# Input files:\n"
-                ) % os.path.abspath(os.curdir)
-        for name in fngroup:
-            inputs += "#   '%s'\n" % name
-        inputs += "# \n"
-
-        try:
-            inputs += (
-                    "# Input options:\n"
-                    "#   Recenter: %r\n"
-                    "#   Mass cut-off: %r\n"
-                    "#   Radius cut-off: %r\n"
-                    "#   Required # of bins: %r\n"
-                    "# \n"
-                    ) % (recenter, kwargs['cutoff'],
-                            kwargs['cutoff_radius'], kwargs['cutoff_bins'])
-        except KeyError:
-            inputs += (
-                    "# Input options: See original files.\n"
-                    "# \n"
-                    )
-
-        inputs += "# x (nm) y (nm)"
-
-        return header + inputs
-
-    header = get_header(path, fngroup)
-    data = np.array([interface['X'], interface['Y']]).T
-    np.savetxt(path, data, fmt='%.3f', delimiter=' ',
-            header=header, comments='')
+                )
+
+    inputs += "# x (nm) y (nm)"
+
+    return header + inputs
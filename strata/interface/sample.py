@@ -2,6 +2,7 @@ import numpy as np
 import os
 import progressbar as pbar
 
+from strata.dataformats.series import finish_series, is_series_path
 from strata.interface.view import read_interface_file
 from strata.utils import find_datamap_files, pop_fileopts, prepare_path, decorate_graph, write_module_header
 
@@ -12,12 +13,15 @@ def sample_interfaces(base, variable, save_xvg='', delta_t=1., **kwargs):
     the interface.
 
     Args:
-        base (str): Base path to input interfaces.
+        base (str): Base path to input interfaces, or path to an interface
+            series file (see `strata.dataformats.interfaces`).
 
         variable (str): Sample either 'area' or 'length'.
 
     Keyword Args:
         save_xvg (str, optional): Write integrated areas to an output file.
+            Paths with the extension '.npz' are written as a binary series
+            file, see `strata.dataformats.series`.
 
         delta_t (float, optional): Time difference between input interfaces.
 
@@ -74,7 +78,7 @@ def sample_interfaces(base, variable, save_xvg='', delta_t=1., **kwargs):
             collected_samples.append(sample)
             times.append(i*delta_t)
 
-            if save_xvg:
+            if save_xvg and not is_series_path(save_xvg):
                 with open(save_xvg, 'a') as fp:
                     fp.write("%.3f %.3f\n" % (i*delta_t, sample))
 
@@ -84,6 +88,9 @@ def sample_interfaces(base, variable, save_xvg='', delta_t=1., **kwargs):
     if not quiet:
             progress.finish()
 
+    if save_xvg and is_series_path(save_xvg):
+        finish_series(save_xvg, {'time': times, variable: collected_samples})
+
     plot_interface_area(collected_samples, times, **kwargs)
 
     return times, collected_samples
@@ -3,6 +3,7 @@ import os
 import pandas as pd
 import progressbar as pbar
 
+from strata.dataformats.interfaces import read_interface_coordinates
 from strata.interface.collect import write_interface_data
 from strata.utils import gen_filenames, pop_fileopts, find_groups_to_singles, decorate_graph
 
@@ -13,7 +14,9 @@ def view_interfaces(base, average=1, save_xvg='', **kwargs):
     Input files are plaintext files of Grace format, with two columns
     representing x and y coordinates of the interface, connected from
     the bottom left edge, over the droplet and ending at the bottom right
-    edge. Positions should be in units of nanometer.
+    edge. Positions should be in units of nanometer. The base can also be
+    an interface series file with all interfaces, see
+    `strata.dataformats.interfaces`.
 
     Optionally averages the interface data over an input bundling length.
     The averaged interfaces can be written to disk as new Grace formatted
@@ -82,7 +85,8 @@ def view_interfaces(base, average=1, save_xvg='', **kwargs):
             continue
 
         if save_xvg != '':
-            write_interface_data(fnout, interface, fngroup, kwargs)
+            coords = {'X': interface.values, 'Y': interface.index.values}
+            write_interface_data(fnout, coords, fngroup, kwargs)
 
         if save_fig != None:
             kwargs['save_fig'] = next(fnfig)
@@ -133,7 +137,8 @@ def read_interface_file(file, print_error=True):
     """Return the interface coordinates read from a file.
 
     Args:
-        file (path): File to read from.
+        file (path): File to read from, or path to an interface in an
+            interface series file.
 
     Keyword Args:
         print_error (optional): Print errors.
@@ -144,7 +149,7 @@ def read_interface_file(file, print_error=True):
     """
 
     try:
-        xs, ys = np.genfromtxt(file, unpack=True)
+        xs, ys = read_interface_coordinates(file)
     except Exception as err:
         if print_error:
             print("Could not read interface file %r: " % file, end='')
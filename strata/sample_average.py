@@ -4,15 +4,19 @@ import progressbar as pbar
 
 from scipy.stats import linregress
 
-from droplets.flow import FlowData
+from droplets.flow import FlowData, INDEX_LABELS, get_derived_field, get_stored_dependencies
 from droplets.sample import sample_inertial_energy, sample_viscous_dissipation, sample_flow_angle
-from strata.dataformats.read import read_from_files
-from strata.utils import find_datamap_files, pop_fileopts, prepare_path, write_module_header
+from strata.dataformats.read import read_from_base
+from strata.dataformats.series import finish_series, is_series_path
+from strata.utils import pop_fileopts, prepare_path, write_module_header
+
+# Fields stored in data maps which can be sampled
+SAMPLE_FIELDS = ('U', 'V', 'M', 'N', 'T')
 
 
 def sample_average_files(base, labels, output=None, sum=False, dt=1.,
         cutoff_label=None, cutoff=None, viscosity=8.77e-4,
-        slip_floor=0.0, verbose=True, **kwargs):
+        slip_floor=0.0, verbose=True, sparse=False, prefetch=0, **kwargs):
     """Sample average collected data of input labels from files.
 
     Returns lists with input file times and the averaged sampled value
@@ -35,6 +39,10 @@ def sample_average_files(base, labels, output=None, sum=False, dt=1.,
     The label 'slip_length' samples the slip length of the system. Use
     the input keyword `floor` to set a floor position.
 
+    Other labels can be derived fields, such as 'flow' for the absolute
+    flow, which are calculated from the fields they depend on. See
+    `droplets.derived`.
+
     Optionally the total value of the quantity in the system can be returned
     by supplying the keyword argument `sum`.
 
@@ -44,13 +52,24 @@ def sample_average_files(base, labels, output=None, sum=False, dt=1.,
     separate label can also be supplied. This is useful when wanting
     to sample some data in cells with a minimum mass or number density.
 
+    The files can be read as sparse data by supplying the keyword argument
+    `sparse`, in which case only non-empty bins are read and sampled.
+    Empty bins are still accounted for in the sampled values. Sampling
+    of the viscous dissipation and slip length requires the full grid,
+    which is then created for each map.
+
     Args:
-        base (str): Base path to input files.
+        base (str): Base path to input files, or a named pipe or '-' to
+            read maps from a stream as they are written. See
+            `strata.dataformats.read.read_from_stream`.
 
         labels (str's): Labels of data to sample. Can be a set.
 
     Keyword Args:
-        output (str, optional): Write sample data to an output file.
+        output (str, optional): Write sample data to an output file. Paths
+            with the extension '.npz' are written as a binary series file
+            with a column for each label and its standard deviation,
+            see `strata.dataformats.series`.
 
         dt (float, optional): Time difference between input maps.
 
@@ -70,6 +89,14 @@ def sample_average_files(base, labels, output=None, sum=False, dt=1.,
 
         verbose (bool, optional): Print the mean of all samples.
 
+        sparse (bool, optional): Read and sample only non-empty bins.
+
+        prefetch (int, optional): Number of files to read ahead in the
+            background.
+
+        xlim, ylim (2-tuples, optional): Sample only the bins inside these
+            limits. Other bins are dropped while reading the files.
+
         begin (int, default=1): First data map number.
 
         end (int, default=inf): Final data map number.
@@ -86,12 +113,19 @@ def sample_average_files(base, labels, output=None, sum=False, dt=1.,
         write_header(output, base, labels, cutoff, cutoff_label, header_opts)
 
     fopts = pop_fileopts(kwargs)
-    files = list(find_datamap_files(base, **fopts))
 
     # Get some limits on coordinates
     coord_labels = kwargs.get('coord_labels', ['X', 'Y'])
     xlim, ylim = [kwargs.get(lims, (None, None)) for lims in ('xlim', 'ylim')]
-    set_limits = xlim != (None, None) or ylim != (None, None)
+
+    fields = get_sample_fields(labels, cutoff_label)
+    read_labels = ['X', 'Y'] + fields
+    if sparse:
+        read_labels += list(INDEX_LABELS)
+
+    needs_grid = any(l in ('visc_diss', 'slip_length')
+        or getattr(get_derived_field(l), 'needs_grid', False)
+        for l in list(labels) + [cutoff_label])
 
     if output:
         try:
@@ -104,18 +138,22 @@ def sample_average_files(base, labels, output=None, sum=False, dt=1.,
     sampled_values = [[] for _ in labels]
     sampled_stds = [[] for _ in labels]
 
+    num_files, read_files = read_from_base(base, sparse=sparse, fields=fields,
+        xlim=xlim, ylim=ylim, prefetch=prefetch, **fopts)
+
     quiet = kwargs.pop('quiet', False)
     if not quiet:
         widgets = ['Sampling from files: ',
                 pbar.Bar(), ' (', pbar.SimpleProgress(), ') ', pbar.ETA()]
-        progress = pbar.ProgressBar(widgets=widgets, max_value=len(files))
+        progress = pbar.ProgressBar(widgets=widgets,
+            max_value=(num_files if num_files != None else pbar.UnknownLength))
         progress.start()
 
-    for i, (data, info, _) in enumerate(read_from_files(*files)):
-        flow = FlowData(*[(l, data[l]) for l in ['X', 'Y', 'U', 'V', 'M', 'N', 'T']], info=info)
+    for i, (data, info, _) in enumerate(read_files):
+        flow = FlowData(*[(l, data[l]) for l in read_labels], info=info)
 
-        if set_limits:
-            flow = flow.cut(xlim=xlim, ylim=ylim)
+        if flow.is_sparse and needs_grid:
+            flow = flow.densify()
 
         for j, label in enumerate(labels):
             try:
@@ -135,7 +173,7 @@ def sample_average_files(base, labels, output=None, sum=False, dt=1.,
                 print("Encountered exception: %r" % err)
                 return
 
-        if output:
+        if output and not is_series_path(output):
             with open(output, 'a') as fp:
                 fp.write('%.3f' % (i * dt))
                 for value, std in zip(sampled_values, sampled_stds):
@@ -157,6 +195,17 @@ def sample_average_files(base, labels, output=None, sum=False, dt=1.,
 
     times = [i * dt for i in range(len(sampled_values[0]))]
 
+    if output and is_series_path(output):
+        columns = {'time': times}
+
+        for label, values, stds in zip(labels, sampled_values, sampled_stds):
+            columns[label] = values
+
+            if all(std != None for std in stds):
+                columns['%s_std' % label] = stds
+
+        finish_series(output, columns)
+
     if verbose:
         for i, l in enumerate(labels):
             value = np.mean(sampled_values[i])
@@ -170,8 +219,48 @@ def sample_average_files(base, labels, output=None, sum=False, dt=1.,
     return times, sampled_values
 
 
+def get_sample_fields(labels, cutoff_label=None):
+    """Return the stored fields which are needed to sample the labels.
+
+    Labels which are not stored fields and not derived from them are
+    not included. Sampling them fails as a bad label.
+
+    """
+
+    derived_fields = {
+        'inertial_energy': ['M', 'U', 'V'],
+        'visc_diss': ['U', 'V'],
+        'flow_angle': ['M', 'U', 'V'],
+        'slip_length': ['U', 'V'],
+    }
+
+    fields = []
+
+    for label in list(labels) + [cutoff_label]:
+        if label in derived_fields:
+            depends = derived_fields[label]
+        else:
+            depends = get_stored_dependencies(label)
+
+        for field in depends:
+            if field in SAMPLE_FIELDS and field not in fields:
+                fields.append(field)
+
+    return fields
+
+
 def sample_value(flow, label, cutoff, cutoff_label, sum, viscosity):
-    """Sample input data of label."""
+    """Sample input data of label.
+
+    Bins which are missing from sparse data are sampled as empty.
+
+    """
+
+    # Empty bins can pass the cutoff or be included in the mean
+    if flow.is_sparse:
+        num_missing = flow.num_bins - flow.fields[INDEX_LABELS[0]].size
+    else:
+        num_missing = 0
 
     if label == 'inertial_energy':
         sample_data = sample_inertial_energy(flow).ravel()
@@ -182,17 +271,28 @@ def sample_value(flow, label, cutoff, cutoff_label, sum, viscosity):
         # differently and calculate it further below. We need the
         # full data set for it and thus keep all the data (minus the
         # data outside of the cutoff applied below).
-        sample_data = flow.data
+        sample_data = {l: flow.fields[l] for l in ('U', 'V', 'M')}
     else:
-        sample_data = flow.data[label]
+        sample_data = flow.get_field(label)
 
     if cutoff_label != None:
         if cutoff == None:
-            cutoff = 0.5*(np.max(flow.data[cutoff_label]) + np.min(flow.data[cutoff_label]))
+            vmin = np.min(flow.get_field(cutoff_label))
+            if num_missing > 0:
+                vmin = min(vmin, 0.)
+
+            cutoff = 0.5*(np.max(flow.get_field(cutoff_label)) + vmin)
 
         try:
-            inds = flow.data[cutoff_label] >= cutoff
-            sample_data = sample_data[inds]
+            inds = flow.get_field(cutoff_label) >= cutoff
+
+            if label == 'flow_angle':
+                sample_data = {l: values[inds] for l, values in sample_data.items()}
+            else:
+                sample_data = sample_data[inds]
+
+            if cutoff > 0.:
+                num_missing = 0
         except KeyError:
             print("[WARNING] Bad label: cutoff label '%s' not in system, disabling cutoff"
                     % cutoff_label)
@@ -206,14 +306,19 @@ def sample_value(flow, label, cutoff, cutoff_label, sum, viscosity):
             cut_flow = FlowData(*[(l, sample_data[l]) for l in ['U', 'V', 'M']])
             value = sample_flow_angle(cut_flow, mean=True, weight='M')
             std = None
+        elif num_missing > 0:
+            num_total = sample_data.size + num_missing
+            value = np.sum(sample_data, dtype=np.float64) / num_total
+            std = np.sqrt(np.sum(np.square(sample_data, dtype=np.float64))
+                / num_total - value**2)
         else:
-            value = np.mean(sample_data)
-            std = np.std(sample_data)
+            value = np.mean(sample_data, dtype=np.float64)
+            std = np.std(sample_data, dtype=np.float64)
 
     else:
         if label == 'flow_angle':
             raise ValueError("Taking the sum of label `flow_angle` does not make any sense.")
-        value = np.sum(sample_data)
+        value = np.sum(sample_data, dtype=np.float64)
         std = None
 
     return value, std
@@ -230,9 +335,8 @@ def sample_slip_length(flow,
 
     slip_lengths = []
 
-    for column in flow.data.reshape(flow.shape):
-        ys = column[ylabel]
-        us = column[ulabel]
+    for ys, us in zip(flow.fields[ylabel].reshape(flow.shape),
+            flow.fields[ulabel].reshape(flow.shape)):
 
         # The slip length is the negative of the y at which
         # the velocity gradient is zero. This is just the
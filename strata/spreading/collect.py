@@ -6,7 +6,8 @@ from collections import namedtuple
 
 from droplets.flow import FlowData
 from droplets.interface import get_interface
-from strata.dataformats.read import read_from_files
+from strata.dataformats.read import read_from_base
+from strata.dataformats.series import finish_series, is_series_path
 from strata.utils import *
 
 """Module for finding the spreading of a droplet.
@@ -33,10 +34,14 @@ def collect(base, **kwargs):
     Other options are detailed below.
 
     Args:
-        base (str): Base path to input files.
+        base (str): Base path to input files, or a named pipe or '-' to
+            read maps from a stream as they are written. See
+            `strata.dataformats.read.read_from_stream`.
 
     Keyword Args:
-        save (str): Write spreading data to an output file.
+        save (str): Write spreading data to an output file. Paths with
+            the extension '.npz' are written as a binary series file,
+            see `strata.dataformats.series`.
 
         dt (float): Time difference between input maps.
 
@@ -51,6 +56,11 @@ def collect(base, **kwargs):
         cutoff_bins (int, default=1): Number of bins inside the set radius
             which must pass the cut-off criteria.
 
+        sparse (bool, default=False): Read and search only non-empty bins.
+
+        prefetch (int, default=0): Number of files to read ahead in the
+            background.
+
         begin (int, default=1): First data map number.
 
         end (int, default=inf): Final data map number.
@@ -92,6 +102,8 @@ def collect(base, **kwargs):
         save = prepare_output(save, kwargs.copy(), fopts)
 
     quiet = kwargs.pop('quiet', False)
+    sparse = kwargs.pop('sparse', False)
+    prefetch = kwargs.pop('prefetch', 0)
 
     dt = kwargs.pop('dt', 1.)
     time = kwargs.pop('t0', 0.)
@@ -99,18 +111,21 @@ def collect(base, **kwargs):
 
     times = []
     values = []
+    edges = []
 
-    files = list(find_datamap_files(base, **fopts))
+    num_files, read_files = read_from_base(base, sparse=sparse, fields=['M'],
+        prefetch=prefetch, **fopts)
 
     if not quiet:
         widgets = ['Reading files: ',
                 pbar.Bar(), ' (', pbar.SimpleProgress(), ') ', pbar.ETA()]
-        progress = pbar.ProgressBar(widgets=widgets, max_value=len(files))
+        progress = pbar.ProgressBar(widgets=widgets,
+            max_value=(num_files if num_files != None else pbar.UnknownLength))
         progress.start()
 
     pbc_info = init_periodic_info()
 
-    for i, (data, info, meta) in enumerate(read_from_files(*files)):
+    for i, (data, info, meta) in enumerate(read_files):
         flow = FlowData(data, info=info)
         left, right = get_spreading_edges(flow, 'M', cutoff_radius,
             search_longest_connected=True, **kwargs)
@@ -130,6 +145,7 @@ def collect(base, **kwargs):
 
             values.append(radius)
             times.append(time)
+            edges.append((left_absolute, right_absolute))
 
             if save != None:
                 cur_path = meta.pop('path')
@@ -138,9 +154,10 @@ def collect(base, **kwargs):
                     output_impact_time(save, i*dt, cur_path)
                     write_spreading.impact = True
 
-                write_spreading(
-                    save, time, radius, left_absolute, right_absolute, cur_path
-                )
+                if not is_series_path(save):
+                    write_spreading(
+                        save, time, radius, left_absolute, right_absolute, cur_path
+                    )
 
             time += dt
 
@@ -150,6 +167,11 @@ def collect(base, **kwargs):
     if not quiet:
         progress.finish()
 
+    if save != None and is_series_path(save):
+        lefts, rights = np.array(edges, dtype=np.float64).reshape(-1, 2).T
+        finish_series(save, {'time': times, 'radius': values,
+            'left': lefts, 'right': rights})
+
     return get_spreading_ndarray(times, values)
 
 
@@ -190,7 +212,7 @@ def get_spreading_edges(flow, label, cutoff_radius, **kwargs):
     def get_floor_height(floor, ys):
         if floor != None:
             return ys[np.abs(np.ceil(ys - floor) - 1).argmin()]
-    xs, ys = (flow.data[l] for l in kwargs.get('coord_labels', ('X', 'Y')))
+    xs, ys = (flow.fields[l] for l in kwargs.get('coord_labels', ('X', 'Y')))
 
     floor = kwargs.pop('floor', None)
     yfloor = get_floor_height(floor, ys)
@@ -4,6 +4,7 @@ import os
 import pandas as pd
 import warnings
 
+from strata.dataformats.series import is_series_path, read_series
 from strata.utils import decorate_graph, prepare_path
 
 """Module for plotting the spreading of droplets."""
@@ -14,7 +15,8 @@ def view_spreading(files, **kwargs):
 
     Input files are plaintext files of Grace format, which has the
     first column as time in ps and all following columns as spreading
-    radius in nm.
+    radius in nm. Binary series files ('.npz') with the same columns
+    can also be read, see `strata.dataformats.series`.
 
     Optionally synchronises the spreading data times to a common spreading
     radius if one is input.
@@ -170,6 +172,9 @@ def scale_spreading_data(data, tau=1., R=1.):
 def read_spreading_data(*files):
     """Return spreading data read from input files.
 
+    Files are read as Grace formatted or plain text files, or as binary
+    series files if their extension is '.npz'.
+
     Args:
         files (paths): List of input files.
 
@@ -181,6 +186,16 @@ def read_spreading_data(*files):
     def read_file(filename):
         """Read Grace formatted file, comments starting with # or @."""
 
+        def read_series_file(filename):
+            """Read the columns of a binary series file."""
+
+            columns, _ = read_series(filename)
+            times, *all_values = columns.values()
+            all_series = [get_series(values, times, filename, i+1)
+                    for i, values in enumerate(all_values)]
+
+            return all_series
+
         def read_plain_file(filename):
             """Read a simple file, comments starting with '#'."""
 
@@ -248,6 +263,9 @@ def read_spreading_data(*files):
 
             return s.dropna()
 
+        if is_series_path(filename):
+            return read_series_file(filename)
+
         try:
             series = read_plain_file(filename)
         except Exception:
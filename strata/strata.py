@@ -7,7 +7,8 @@ import pkg_resources
 import sys
 
 from strata.average import average
-from strata.convert import convert
+from strata.convert import convert, pack, unpack
+from strata.index import index_files
 from strata.interface.angle import interface_contact_angle
 from strata.interface.collect import collect_interfaces
 from strata.interface.view import view_interfaces
@@ -18,6 +19,8 @@ from strata.spreading.collect import collect
 from strata.spreading.view import view_spreading
 from strata.view_flowmap import view_flowmap_2d, view_flowfields
 from strata.sample_average import sample_average_files
+from droplets.derived import FIELD_LABELS
+from droplets.flow import set_precision, PRECISIONS
 
 
 # Construct version string
@@ -26,6 +29,9 @@ try:
 except Exception:
     version = "Unknown"
 
+# Labels of fields stored in data maps
+MAP_LABELS = ['M', 'N', 'T', 'U', 'V']
+
 
 class OptIntParamType(click.ParamType):
     """Either an integer or None."""
@@ -91,10 +97,18 @@ def print_version(ctx, param, value):
     click.echo('Version %s' % version)
     ctx.exit()
 
+def set_data_precision(ctx, param, value):
+    if value != None:
+        set_precision(value)
+
 # Main functionality
 @create_group(context_settings=dict(help_option_names=['-h', '--help']))
 @click.option('-V', '--version', is_flag=True, callback=print_version,
               expose_value=False, is_eager=True, help='Print version number and exit.')
+@click.option('--precision', type=click.Choice(PRECISIONS), default=None,
+              callback=set_data_precision, expose_value=False,
+              help='Floating point precision to read and process data with. '
+              '(As stored)')
 def strata():
     """Tools for reading and analysing files of flow data."""
     pass
@@ -109,6 +123,18 @@ cmd_convert = {
         'name': 'convert',
         'desc': 'Convert data files to another format.'
         }
+cmd_index = {
+        'name': 'index',
+        'desc': 'Catalogue the headers of data files.'
+        }
+cmd_pack = {
+        'name': 'pack',
+        'desc': 'Pack data files into a trajectory file.'
+        }
+cmd_unpack = {
+        'name': 'unpack',
+        'desc': 'Unpack a trajectory file into data files.'
+        }
 cmd_contactline = {
         'name': 'contact_line',
         'desc': 'Analyse data around the contact line.'
@@ -222,6 +248,12 @@ cmd_quiver = {
         help='End reading from BASE at this number. (None)')
 @add_option('--ext', default='.dat',
         help='Read and write using this file extension. (.dat)')
+@add_option('--prefetch', default=2,
+        type=click.IntRange(0, None), metavar='INTEGER',
+        help='Read this many files ahead in the background. (2)')
+@add_option('--writers', default=1,
+        type=click.IntRange(0, None), metavar='INTEGER',
+        help='Write this many output files at a time in the background. (1)')
 def average_cli(base, output, group, **kwargs):
     """Sample average files at BASE path in bundles of size GROUP
     and write to files at OUTPUT base.
@@ -232,6 +264,9 @@ def average_cli(base, output, group, **kwargs):
     File names are generated by joining the base path and extension with
     a five-digit integer signifying file number ('%s%05d%s').
 
+    BASE can also be a named pipe or '-' for the standard input, from
+    which maps in the GMX_FLOW_1 format are read as they are written.
+
     By supplying the keyword argument `recenter` the data maps can be
     recentered to either of the left and right contact lines or the
     center of mass of the system before calculating the average. This
@@ -258,8 +293,11 @@ def average_cli(base, output, group, **kwargs):
 @add_argument('base', type=str)
 @add_argument('output', type=str)
 @add_option('--ftype',
-        type=click.Choice(['gmx', 'simple', 'simple_plain']), default='gmx',
+        type=click.Choice(['gmx', 'simple', 'simple_v2', 'simple_plain']), default='gmx',
         help='Format to convert files into. (gmx)')
+@add_option('--compression',
+        type=click.Choice(['none', 'zlib', 'lzma']), default='none',
+        help='Compress the fields of gmx files. (none)')
 @add_option('-b', '--begin', default=1,
         type=click.IntRange(0, None), metavar='INTEGER',
         help='Begin reading from BASE at this number. (1)')
@@ -268,6 +306,12 @@ def average_cli(base, output, group, **kwargs):
         help='End reading from BASE at this number. (None)')
 @add_option('--ext', default='.dat',
         help='Read and write using this file extension. (.dat)')
+@add_option('-j', '--jobs', default=1,
+        type=click.IntRange(1, None), metavar='INTEGER',
+        help='Number of files to convert at the same time. (1)')
+@add_option('--writers', default=1,
+        type=click.IntRange(0, None), metavar='INTEGER',
+        help='Write this many output files at a time in the background. (1)')
 def convert_cli(base, output, **kwargs):
     """Convert files at BASE path to another data file format
     and write to files at OUTPUT base.
@@ -278,9 +322,106 @@ def convert_cli(base, output, **kwargs):
     """
 
     set_none_to_inf(kwargs)
+    if kwargs['compression'] == 'none': kwargs['compression'] = None
     convert(base, output, **kwargs)
 
 
+# Index wrapper
+@strata.command(name=cmd_index['name'], short_help=cmd_index['desc'])
+@add_argument('base', type=str)
+@add_option('--catalogue', default=None, type=str,
+        help='Path to the catalogue file. (BASE.index.json)')
+@add_option('-b', '--begin', default=1,
+        type=click.IntRange(0, None), metavar='INTEGER',
+        help='Begin reading from BASE at this number. (1)')
+@add_option('-e', '--end', default=None,
+        type=click.IntRange(0, None), metavar='INTEGER',
+        help='End reading from BASE at this number. (None)')
+@add_option('--ext', default='.dat',
+        help='Read using this file extension. (.dat)')
+def index_cli(base, **kwargs):
+    """Catalogue the headers of files at BASE path.
+
+    The grid shape, spacing and origin and the number of stored bins
+    of every file is read from its header, without reading its data,
+    and kept in a catalogue next to the files. Files which have not
+    changed since they were catalogued are not read again. A summary
+    is printed, including whether all files share the same grid.
+
+    File names are generated by joining the base path and extension with
+    a five-digit integer signifying file number ('%s%05d%s').
+
+    """
+
+    set_none_to_inf(kwargs)
+    index_files(base, **kwargs)
+
+
+# Trajectory wrappers
+@strata.command(name=cmd_pack['name'], short_help=cmd_pack['desc'])
+@add_argument('base', type=str)
+@add_argument('output', type=str)
+@add_option('-b', '--begin', default=1,
+        type=click.IntRange(0, None), metavar='INTEGER',
+        help='Begin reading from BASE at this number. (1)')
+@add_option('-e', '--end', default=None,
+        type=click.IntRange(0, None), metavar='INTEGER',
+        help='End reading from BASE at this number. (None)')
+@add_option('--ext', default='.dat',
+        help='Read using this file extension. (.dat)')
+def pack_cli(base, output, **kwargs):
+    """Pack files at BASE path into a single trajectory file at OUTPUT.
+
+    The files are stored as frames which keep their file numbers. All
+    commands which read files at a BASE path can instead be given the
+    trajectory file as BASE, and will then read its frames.
+
+    File names are generated by joining the base path and extension with
+    a five-digit integer signifying file number ('%s%05d%s').
+
+    """
+
+    set_none_to_inf(kwargs)
+    pack(base, output, **kwargs)
+
+
+@strata.command(name=cmd_unpack['name'], short_help=cmd_unpack['desc'])
+@add_argument('path', type=str)
+@add_argument('output', type=str)
+@add_option('--ftype',
+        type=click.Choice(['gmx', 'simple', 'simple_v2', 'simple_plain']), default='gmx',
+        help='Format to write files in. (gmx)')
+@add_option('--compression',
+        type=click.Choice(['none', 'zlib', 'lzma']), default='none',
+        help='Compress the fields of gmx files. (none)')
+@add_option('-b', '--begin', default=1,
+        type=click.IntRange(0, None), metavar='INTEGER',
+        help='Begin reading from PATH at this frame number. (1)')
+@add_option('-e', '--end', default=None,
+        type=click.IntRange(0, None), metavar='INTEGER',
+        help='End reading from PATH at this frame number. (None)')
+@add_option('--ext', default='.dat',
+        help='Write using this file extension. (.dat)')
+@add_option('-j', '--jobs', default=1,
+        type=click.IntRange(1, None), metavar='INTEGER',
+        help='Number of frames to convert at the same time. (1)')
+@add_option('--writers', default=1,
+        type=click.IntRange(0, None), metavar='INTEGER',
+        help='Write this many output files at a time in the background. (1)')
+def unpack_cli(path, output, **kwargs):
+    """Unpack the frames of a trajectory file at PATH into files
+    at OUTPUT base.
+
+    File names are generated by joining the base path and extension with
+    a five-digit integer signifying the frame number ('%s%05d%s').
+
+    """
+
+    set_none_to_inf(kwargs)
+    if kwargs['compression'] == 'none': kwargs['compression'] = None
+    unpack(path, output, **kwargs)
+
+
 # Combined spreading tools for collection and plotting
 @strata.group()
 def spreading(name=cmd_spreading['name'], short_help=cmd_spreading['desc']):
@@ -293,7 +434,7 @@ def spreading(name=cmd_spreading['name'], short_help=cmd_spreading['desc']):
 @add_argument('base', type=str)
 @add_argument('floor', type=float)
 @add_option('-o', '--output', 'save', type=click.Path(), default='spread.xvg',
-        help='Write the collected data to disk. (spread.xvg)')
+        help='Write the collected data to disk, in binary if the extension is .npz. (spread.xvg)')
 @add_option('--nooutput', default=False, is_flag=True,
         help='Do not write output to disk. (False)')
 @add_option('-dt', '--delta_t', 'dt', default=1.,
@@ -306,6 +447,8 @@ def spreading(name=cmd_spreading['name'], short_help=cmd_spreading['desc']):
         help='Boundary bins require this many neighbours.')
 @add_option('-t0', '--time_init', 't0', type=float, default=0.,
         help='Initial time of first spreading frame (ps)')
+@add_option('--sparse/--nosparse', default=False,
+        help='Read and search only non-empty bins of the maps. (False)')
 @add_option('-b', '--begin', default=1,
         type=click.IntRange(0, None), metavar='INTEGER',
         help='Begin reading from BASE at this number. (1)')
@@ -316,6 +459,9 @@ def spreading(name=cmd_spreading['name'], short_help=cmd_spreading['desc']):
         help='Read using this file extension. (.dat)')
 @add_option('-v', '--verbose', default=False, is_flag=True,
         help='Verbose output: Print spreading to stdout.')
+@add_option('--prefetch', default=2,
+        type=click.IntRange(0, None), metavar='INTEGER',
+        help='Read this many files ahead in the background. (2)')
 def spreading_collect_cli(base, floor, **kwargs):
     """Collect spreading radius r(t) at height FLOOR for input files at BASE.
 
@@ -334,6 +480,9 @@ def spreading_collect_cli(base, floor, **kwargs):
     File names are generated by joining the base path and extension with
     a five-digit integer signifying file number ('%s%05d%s').
 
+    BASE can also be a named pipe or '-' for the standard input, from
+    which maps in the GMX_FLOW_1 format are read as they are written.
+
     """
 
     verbose = kwargs.pop('verbose')
@@ -465,6 +614,8 @@ def interface(name=cmd_interface['name'], short_help=cmd_interface['desc']):
         help='Boundary bins require this many neighbours.')
 @add_option('--ylim', 'ylims', type=OPT_FLOAT, nargs=2, default=(None, None),
         help='Set limits on the y axis.')
+@add_option('--sparse/--nosparse', default=False,
+        help='Read and search only non-empty bins of the maps. (False)')
 @add_option('-b', '--begin', default=1,
         type=click.IntRange(0, None), metavar='INTEGER',
         help='Begin reading from BASE at this number. (1)')
@@ -473,6 +624,9 @@ def interface(name=cmd_interface['name'], short_help=cmd_interface['desc']):
         help='End reading from BASE at this number. (None)')
 @add_option('--ext', default='.dat',
         help='Read using this file extension. (.dat)')
+@add_option('--prefetch', default=2,
+        type=click.IntRange(0, None), metavar='INTEGER',
+        help='Read this many files ahead in the background. (2)')
 def interface_collect_cli(base, output, **kwargs):
     """Collect the interface boundaries for input files at BASE to OUTPUT.
 
@@ -491,11 +645,15 @@ def interface_collect_cli(base, output, **kwargs):
     File names are generated by joining the base path and extension with
     a five-digit integer signifying file number ('%s%05d%s').
 
+    If OUTPUT has the extension '.npz' all interfaces are instead written
+    to a single interface series file at OUTPUT, which can be read as the
+    BASE of the other interface commands.
+
     """
 
     set_none_to_inf(kwargs)
     if kwargs['recenter'] == 'off': kwargs['recenter'] = None
-    xs, ys = collect_interfaces(base, output, **kwargs)
+    collect_interfaces(base, output, **kwargs)
 
 
 # Interface viewing wrapper
@@ -554,7 +712,7 @@ def interface_view_cli(base, **kwargs):
 @add_option('-o', '--save_fig', type=str, default=None,
         help='Save figures to base path..')
 @add_option('-x', '--save_xvg', type=click.Path(), default='',
-        help='Save collected data to disk at base as .xvg file.')
+        help='Save collected data to disk as .xvg file, or in binary if the extension is .npz.')
 @add_option('-dt', '--delta_t', default=1.,
         help='Time difference between interface files.')
 @add_option('--show/--noshow', default=True,
@@ -686,6 +844,10 @@ def contact_line(name=cmd_contactline['name'], short_help=cmd_contactline['desc'
         help='Boundary bins search for neighbours within this radius. (1 nm)')
 @add_option('-cb', '--cutoff_bins', default=1,
         help='Boundary bins require this many neighbours (1).')
+@add_option('--xlim', type=OPT_FLOAT, nargs=2, default=(None, None),
+        metavar='MIN MAX', help='Read only bins inside these limits on the x axis.')
+@add_option('--ylim', type=OPT_FLOAT, nargs=2, default=(None, None),
+        metavar='MIN MAX', help='Read only bins inside these limits on the y axis.')
 @add_option('-b', '--begin', default=1,
         type=click.IntRange(0, None), metavar='INTEGER',
         help='Begin reading from BASE at this number. (1)')
@@ -694,6 +856,9 @@ def contact_line(name=cmd_contactline['name'], short_help=cmd_contactline['desc'
         help='End reading from BASE at this number. (None)')
 @add_option('--ext', default='.dat',
         help='Read and write using this file extension. (.dat)')
+@add_option('--writers', default=1,
+        type=click.IntRange(0, None), metavar='INTEGER',
+        help='Write this many output files at a time in the background. (1)')
 def cl_extract_cli(base, output, **kwargs):
     """Extract the contact line area of files at BASE and write to OUTPUT.
 
@@ -750,8 +915,12 @@ def cl_extract_cli(base, output, **kwargs):
         help='Boundary bins search for neighbours within this radius. (1 nm)')
 @add_option('-cb', '--cutoff_bins', default=1,
         help='Boundary bins require this many neighbours (1).')
+@add_option('--xlim', type=OPT_FLOAT, nargs=2, default=(None, None),
+        metavar='MIN MAX', help='Read only bins inside these limits on the x axis.')
+@add_option('--ylim', type=OPT_FLOAT, nargs=2, default=(None, None),
+        metavar='MIN MAX', help='Read only bins inside these limits on the y axis.')
 @add_option('--save', default=None, type=str,
-        help='Save sampled data to disk. (False)')
+        help='Save sampled data to disk, in binary if the extension is .npz. (False)')
 @add_option('-b', '--begin', default=1,
         type=click.IntRange(0, None), metavar='INTEGER',
         help='Begin reading from BASE at this number. (1)')
@@ -800,7 +969,7 @@ def view(name=cmd_flowview['name'], short_help=cmd_flowview['desc']):
 @add_argument('files', type=click.Path(exists=True), nargs=-1)
 @add_option('-o', '--save_fig', type=click.Path(), default=None,
         help='Save figure to path. (None)')
-@add_option('-l', '--label', type=click.Choice(['M', 'N', 'T', 'U', 'V', 'flow']),
+@add_option('-l', '--label', type=click.Choice(MAP_LABELS + list(FIELD_LABELS)),
         default='M', help='Label of data to use as height map. (M)')
 @add_option('-n', '--num_contours', type=int, default=10,
         help='Number of levels to draw. (10)')
@@ -840,6 +1009,9 @@ def view(name=cmd_flowview['name'], short_help=cmd_flowview['desc']):
         help='Label of x axis.')
 @add_option('--ylabel', default='y (nm)',
         help='Label of y axis.')
+@add_option('--prefetch', default=2,
+        type=click.IntRange(0, None), metavar='INTEGER',
+        help='Read this many files ahead in the background. (2)')
 def view_contour_cli(files, **kwargs):
     """Draw contour maps of the data in FILES.
 
@@ -858,14 +1030,14 @@ def view_contour_cli(files, **kwargs):
 @add_argument('files', type=click.Path(exists=True), nargs=-1)
 @add_option('-o', '--save_fig', type=click.Path(), default=None,
         help='Save figure to path. (None)')
-@add_option('-l', '--label', type=click.Choice(['M', 'N', 'T', 'U', 'V', 'flow', 'visc_diss', 'evaporation']),
+@add_option('-l', '--label', type=click.Choice(MAP_LABELS + list(FIELD_LABELS) + ['visc_diss']),
         default='M', help='Label of data to use as height map. (M)')
 @add_option('--clim', nargs=2, default=(None, None), type=OPT_FLOAT,
         metavar='MIN MAX', help='Set cut-offs for the binned values to include.')
 @add_option('--vlim', nargs=2, default=(None, None), type=OPT_FLOAT,
         metavar='MIN MAX', help='Set limits for the shown colour values.')
 @add_option('-cl', '--cutoff_label',
-        type=click.Choice(['M', 'N', 'T', 'U', 'V', 'None', 'flow', 'visc']), default=None,
+        type=click.Choice(MAP_LABELS + ['None'] + list(FIELD_LABELS)), default=None,
         help='Use a cutoff to only show bins in which their value of this label exceeds a cutoff. The value is set using the `--cutoff` option.')
 @add_option('-co', '--cutoff', type=float, default=None,
         help='Minimum value for `cutoff_label` to show bins for. (0)')
@@ -901,6 +1073,9 @@ def view_contour_cli(files, **kwargs):
         help='Label of x axis.')
 @add_option('--ylabel', default='y (nm)',
         help='Label of y axis.')
+@add_option('--prefetch', default=2,
+        type=click.IntRange(0, None), metavar='INTEGER',
+        help='Read this many files ahead in the background. (2)')
 def view_heightmap_cli(files, **kwargs):
     """Draw 2D height maps of input FILES.
 
@@ -924,7 +1099,7 @@ def view_heightmap_cli(files, **kwargs):
 @add_option('-co', '--cutoff', type=float, default=None,
         help='Minimum mass of bins to draw fields for. (0)')
 @add_option('-cl', '--colour_label', 'colour',
-        type=click.Choice(['M', 'N', 'T', 'U', 'V', 'None', 'flow', 'visc', 'radial', 'evaporation']), default='T',
+        type=click.Choice(MAP_LABELS + ['None'] + list(FIELD_LABELS)), default='T',
         help='Colour the flow by values of this label.')
 @add_option('--scale', default=1., help='Scale for quiver arrows. (1)')
 @add_option('--width', default=0.0015, help='Width of quiver arrows. (0.0015)')
@@ -964,6 +1139,9 @@ def view_heightmap_cli(files, **kwargs):
         help='Label of x axis.')
 @add_option('--ylabel', default='y (nm)',
         help='Label of y axis.')
+@add_option('--prefetch', default=2,
+        type=click.IntRange(0, None), metavar='INTEGER',
+        help='Read this many files ahead in the background. (2)')
 def view_quiver_cli(files, **kwargs):
     """Draw flow fields of input FILES.
 
@@ -981,7 +1159,7 @@ def view_quiver_cli(files, **kwargs):
 @add_argument('base', type=str)
 @add_argument('labels', type=str, nargs=-1, required=True)
 @add_option('-o', '--output', type=click.Path(), default='sample.xvg',
-        help='Write the collected data to disk. (sample.xvg)')
+        help='Write the collected data to disk, in binary if the extension is .npz. (sample.xvg)')
 @add_option('-dt', '--delta_t', 'dt', default=1.,
         help='Time difference between data map files. (1)')
 @add_option('--process', type=click.Choice(['mean', 'sum']), default='mean',
@@ -992,6 +1170,8 @@ def view_quiver_cli(files, **kwargs):
         help='Label to use for cutoff. Defaults to no cutoff. (None)')
 @add_option('-fl', '--floor', 'slip_floor', type=float, default=0.0,
         help='Substrate position along z when sampling the slip length (0.0)')
+@add_option('--sparse/--nosparse', default=False,
+        help='Read and sample only non-empty bins of the maps. (False)')
 @add_option('--show/--noshow', 'verbose', default=True,
         help='Print sample mean.')
 @add_option('--xlim', type=OPT_FLOAT, nargs=2, default=(None, None),
@@ -1006,8 +1186,19 @@ def view_quiver_cli(files, **kwargs):
         help='End reading from BASE at this number. (None)')
 @add_option('--ext', default='.dat',
         help='Read using this file extension. (.dat)')
+@add_option('--prefetch', default=2,
+        type=click.IntRange(0, None), metavar='INTEGER',
+        help='Read this many files ahead in the background. (2)')
 def sample_average_cli(base, labels, **kwargs):
-    """Sample average data of input label in files of input base."""
+    """Sample average data of input label in files of input base.
+
+    Labels can be stored fields or fields derived from them: flow, radial,
+    visc, grad_rho_x, grad_rho_y and evaporation.
+
+    The base can also be a named pipe or '-' for the standard input, from
+    which maps in the GMX_FLOW_1 format are read as they are written.
+
+    """
 
     set_none_to_inf(kwargs)
     sum = kwargs.pop('process') == 'sum'
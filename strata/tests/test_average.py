@@ -88,6 +88,45 @@ def test_average_datamaps_othernums():
         assert (len(out_files) == 1)
 
 
+@pytest.mark.parametrize('prefetch', [0, 2])
+def test_average_rolling_reads_files_once(prefetch, monkeypatch):
+    import strata.dataformats.read as read
+
+    with tmp.TemporaryDirectory() as tmpdir:
+        tmpbase = os.path.join(tmpdir, tmpfn)
+        outbase = os.path.join(tmpdir, outfn)
+
+        tmp_data = []
+        for path in gen_filenames(tmpbase, num_maps):
+            for l in fields:
+                save_data.update({l: np.random.sample(datasize)})
+            tmp_data.append(save_data.copy())
+            write_data(path, save_data, info)
+
+        read_files = []
+        def count_reads(filename, **kwargs):
+            read_files.append(filename)
+            return read_data_file(filename, **kwargs)
+
+        monkeypatch.setattr(read, 'read_data_file', count_reads)
+
+        average(tmpbase, outbase, group, rolling=True, prefetch=prefetch, quiet=True)
+
+        # Every file was read a single time
+        assert (sorted(read_files) == list(gen_filenames(tmpbase, num_maps)))
+
+        # Verify the rolling averages against averaging directly
+        out_files = list(find_datamap_files(outbase))
+        assert (len(out_files) == num_maps - group + 1)
+
+        for i, filename in enumerate(out_files):
+            control = average_data(*tmp_data[i:(i + group)])
+
+            data, _, _ = read_data_file(filename)
+            for l in data.keys():
+                assert (np.allclose(data[l], control[l], atol=1e-6))
+
+
 def get_datamap(dsize):
     data = {
         'X': np.arange(dsize),
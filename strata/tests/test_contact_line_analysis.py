@@ -0,0 +1,37 @@
+import numpy as np
+
+import strata.contact_line_analysis as contact_line_analysis
+from droplets.flow import FlowData
+from strata.contact_line_analysis import sample_contact_line_edges
+
+
+def get_edge(us):
+    xs = np.arange(len(us)) + 0.5
+    ys = 0.5 * np.ones(len(us))
+    ms = np.ones(len(us))
+
+    info = {'shape': (len(us), 1), 'spacing': (1., 1.), 'origin': (0., 0.)}
+
+    return FlowData(('X', xs), ('Y', ys), ('U', us), ('M', ms), info=info)
+
+
+def test_sample_contact_line_edges_stores_value_without_std(tmpdir, monkeypatch):
+    # The left edge has its flow along x mirrored before it is sampled
+    edges = [
+        (get_edge(np.array([-1., -3.])), get_edge(np.array([4., 6.]))),
+        (get_edge(np.array([-2., -2.])), get_edge(np.array([2., 2.]))),
+    ]
+
+    def get_edges(filenames, average, rolling, recenter, weights, **kwargs):
+        yield from edges
+
+    monkeypatch.setattr(contact_line_analysis,
+        'get_averaged_contact_line_edges', get_edges)
+
+    base = str(tmpdir.join('data_'))
+    tmpdir.join('data_00001.dat').write('')
+
+    times, samples = sample_contact_line_edges(base, ['U'], dt=2., quiet=True)
+
+    assert (np.array_equal([0., 2.], times))
+    assert (samples == [[[3.5, None], [2., None]]])
@@ -1,7 +1,7 @@
 import numpy as np
 import os
 import tempfile as tmp
-from strata.convert import convert
+from strata.convert import convert, pack, unpack
 from strata.utils import gen_filenames, find_datamap_files
 from strata.dataformats.read import *
 from strata.dataformats.write import write
@@ -97,3 +97,124 @@ def test_convert_fopts_plainsimple():
             data = read_plainsimple(fn)
             for l in all_fields:
                 assert (np.allclose(data[l], save_data_list[i][l], atol=1e-6))
+
+def test_pack_and_unpack_trajectory():
+    with tmp.TemporaryDirectory() as tmpdir:
+        tmpbase = os.path.join(tmpdir, fnbase)
+        outbase = os.path.join(tmpdir, out)
+        path = os.path.join(tmpdir, 'traj.dat')
+
+        save_data_list = []
+        files = list(gen_filenames(tmpbase, num_files, begin=2))
+
+        for fn in files:
+            for l in fields:
+                save_data[l] = np.random.sample(datasize)
+
+            save_data_list.append(save_data.copy())
+
+            write(fn, save_data, ftype='simple')
+
+        assert (pack(tmpbase, path, begin=2, quiet=True) == num_files - 1)
+        unpack(path, outbase, quiet=True)
+
+        unpacked_files = list(find_datamap_files(outbase, begin=2))
+        assert (len(unpacked_files) == num_files - 1)
+
+        for i, (fn, frame) in enumerate(zip(unpacked_files, find_datamap_files(path))):
+            data, _ = read_gmx(fn)
+            frame_data, _, _ = read_data_file(frame)
+
+            for l in all_fields:
+                assert (np.array_equal(data[l], frame_data[l]))
+
+                if l in ('X', 'Y'):
+                    assert (np.allclose(data[l], save_data_list[i][l] + 0.5, atol=1e-6))
+                else:
+                    assert (np.allclose(data[l], save_data_list[i][l], atol=1e-6))
+
+def test_convert_gmx_to_gmx_with_jobs_keeps_sparse_data():
+    with tmp.TemporaryDirectory() as tmpdir:
+        tmpbase = os.path.join(tmpdir, fnbase)
+        outbase = os.path.join(tmpdir, out)
+
+        info = {'shape': (2, 2), 'spacing': (1., 1.), 'origin': (0., 0.), 'num_bins': 4}
+        files = list(gen_filenames(tmpbase, num_files))
+
+        for fn in files:
+            for l in fields:
+                save_data[l] = np.random.sample(datasize)
+
+            # Empty bins are not stored
+            save_data['M'][1] = 0.
+
+            write(fn, save_data, info, ftype='gmx')
+
+        convert(tmpbase, outbase, ftype='gmx', jobs=3, quiet=True)
+
+        out_files = list(find_datamap_files(outbase))
+        assert (len(out_files) == len(files))
+
+        for fnin, fnout in zip(files, out_files):
+            data, info_in = read_gmx(fnin)
+            out_data, info_out = read_gmx(fnout)
+
+            assert (info_out['shape'] == info_in['shape'])
+
+            for l in all_fields:
+                assert (np.array_equal(out_data[l], data[l]))
+
+            sparse_data, _, _ = read_data_file(fnout, sparse=True)
+            assert (sparse_data['M'].size == datasize - 1)
+
+def test_unpack_with_jobs_to_simple():
+    with tmp.TemporaryDirectory() as tmpdir:
+        tmpbase = os.path.join(tmpdir, fnbase)
+        outbase = os.path.join(tmpdir, out)
+        path = os.path.join(tmpdir, 'traj.dat')
+
+        files = list(gen_filenames(tmpbase, num_files))
+
+        for fn in files:
+            for l in fields:
+                save_data[l] = np.random.sample(datasize)
+
+            write(fn, save_data, ftype='simple')
+
+        pack(tmpbase, path, quiet=True)
+        unpack(path, outbase, ftype='simple', jobs=4, quiet=True)
+
+        unpacked_files = list(find_datamap_files(outbase))
+        assert (len(unpacked_files) == len(files))
+
+        for fn, frame in zip(unpacked_files, find_datamap_files(path)):
+            data = read_binsimple(fn)
+            frame_data, _, _ = read_data_file(frame)
+
+            for l in all_fields:
+                assert (np.allclose(data[l], frame_data[l], atol=1e-6))
+
+def test_convert_from_simple_to_simple_v2():
+    with tmp.TemporaryDirectory() as tmpdir:
+        tmpbase = os.path.join(tmpdir, fnbase)
+        outbase = os.path.join(tmpdir, out)
+
+        save_data_list = []
+        files = list(gen_filenames(tmpbase, num_files))
+
+        for fn in files:
+            for l in fields:
+                save_data[l] = np.random.sample(datasize)
+
+            save_data_list.append(save_data.copy())
+
+            write(fn, save_data, ftype='simple')
+
+        convert(tmpbase, outbase, ftype='simple_v2', quiet=True)
+
+        for i, fn in enumerate(find_datamap_files(outbase)):
+            data, info, _ = read_data_file(fn)
+            assert (info['shape'] == (2, 2))
+
+            for l in all_fields:
+                assert (np.allclose(data[l], save_data_list[i][l], atol=1e-6))
@@ -93,6 +93,32 @@ def test_find_datamaps_raises_warning_if_no_files_are_found():
         with pytest.warns(UserWarning):
             list(find_datamap_files('does_not_exist'))
 
+def test_find_file_numbers():
+    with tmp.TemporaryDirectory() as tmp_dir:
+        base = os.path.join(tmp_dir, fnbase)
+        for filename in ['data_00003.dat', 'data_00001.dat', 'data_123456.dat',
+                'data_1.dat', 'data_00002.tmp', 'data_0000a.dat', 'other_00004.dat']:
+            open(os.path.join(tmp_dir, filename), 'w')
+
+        assert (find_file_numbers(base) == [1, 3, 123456])
+        assert (find_file_numbers(base, ext='.tmp') == [2])
+        assert (find_file_numbers(os.path.join(tmp_dir, 'missing', fnbase)) == [])
+
+def test_find_datamaps_stops_at_missing_number():
+    with tmp.TemporaryDirectory() as tmp_dir:
+        base = os.path.join(tmp_dir, fnbase)
+        for i in (1, 2, 3, 5, 6):
+            open('%s%05d%s' % (base, i, ext_def), 'w')
+
+        assert (list(find_datamap_files(base)) ==
+            ['%s%05d%s' % (base, i, ext_def) for i in (1, 2, 3)])
+        assert (list(find_datamap_files(base, begin=5)) ==
+            ['%s%05d%s' % (base, i, ext_def) for i in (5, 6)])
+        assert (list(find_datamap_files(base, group=2, rolling=True)) ==
+            [['%s%05d%s' % (base, i, ext_def) for i in (j, j+1)] for j in (1, 2)])
+        assert (list(find_datamap_files(base, group=2)) ==
+            [['%s%05d%s' % (base, i, ext_def) for i in (1, 2)]])
+
 def test_groups_to_singles_filenames():
     num_files = 10
     group = 5
@@ -229,6 +255,21 @@ def test_find_singles_to_singles_fopts():
             assert (fnin == files[i])
             assert (fnout == next(out_gen))
 
+def test_get_datamap_number():
+    with tmp.TemporaryDirectory() as tmpdir:
+        base = os.path.join(tmpdir, fnbase)
+
+        for fn in gen_filenames(base, begin=4, end=6, ext='.tmp'):
+            open(fn, 'w')
+
+        numbers = [get_datamap_number(fn, base, '.tmp')
+            for fn in find_datamap_files(base, begin=4, ext='.tmp')]
+        assert (numbers == [4, 5, 6])
+
+        # Frames of trajectories are numbered by their frame
+        path = os.path.join(tmpdir, 'traj.dat')
+        assert (get_datamap_number('%s#%05d' % (path, 12), path) == 12)
+
 def test_catch_fileattr():
     kwargs = {'begin': 2, 'end': 4, 'ext': '.tmp', 'extra': [1,2,3]}
     attr = pop_fileopts(kwargs)
@@ -1,7 +1,10 @@
+import bisect
 import numpy as np
 import os
 import warnings
 
+from collections import deque
+
 """Utilities for interacting with data files."""
 
 
@@ -48,7 +51,17 @@ def find_datamap_files(base, **kwargs):
     fill a group the remainder is cut off and not yielded.
 
     Finds file names by joining the file name base and extension with
-    a five-digit integer signifying the map number ('%s%05d%s').
+    a five-digit integer signifying the map number ('%s%05d%s'). The
+    directory is scanned once for the numbers of existing files, see
+    `find_file_numbers`, after which files are yielded from the first
+    number until a number is missing. Groups are generated as they are
+    yielded from these files.
+
+    If the base is a trajectory file the paths to its frames are found
+    instead, using the frame numbers as map numbers. The extension is
+    then not used. See strata.dataformats.trajectory.read. The same goes
+    for interface series files, whose interfaces are found by their
+    numbers. See strata.dataformats.interfaces.
 
     Args:
         base (str): Base of data map files.
@@ -71,36 +84,44 @@ def find_datamap_files(base, **kwargs):
     """
 
     def yield_singles(base, begin, end, ext):
-        files_found = False
+        if is_trajectory(base):
+            yield from gen_frame_paths(base, begin, end)
+            return
+
+        if is_interface_series(base):
+            yield from gen_interface_paths(base, begin, end)
+            return
+
+        numbers = find_file_numbers(base, ext)
+        i = bisect.bisect_left(numbers, begin)
 
-        for filename in gen_filenames(base, begin=begin, end=end, ext=ext):
-            if os.access(filename, os.F_OK) == True:
-                files_found = True
-                yield filename
-            else:
-                if files_found == False:
-                    warnings.warn(
-                            "No files with base {!r} beginning at number {} were found".format(base, begin), UserWarning
-                        )
+        if begin <= end and (i == len(numbers) or numbers[i] != begin):
+            warnings.warn(
+                    "No files with base {!r} beginning at number {} were found".format(base, begin), UserWarning
+                )
 
-                break
+        # Yield files until the first missing number
+        num = begin
+        while num <= end and i < len(numbers) and numbers[i] == num:
+            yield '%s%05d%s' % (base, num, ext)
+            num += 1
+            i += 1
 
     def yield_groups(base, begin, end, ext):
-        group_end = begin + group - 1
+        files = deque(maxlen=group)
 
-        while group_end <= end:
-            files = list(yield_singles(base, begin, group_end, ext))
+        for filename in yield_singles(base, begin, end, ext):
+            files.append(filename)
 
             if len(files) == group:
-                yield files
-                if rolling:
-                    begin += 1
-                    group_end += 1
-                else:
-                    begin += group
-                    group_end += group
-            else:
-                break
+                yield list(files)
+
+                if not rolling:
+                    files.clear()
+
+    # Imported here since the data formats use these utilities
+    from strata.dataformats.interfaces import is_interface_series, gen_interface_paths
+    from strata.dataformats.trajectory.read import is_trajectory, gen_frame_paths
 
     args = [
             kwargs.pop('begin', 1),
@@ -120,6 +141,83 @@ def find_datamap_files(base, **kwargs):
         return None
 
 
+def find_file_numbers(base, ext='.dat'):
+    """Return the sorted numbers of data map files at a base path.
+
+    The directory of the base is scanned once for file names which
+    join the base and extension with a five-digit integer ('%s%05d%s').
+    The directory can be inside a tar or zip archive, in which case the
+    archive members are listed. See strata.dataformats.archive.
+
+    Args:
+        base (str): Base of data map files.
+
+    Keyword Args:
+        ext (str, default='.dat'): File extension.
+
+    Returns:
+        list: Sorted numbers of the found files.
+
+    """
+
+    from strata.dataformats.archive import list_archive_directory
+
+    directory, prefix = os.path.split(base)
+
+    try:
+        with os.scandir(directory if directory != '' else '.') as entries:
+            names = [entry.name for entry in entries]
+    except OSError:
+        names = list_archive_directory(directory)
+
+        if names == None:
+            return []
+
+    numbers = []
+
+    for name in names:
+        if not name.startswith(prefix) or not name.endswith(ext):
+            continue
+
+        digits = name[len(prefix):]
+        if ext != '':
+            digits = digits[:-len(ext)]
+
+        if digits.isascii() and digits.isdigit() and '%05d' % int(digits) == digits:
+            numbers.append(int(digits))
+
+    return sorted(numbers)
+
+
+def get_datamap_number(path, base, ext='.dat'):
+    """Return the map number of a path found by `find_datamap_files`.
+
+    The number is that of the file, or that of the frame of a trajectory
+    or interface of an interface series, which may not be consecutive.
+
+    Args:
+        path (str): Path to a data map.
+
+        base (str): Base of data map files which the path was found at.
+
+    Keyword Args:
+        ext (str, default='.dat'): File extension.
+
+    Returns:
+        int: Map number of the path.
+
+    """
+
+    from strata.dataformats.trajectory.read import split_frame_path
+
+    frame_base, number = split_frame_path(path)
+
+    if number != None and frame_base == base:
+        return number
+
+    return int(path[len(base):len(path) - len(ext)])
+
+
 def find_singles_to_singles(base, output, **fopts):
     """Find input file names and generates with output file names.
 
@@ -219,19 +317,23 @@ def pop_fileopts(kwargs):
         ext (str, default='.dat'): File extension.
 
         outext (str, default=ext): Output file extension, defaults to input.
+            Output files are not compressed, so a compressed file extension
+            such as '.gz' is removed from the default.
 
     Return:
         dict: Input options with set or default values.
 
     """
 
+    from strata.dataformats.compressed import strip_compressed_ext
+
     fopts = {
             'begin': kwargs.pop('begin', 1),
             'end': kwargs.pop('end', np.inf),
             'ext': kwargs.pop('ext', '.dat')
             }
 
-    fopts['outext'] = kwargs.get('outext', fopts['ext'])
+    fopts['outext'] = kwargs.get('outext', strip_compressed_ext(fopts['ext']))
 
     return fopts
 
@@ -260,8 +362,7 @@ def prepare_path(func):
             directory, filename = os.path.split(path)
             if directory == "":
                 directory = "."
-            if not os.path.exists(directory):
-                os.makedirs(directory)
+            os.makedirs(directory, exist_ok=True)
 
             return directory, filename
 
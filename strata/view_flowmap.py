@@ -1,8 +1,7 @@
 import matplotlib.pyplot as plt
 import numpy as np
 
-from droplets.flow import FlowData
-from droplets.sample import sample_center_of_mass, sample_viscous_dissipation
+from droplets.flow import FlowData, get_derived_field
 from strata.dataformats.read import read_from_files
 from strata.utils import decorate_graph
 
@@ -23,9 +22,10 @@ def view_flowfields(*files, labels=('U', 'V'), cutoff_label='M', cutoff=None,
         cutoff_label (str, optional): Label for cutting data.
 
         colour (str, optional): Colour flow fields with data from this label,
-            or enter 'flow' to colour by flow magnitude, 'visc' to colour by
-            viscous dissipation, 'radial' by radial velocity from center
-            of mass, 'evaporation' by phase field evaporation.
+            which can be a derived field: enter 'flow' to colour by flow
+            magnitude, 'visc' to colour by viscous dissipation, 'radial' by
+            radial velocity from center of mass, 'evaporation' by phase
+            field evaporation. See `droplets.derived`.
 
         pivot (str, optional): Pivot for flow field arrows.
 
@@ -34,11 +34,15 @@ def view_flowfields(*files, labels=('U', 'V'), cutoff_label='M', cutoff=None,
         vlim (floats, optional): 2-tuple with limits for the colour map if
             a label has been supplied.
 
+        prefetch (int, optional): Number of files to read ahead in the
+            background.
+
     See `strata.utils.decorate_graph` for more keyword arguments.
 
     """
 
     kwargs.setdefault('axis', 'scaled')
+    prefetch = kwargs.pop('prefetch', 0)
 
     # Order the data labels
     coord_labels = kwargs.get('coord_labels', ['X', 'Y'])
@@ -47,22 +51,13 @@ def view_flowfields(*files, labels=('U', 'V'), cutoff_label='M', cutoff=None,
     xlim, ylim = [kwargs.get(lims, (None, None)) for lims in ('xlim', 'ylim')]
     clim = (cutoff_label, cutoff)
 
-    for i, (data, info, _) in enumerate(read_from_files(*files)):
+    for i, (data, info, _) in enumerate(read_from_files(*files, prefetch=prefetch)):
         flow = FlowData(data, info=info)
-
-        if colour == 'flow':
-            flow.data = add_absolute_flow(flow.data)
-        elif colour == 'visc':
-            add_viscous_dissipation(flow, viscosity=8.77e-4)
-        elif colour == 'radial':
-            com = sample_center_of_mass(flow)
-            flow.data = add_radial_flow(flow.data, com)
-        elif colour == 'evaporation':
-            add_evaporation(flow)
+        add_derived_field(flow, colour)
 
         try:
             if not streamlines:
-                xs, ys, us, vs, weights = get_quiver_data(flow.data,
+                xs, ys, us, vs, weights = get_quiver_data(flow.fields,
                         list(labels), coord_labels, colour,
                         clim, xlim, ylim)
 
@@ -200,7 +195,7 @@ def get_quiver_data(data, labels, coord_labels, colour, clim, xlim, ylim):
         assert(colour != None)
         weights = data[colour]
     except Exception:
-        weights = np.ones(data.size)
+        weights = np.ones(xs.size)
 
     return (cs[inds] for cs in (xs, ys, us, vs, weights))
 
@@ -228,7 +223,9 @@ def view_flowmap_2d(*files, label='M', type='heightmap',
         files (paths): List of files to view.
 
     Keyword Args:
-        label (str, optional): Data label to use as height values.
+        label (str, optional): Data label to use as height values, which
+            can be a derived field (see `droplets.derived`). 'visc_diss'
+            is the viscous dissipation 'visc'.
 
         cutoff (float, optional): Cutoff for data to show bins for.
 
@@ -239,6 +236,9 @@ def view_flowmap_2d(*files, label='M', type='heightmap',
 
         filled (bool): Contour: Draw a filled contour. (False)
 
+        prefetch (int, optional): Number of files to read ahead in the
+            background.
+
     See `strata.utils.decorate_graph` for more keyword arguments.
 
     """
@@ -257,22 +257,16 @@ def view_flowmap_2d(*files, label='M', type='heightmap',
     kwargs.setdefault('axis', 'scaled')
     kwargs.setdefault('noaxis', True)
     kwargs.setdefault('coord_labels', ('X', 'Y'))
+    prefetch = kwargs.pop('prefetch', 0)
 
-    for i, (data, info, _) in enumerate(read_from_files(*files)):
+    for i, (data, info, _) in enumerate(read_from_files(*files, prefetch=prefetch)):
         flow = FlowData(data, info=info)
 
-        if label == 'flow':
-            flow.data = add_absolute_flow(flow.data)
-
         if label == 'visc_diss':
             label = 'visc'
-            add_viscous_dissipation(flow, viscosity=8.77e-4)
-
-        if label == 'evaporation':
-            add_evaporation(flow)
 
-        if label in ['grad_rho_x', 'grad_rho_y']:
-            add_density_gradient(flow)
+        add_derived_field(flow, label)
+        add_derived_field(flow, cutoff_label)
 
         if cutoff != None and cutoff_label != None:
             flow = flow.lims(cutoff_label, cutoff, None)
@@ -345,92 +339,22 @@ def contour(data, info, label, **kwargs):
     return fig
 
 
-def add_absolute_flow(data):
-    """Return a numpy array with absolute flow as a field named 'flow'.
+def add_derived_field(flow, label):
+    """Add a derived field to the stored fields of a FlowData object.
 
-    The absolute flow is added as a new label for the returned data
-    array, which is calculated as sqrt(U**2 + V**2) where U and V
-    are the flow arrays along the dimensions.
+    Labels which are stored or not derived fields are ignored. The
+    other fields are not copied, see `FlowData.add_field`.
 
     Args:
-        data (ndarray): Record which must contain flow labels 'U' and 'V'.
+        flow (FlowData): Object to add the field to.
 
-    Returns:
-        ndarray: The same record with an added field of label 'flow'.
+        label (str): Label of derived field, see `droplets.derived`.
 
     """
 
-    from numpy.lib.recfunctions import append_fields
-
-    absolute_flow = np.sqrt(data['U']**2 + data['V']**2)
-
-    return append_fields(data, 'flow', absolute_flow, dtypes='float')
-
-
-def add_radial_flow(data, coord):
-    """Return a numpy array with the radial flow as a field named 'radial'.
-
-    The radial flow is calculated from the center of mass and is positive
-    in the clockwise direction.
-
-    Args:
-        data (ndarray): Record which must contain coordinate labels 'X' and 'Y'
-            as well as flow labels 'U' and 'V'.
-
-    Returns:
-        ndarray: The same record with an added field of label 'radial'.
-
-    """
-
-    from numpy.lib.recfunctions import append_fields
-
-    x0, y0 = coord
-    radial_angle = np.arctan2(data['Y'] - y0, data['X'] - x0)
-
-    radial_flow = data['U'] * np.sin(radial_angle) \
-        - data['V'] * np.cos(radial_angle)
-
-    return append_fields(data, 'radial', radial_flow, dtypes='float')
-
-def add_viscous_dissipation(flow, viscosity):
-    """Add the viscous dissipation as a field named 'visc'.
-
-    The dissipation is added as a new label for the data array.
-
-    Args:
-        data (ndarray): Record which must contain coordinate labels 'X' and 'Y'
-            as well as flow labels 'U' and 'V'.
-
-    """
-
-    from numpy.lib.recfunctions import append_fields
-
-    viscous_dissipation = sample_viscous_dissipation(flow, viscosity,
-        weight_label='M')
-
-    flow.data = append_fields(flow.data, 'visc', viscous_dissipation.ravel(),
-        dtypes='float')
-
-
-def add_density_gradient(flow):
-    from numpy.lib.recfunctions import append_fields
-
-    (nx, ny) = flow.shape
-    spacing = flow.spacing
-
-    flow.sort()
-
-    data = flow.data.reshape(ny, nx)
-
-    mass_gradient_y, mass_gradient_x = np.gradient(
-        data['M'], *spacing, edge_order=1
-        )
-
-    flow.data = append_fields(flow.data, 'grad_rho_x', mass_gradient_x.ravel(),
-        dtypes='float')
-    flow.data = append_fields(flow.data, 'grad_rho_y', mass_gradient_y.ravel(),
-        dtypes='float')
-
+    if label != None and label not in flow.properties \
+            and get_derived_field(label) != None:
+        flow.add_field(label, flow.get_field(label))
 
 
 def add_evaporation(flow):
@@ -439,29 +363,9 @@ def add_evaporation(flow):
     `u` here is the flow field and `rho` the density.
 
     Args:
-        data (ndarray): Record which must contain coordinate labels 'X' and 'Y',
-            flow labels 'U' and 'V' and mass label 'M'.
+        flow (FlowData): Object which must contain coordinate labels 'X'
+            and 'Y', flow labels 'U' and 'V' and mass label 'M'.
 
     """
 
-    from numpy.lib.recfunctions import append_fields
-
-    (nx, ny) = flow.shape
-    spacing = flow.spacing
-
-    flow.sort()
-
-    data = flow.data.reshape(ny, nx)
-
-    mass_gradient_y, mass_gradient_x = np.gradient(
-        data['M'], *spacing, edge_order=1
-        )
-
-    us = data['U']
-    vs = data['V']
-
-    evaporation = us * mass_gradient_x + vs * mass_gradient_y
-
-    flow.data = append_fields(
-        flow.data, 'evaporation', evaporation.ravel(), dtypes='float'
-    )
+    add_derived_field(flow, 'evaporation')